@@ -0,0 +1,216 @@
+"""Local searchable archive of every article and summary the digest has seen.
+
+One SQLite file holds each article once (keyed by canonical URL) with its
+feed, publisher, dates, relevance score and generated bullets, plus an FTS5
+index over title, description and bullets and B-tree indexes on date and
+source. A story several segments found is listed under each of their feeds
+(article_feeds), so a search by feed finds it whichever segment saw it
+first. Searches are local and take milliseconds:
+
+    python archive.py search "regulation" --feed newsapi --this-quarter
+    python archive.py search "openai OR anthropic" --since 2025-01-01 --limit 20
+    python archive.py stats
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import date, datetime, timezone
+
+
+ARCHIVE_PATH = os.getenv('ARCHIVE_PATH', 'news_archive.db')  # Empty disables archiving
+LOCK_TIMEOUT = 60  # Seconds a write waits for another process's (e.g. parallel backfill weeks) to finish
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    canonical_url TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    feed TEXT NOT NULL,            -- First feed to find it: 'tldr', 'rss', or a segment's ('newsapi' for Australia, 'newsapi-nz', ...)
+    publisher TEXT,
+    published_date TEXT,           -- YYYY-MM-DD
+    digest_date TEXT,              -- Monday of the digest the article was collected for
+    relevance_score REAL,
+    description TEXT,
+    bullets TEXT,
+    model_tier TEXT,
+    archived_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published_date);
+CREATE INDEX IF NOT EXISTS articles_feed_published ON articles (feed, published_date);
+CREATE INDEX IF NOT EXISTS articles_publisher ON articles (publisher);
+
+CREATE TABLE IF NOT EXISTS article_feeds (
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    feed TEXT NOT NULL,            -- Every feed that has found the article
+    PRIMARY KEY (feed, article_id)
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, description, bullets, content='articles', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, description, bullets)
+    VALUES (new.id, new.title, new.description, new.bullets);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, description, bullets)
+    VALUES ('delete', old.id, old.title, old.description, old.bullets);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, description, bullets)
+    VALUES ('delete', old.id, old.title, old.description, old.bullets);
+    INSERT INTO articles_fts (rowid, title, description, bullets)
+    VALUES (new.id, new.title, new.description, new.bullets);
+END;
+"""
+
+# Later sightings of an article fill in what earlier ones lacked (e.g. bullets) without erasing anything
+UPSERT = """
+INSERT INTO articles (canonical_url, url, title, feed, publisher, published_date, digest_date,
+                      relevance_score, description, bullets, model_tier, archived_at)
+VALUES (:canonical_url, :url, :title, :feed, :publisher, :published_date, :digest_date,
+        :relevance_score, :description, :bullets, :model_tier, :archived_at)
+ON CONFLICT (canonical_url) DO UPDATE SET
+    title = excluded.title,
+    publisher = COALESCE(excluded.publisher, publisher),
+    published_date = COALESCE(excluded.published_date, published_date),
+    digest_date = COALESCE(digest_date, excluded.digest_date),
+    relevance_score = COALESCE(excluded.relevance_score, relevance_score),
+    description = COALESCE(excluded.description, description),
+    bullets = COALESCE(excluded.bullets, bullets),
+    model_tier = COALESCE(excluded.model_tier, model_tier)
+"""
+
+ADD_FEED = """
+INSERT OR IGNORE INTO article_feeds (article_id, feed)
+SELECT id, :feed FROM articles WHERE canonical_url = :canonical_url
+"""
+
+FEEDS = "(SELECT group_concat(feed, ',') FROM article_feeds WHERE article_id = a.id) AS feeds"
+
+
+def quarter_start(day):
+    return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+
+
+class Archive:
+    """The SQLite archive; use as a context manager so writes are committed and the file closed."""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=LOCK_TIMEOUT)
+        self.conn.row_factory = sqlite3.Row
+        upgrading = self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles'").fetchone() and \
+            not self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'article_feeds'").fetchone()
+        self.conn.executescript(SCHEMA)
+        if upgrading:
+            # Archives written before article_feeds existed: each article's one recorded feed
+            self.conn.execute('INSERT OR IGNORE INTO article_feeds (article_id, feed) SELECT id, feed FROM articles')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.commit()
+        self.conn.close()
+        return False
+
+    def add(self, article, feed, summary_item=None, digest_date=None):
+        """Insert or update one sources.Article (TLDR, feed or filtered NewsAPI).
+
+        summary_item is the article's bullet-point item ({'summary': bullets, 'tier': ...}), if any.
+        """
+        summary_item = summary_item or {}
+        self.conn.execute(UPSERT, {
+            'canonical_url': article.canonical_url,
+            'url': article.url,
+            'title': article.title,
+            'feed': feed,
+            'publisher': article.publisher or None,
+            'published_date': article.date or None,
+            'digest_date': digest_date,
+            # Only keyword-scored feeds have a relevance score
+            'relevance_score': article.relevance_score if article.source == 'newsapi' else None,
+            'description': article.summary or None,
+            'bullets': summary_item.get('summary'),
+            'model_tier': summary_item.get('tier'),
+            'archived_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        })
+        self.conn.execute(ADD_FEED, {'feed': feed, 'canonical_url': article.canonical_url})
+
+    def search(self, query=None, feed=None, publisher=None, since=None, until=None, limit=50):
+        """Articles matching an FTS5 query (best matches first) and/or filters (newest first).
+
+        Each row's `feeds` lists every feed that has found the article, comma-separated.
+        """
+        clauses, params = [], []
+        if feed:
+            clauses.append('a.id IN (SELECT article_id FROM article_feeds WHERE feed = ?)')
+            params.append(feed)
+        if publisher:
+            clauses.append('a.publisher = ?')
+            params.append(publisher)
+        if since:
+            clauses.append('a.published_date >= ?')
+            params.append(since)
+        if until:
+            clauses.append('a.published_date <= ?')
+            params.append(until)
+        if query:
+            sql = (f'SELECT a.*, {FEEDS}, bm25(articles_fts) AS rank FROM articles_fts '
+                   'JOIN articles a ON a.id = articles_fts.rowid WHERE articles_fts MATCH ?')
+            params.insert(0, query)
+            order = 'rank'
+        else:
+            sql = f'SELECT a.*, {FEEDS} FROM articles a WHERE 1 = 1'
+            order = 'a.published_date DESC'
+        sql += ''.join(f' AND {clause}' for clause in clauses) + f' ORDER BY {order} LIMIT ?'
+        return self.conn.execute(sql, params + [limit]).fetchall()
+
+    def stats(self):
+        rows = self.conn.execute('SELECT f.feed, COUNT(*) AS articles, COUNT(a.bullets) AS summarized, '
+                                 'MIN(a.published_date) AS first, MAX(a.published_date) AS last '
+                                 'FROM article_feeds f JOIN articles a ON a.id = f.article_id GROUP BY f.feed').fetchall()
+        return [dict(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the local article archive.")
+    parser.add_argument('--db', default=ARCHIVE_PATH or 'news_archive.db', help='Archive file (default ARCHIVE_PATH or news_archive.db)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    search = commands.add_parser('search', help='Full-text search with optional filters')
+    search.add_argument('query', nargs='?', help='FTS5 query, e.g. "regulation" or "openai OR anthropic"')
+    search.add_argument('--feed', help="'tldr', 'rss', 'newsapi' (Australia) or another segment's feed, e.g. 'newsapi-nz'")
+    search.add_argument('--publisher')
+    search.add_argument('--since', help='Published on or after (YYYY-MM-DD)')
+    search.add_argument('--until', help='Published on or before (YYYY-MM-DD)')
+    search.add_argument('--this-quarter', action='store_true', help='Shorthand for --since the start of this quarter')
+    search.add_argument('--limit', type=int, default=50)
+    search.add_argument('--bullets', action='store_true', help='Print the stored bullets too')
+    commands.add_parser('stats', help='Article counts per feed (a story several feeds found counts in each)')
+    args = parser.parse_args()
+
+    with Archive(args.db) as archive:
+        if args.command == 'stats':
+            for row in archive.stats():
+                print(f"{row['feed']:8s} {row['articles']:6d} articles, {row['summarized']:6d} summarized, "
+                      f"{row['first']} to {row['last']}")
+            return
+        since = quarter_start(date.today()).isoformat() if args.this_quarter else args.since
+        start = time.perf_counter()
+        rows = archive.search(args.query, feed=args.feed, publisher=args.publisher, since=since,
+                              until=args.until, limit=args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for row in rows:
+            print(f"{row['published_date'] or '----------'}  [{row['feeds']}] {row['title']}  ({row['publisher'] or '?'})")
+            print(f"            {row['url']}")
+            if args.bullets and row['bullets']:
+                print('\n'.join(f"            {line}" for line in row['bullets'].splitlines()))
+        print(f"\n{len(rows)} result(s) in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Rebuild the weekly digest for past weeks, many weeks at a time.
+
+For every Monday in the requested range, a worker process freezes the
+emailer's clock at that Monday's 6am send time (Australia/Sydney), runs the
+normal scrape -> filter -> summarize pipeline and writes the rendered digest
+to <output-dir>/digest-YYYY-MM-DD.html (plus a per-week log). Nothing is
+emailed. With several segments configured (SEGMENTS), each segment's edition
+is written next to it as digest-YYYY-MM-DD-<segment>.html.
+
+Workers share one SQLite cache file for HTTP responses (past TLDR issues
+don't change) and Gemini answers (keyed on model and prompt, so a prompt
+change regenerates summaries and nothing else does), and take Gemini calls
+from one rate limit shared by all processes.
+
+    python backfill.py --from 2025-01-01 --to 2025-03-31 --workers 4 --gemini-rpm 15
+
+NewsAPI only serves recent history on most plans; for weeks it no longer
+returns, a segment's regional section is rebuilt from the local archive
+(archive.py) when that week's candidates were archived.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+
+import pytz
+import requests
+from requests.structures import CaseInsensitiveDict
+
+SYDNEY = pytz.timezone('Australia/Sydney')
+SEND_TIME = dtime(6, 0)
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS http (key TEXT PRIMARY KEY, url TEXT, status INTEGER, content_type TEXT, body TEXT);
+CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, model TEXT, tier TEXT, text TEXT);
+"""
+
+
+def mondays(start, end):
+    """Every Monday from start to end inclusive (dates)."""
+    day = start + timedelta(days=(7 - start.weekday()) % 7)
+    while day <= end:
+        yield day
+        day += timedelta(days=7)
+
+
+def _digest(*parts):
+    return hashlib.sha1('\x1f'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+
+class SharedCache:
+    """HTTP and summary cache in one SQLite file that every worker process opens."""
+
+    def __init__(self, path):
+        # Enrichment fetches pages from a thread pool, so the connection is shared behind a lock
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(CACHE_SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, table, key):
+        with self._lock:
+            return self.conn.execute(f'SELECT * FROM {table} WHERE key = ?', (key,)).fetchone()
+
+    def put(self, table, row):
+        placeholders = ', '.join('?' for _ in row)
+        with self._lock:
+            self.conn.execute(f'INSERT OR REPLACE INTO {table} VALUES ({placeholders})', row)
+
+
+class RateLimiter:
+    """Spaces calls at least 60/per_minute seconds apart across all processes sharing it."""
+
+    def __init__(self, per_minute, next_slot, lock):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next_slot = next_slot
+        self._lock = lock
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next_slot.value)
+            self._next_slot.value = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CachedFetcher:
+    """Wraps the emailer's Fetcher: successful GETs are served from the shared cache after the first time."""
+
+    def __init__(self, inner, cache):
+        self._inner = inner
+        self._cache = cache
+
+    def get(self, url, **kwargs):
+        key = _digest(url, json.dumps(kwargs.get('params'), sort_keys=True, default=str))
+        row = self._cache.get('http', key)
+        if row is not None:
+            response = requests.Response()
+            response.status_code = row[2]
+            response.headers = CaseInsensitiveDict({'Content-Type': row[3]})
+            response._content = row[4].encode('utf-8')
+            response.encoding = 'utf-8'
+            response.url = url
+            return response
+        response = self._inner.get(url, **kwargs)
+        if response.status_code == 200:
+            self._cache.put('http', (key, url, 200, response.headers.get('Content-Type', ''), response.text))
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class _CachedAnswer:
+    """A Gemini answer served from the shared cache (tier 'cache')."""
+
+    def __init__(self, text, tier):
+        self.text = text
+        self.tier = tier
+
+
+class CachedModel:
+    """Wraps a Gemini model (or router): cached answers are reused, new calls wait for the shared rate limit."""
+
+    def __init__(self, inner, cache, limiter):
+        self._inner = inner
+        self._cache = cache
+        self._limiter = limiter
+        self.model_name = getattr(inner, 'model_name', 'gemini')
+
+    def generate_content(self, prompt, **kwargs):
+        key = _digest(self.model_name, prompt, json.dumps(kwargs, sort_keys=True, default=str))
+        row = self._cache.get('summaries', key)
+        if row is not None:
+            return _CachedAnswer(row[3], 'cache')
+        self._limiter.wait()
+        response = self._inner.generate_content(prompt, **kwargs)
+        self._cache.put('summaries', (key, self.model_name, getattr(response, 'tier', 'primary'), response.text))
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+def archived_candidates(send_day, feed='newsapi'):
+    """NewsAPI candidates archived for the week ending send_day, as sources.Article objects."""
+    import archive
+    import sources
+    if not archive.ARCHIVE_PATH or not Path(archive.ARCHIVE_PATH).exists():
+        return []
+    with archive.Archive(archive.ARCHIVE_PATH) as db:
+        rows = db.search(feed=feed, since=(send_day - timedelta(days=8)).isoformat(),
+                         until=send_day.isoformat(), limit=100)
+    return [sources.Article(title=row['title'], url=row['url'], source='newsapi',
+                            summary=row['description'] or 'No description available.',
+                            published=f"{row['published_date']}T00:00:00Z",
+                            relevance_score=row['relevance_score'] or 0, publisher=row['publisher'] or '')
+            for row in rows]
+
+
+class ArchivedFallback:
+    """Wraps a NewsApiSource: weeks NewsAPI no longer returns are rebuilt from the archived candidates."""
+
+    def __init__(self, inner):
+        self._inner = inner
+
+    def fetch(self, now):
+        articles = self._inner.fetch(now)
+        if not articles and not self._inner.borderline:
+            segment = self._inner.segment
+            articles = archived_candidates(now.astimezone(SYDNEY).date(), segment['feed'])
+            print(f"NewsAPI returned nothing for this week; using {len(articles)} archived {segment['name']} candidates")
+        return articles
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+# --- Worker process ---
+
+_worker = {}
+
+
+def _init_worker(cache_path, output_dir, gemini_rpm, next_slot, lock, use_stand_ins):
+    import daily_emailer
+    import stand_ins
+    if use_stand_ins:
+        # Lives as long as the worker process
+        _worker['stand_ins'] = stand_ins.LocalStandIns(daily_emailer).__enter__()
+    cache = SharedCache(cache_path)
+    limiter = RateLimiter(gemini_rpm, next_slot, lock)
+    daily_emailer.fetcher = CachedFetcher(daily_emailer.fetcher, cache)
+    daily_emailer.model = CachedModel(daily_emailer.model, cache, limiter)
+    daily_emailer.relevance_model = CachedModel(daily_emailer.relevance_model, cache, limiter)
+    daily_emailer.GEMINI_CALL_DELAY = 0  # Pacing comes from the shared rate limiter instead
+    daily_emailer.NOVELTY_INDEX_PATH = ''  # Weeks are rebuilt out of order and as they were, without later knowledge
+
+    configured_sources = daily_emailer.configured_sources
+
+    def with_archive_fallback(skip_dates=()):
+        return [ArchivedFallback(source) if source.kind == 'newsapi' else source
+                for source in configured_sources(skip_dates)]
+
+    daily_emailer.configured_sources = with_archive_fallback
+    _worker.update(module=daily_emailer, output_dir=Path(output_dir))
+
+
+def browser_html(html_text):
+    """Point the email's cid: images at the repo's asset files so the digest opens in a browser."""
+    import daily_emailer
+    for cid, path in daily_emailer.CID_ASSETS.items():
+        html_text = html_text.replace(f'cid:{cid}', Path(path).resolve().as_uri())
+    return html_text
+
+
+def build_week(send_day):
+    """Build and write the digest that would have gone out on send_day (a Monday)."""
+    import clock
+    import tracing
+    module, output_dir = _worker['module'], _worker['output_dir']
+    clock.freeze(module, SYDNEY.localize(datetime.combine(send_day, SEND_TIME)))
+    tracing.reset()
+    start = time.perf_counter()
+    with open(output_dir / f"digest-{send_day.isoformat()}.log", 'w') as log, redirect_stdout(log):
+        global_items, regional_items = module.build_digest()
+    paths = []
+    for index, segment in enumerate(module.SEGMENTS):
+        # The first segment keeps the plain file name
+        suffix = f"-{segment['id']}" if index else ''
+        path = output_dir / f"digest-{send_day.isoformat()}{suffix}.html"
+        html_text = module.render_bullet_points_html(global_items, regional_items[segment['id']], segment)
+        path.write_text(browser_html(html_text), encoding='utf-8')
+        paths.append(str(path))
+    counters = tracing.tracer.counters
+    return {'week': send_day.isoformat(), 'paths': paths, 'global': len(global_items),
+            'regional': {key: len(items) for key, items in regional_items.items()},
+            'seconds': round(time.perf_counter() - start, 3),
+            'gemini_calls': sum(v for k, v in counters.items() if k.startswith('gemini.tier.') and k != 'gemini.tier.cache'),
+            'cached_summaries': counters.get('gemini.tier.cache', 0)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild weekly digests for a range of past weeks in parallel.")
+    parser.add_argument('--from', dest='start', required=True, type=date.fromisoformat, help='First date (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='end', required=True, type=date.fromisoformat, help='Last date (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes (default 4)')
+    parser.add_argument('--gemini-rpm', type=float, default=15,
+                        help='Gemini calls per minute across all workers (default 15; 0 = unlimited)')
+    parser.add_argument('--output-dir', default='backfill_output', help='Where digests are written')
+    parser.add_argument('--cache', default='backfill_cache.db', help='Shared HTTP/summary cache file')
+    parser.add_argument('--stand-ins', action='store_true', help='Run every worker against the local stand-ins')
+    args = parser.parse_args()
+
+    weeks = list(mondays(args.start, args.end))
+    if not weeks:
+        parser.error('No Mondays in the given range')
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    SharedCache(args.cache)  # Create the schema before workers race to do it
+
+    context = multiprocessing.get_context('spawn')  # Don't fork live gRPC/HTTP clients
+    next_slot, lock = context.Value('d', 0.0, lock=False), context.Lock()
+    print(f"Backfilling {len(weeks)} weeks ({weeks[0]} to {weeks[-1]}) with {args.workers} workers...")
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(weeks)), mp_context=context,
+                             initializer=_init_worker,
+                             initargs=(args.cache, str(output_dir), args.gemini_rpm, next_slot, lock,
+                                       args.stand_ins)) as pool:
+        futures = {pool.submit(build_week, week): week for week in weeks}
+        for future in as_completed(futures):
+            week = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"  {week}: failed ({e}); see {output_dir / f'digest-{week.isoformat()}.log'}")
+                continue
+            results.append(result)
+            regional = ', '.join(f"{count} {key}" for key, count in result['regional'].items())
+            print(f"  {week}: {result['global']} global, {regional} regional summaries "
+                  f"({result['gemini_calls']} Gemini calls, {result['cached_summaries']} cached) in {result['seconds']}s")
+    results.sort(key=lambda r: r['week'])
+    (output_dir / 'summary.json').write_text(json.dumps(results, indent=2))
+    print(f"Wrote {len(results)} digests to {output_dir}/ in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
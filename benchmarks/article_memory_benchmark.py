@@ -0,0 +1,90 @@
+"""Memory benchmark for the in-pipeline article representation.
+
+Decodes one NewsAPI-shaped JSON payload of N articles (stand_ins fixtures,
+default 100k) and converts it the way the NewsAPI adapter does, once into the
+previous representation (a dict per article with lowercased summary/content
+copies) and once into slotted sources.Article objects. Reports the memory
+still held afterwards, per article, and the peak while converting.
+
+Usage:
+    python benchmarks/article_memory_benchmark.py --articles 100000
+    python benchmarks/article_memory_benchmark.py --articles 20000 --output memory_results.json
+"""
+import argparse
+import dataclasses
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sources import Article  # noqa: E402
+from stand_ins import generate_newsapi_articles  # noqa: E402
+
+
+def legacy_articles(payload):
+    """The previous shape: raw dicts plus lowercased copies while filtering, then one dict per article."""
+    raw_articles = json.loads(payload)['articles']
+    lowered = [(raw['title'].lower(), (raw['description'] or '').lower(), (raw['content'] or '').lower())
+               for raw in raw_articles]
+    articles = [{'title': raw['title'], 'summary': description, 'content': content, 'url': raw['url'],
+                 'publishedAt': raw['publishedAt'], 'relevance_score': 2, 'source_name': raw['source']['name']}
+                for raw, (_, description, content) in zip(raw_articles, lowered)]
+    return articles
+
+
+def slotted_articles(payload):
+    """The current shape: Articles built straight from the decoded response, lowercased text dropped after filtering."""
+    candidates = [Article(title=raw['title'], url=raw['url'], source='newsapi', summary=raw['description'] or '',
+                          content=raw['content'] or '', published=raw['publishedAt'],
+                          publisher=raw['source']['name'])
+                  for raw in json.loads(payload)['articles']]
+    for article in candidates:
+        article.lowered  # The filter's keyword pass
+    return [dataclasses.replace(article, relevance_score=2) for article in candidates]
+
+
+def measure(build, payload):
+    """Return (articles, retained bytes, peak bytes, seconds) for one conversion."""
+    start = time.perf_counter()
+    build(payload)  # Timed without tracemalloc, which slows allocation-heavy code unevenly
+    seconds = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    articles = build(payload)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return articles, retained, peak, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    payload = json.dumps({'status': 'ok', 'articles': generate_newsapi_articles(args.articles, seed=args.seed)})
+    print(f"{args.articles} articles, {len(payload) / 2**20:.1f} MiB of JSON\n")
+    print(f"{'representation':18s} {'retained (MiB)':>15s} {'bytes/article':>14s} {'peak (MiB)':>11s} {'build (s)':>10s}")
+    results = {}
+    for name, build in [('dict', legacy_articles), ('slotted Article', slotted_articles)]:
+        articles, retained, peak, seconds = measure(build, payload)
+        results[name] = {'retained_bytes': retained, 'bytes_per_article': round(retained / len(articles)),
+                         'peak_bytes': peak, 'build_seconds': round(seconds, 3)}
+        print(f"{name:18s} {retained / 2**20:15.1f} {retained / len(articles):14.0f} "
+              f"{peak / 2**20:11.1f} {seconds:10.2f}")
+        del articles
+    saved = 1 - results['slotted Article']['retained_bytes'] / results['dict']['retained_bytes']
+    print(f"\nSlotted Articles hold {saved:.0%} less memory than article dicts")
+    if args.output:
+        Path(args.output).write_text(json.dumps({'articles': args.articles, 'results': results}, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
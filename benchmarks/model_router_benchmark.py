@@ -0,0 +1,88 @@
+"""Offline tail-latency benchmark for the tiered Gemini model router.
+
+Sends the same prompts to a stub primary model alone and to a ModelRouter
+(stub primary + stub fallback), both with configurable latency distributions,
+and reports p50/p90/p99/max per-call latency, the share of calls served by
+each tier and the number of hedged requests.
+
+Usage:
+    python benchmarks/model_router_benchmark.py --calls 200 --primary-median 0.05 --primary-sigma 1.0
+    python benchmarks/model_router_benchmark.py --spike 1.0 --spike-probability 0.05 --deadline 0.15
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model_router import ModelRouter  # noqa: E402
+from stand_ins import StubGeminiModel, lognormal_latency, spiky_latency  # noqa: E402
+
+PROMPT = "Article:\nGlobal News: Benchmark article\nSome summary text\n"
+
+
+def percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run(model, calls, concurrency):
+    """Issue `calls` prompts and return per-call latencies (seconds) and the tier that served each."""
+    def one(_):
+        start = time.perf_counter()
+        response = model.generate_content(PROMPT)
+        return time.perf_counter() - start, getattr(response, 'tier', 'primary')
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, range(calls)))
+
+
+def report(label, results):
+    latencies = sorted(latency for latency, _ in results)
+    tiers = {}
+    for _, tier in results:
+        tiers[tier] = tiers.get(tier, 0) + 1
+    share = ', '.join(f"{tier} {count / len(results):.0%}" for tier, count in sorted(tiers.items()))
+    print(f"{label:14s} p50 {percentile(latencies, 50):7.3f}s  p90 {percentile(latencies, 90):7.3f}s  "
+          f"p99 {percentile(latencies, 99):7.3f}s  max {latencies[-1]:7.3f}s  served: {share}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=1, help='Calls in flight at once (the pipeline uses 1)')
+    parser.add_argument('--primary-median', type=float, default=0.05, help='Primary model median latency (s)')
+    parser.add_argument('--primary-sigma', type=float, default=0.8, help='Log-normal sigma of primary latency')
+    parser.add_argument('--spike', type=float, default=0.0,
+                        help='If set, primary latency is this many seconds with --spike-probability (else median)')
+    parser.add_argument('--spike-probability', type=float, default=0.05)
+    parser.add_argument('--primary-failure-rate', type=float, default=0.0)
+    parser.add_argument('--fallback-median', type=float, default=0.03, help='Fallback model median latency (s)')
+    parser.add_argument('--fallback-sigma', type=float, default=0.3)
+    parser.add_argument('--deadline', type=float, default=0.1, help='Router deadline before hedging (s)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    def primary(seed):
+        if args.spike:
+            latency = spiky_latency(args.primary_median, args.spike, args.spike_probability)
+        else:
+            latency = lognormal_latency(args.primary_median, args.primary_sigma)
+        return StubGeminiModel(latency=latency, seed=seed, name='primary', failure_rate=args.primary_failure_rate)
+
+    fallback = StubGeminiModel(latency=lognormal_latency(args.fallback_median, args.fallback_sigma),
+                               seed=args.seed + 1, name='fallback')
+    router = ModelRouter([('primary', primary(args.seed)), ('fallback', fallback)], deadline=args.deadline)
+
+    print(f"{args.calls} calls, concurrency {args.concurrency}, deadline {args.deadline}s")
+    if not args.primary_failure_rate:
+        report('primary only', run(primary(args.seed), args.calls, args.concurrency))
+    report('router', run(router, args.calls, args.concurrency))
+    stats = router.stats()
+    print(f"hedged requests: {stats['hedges']}, failures: {stats['failures']}")
+
+
+if __name__ == "__main__":
+    main()
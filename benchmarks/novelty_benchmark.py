@@ -0,0 +1,85 @@
+"""Benchmark for the cross-week novelty index.
+
+Fills an index (novelty.NoveltyIndex, in a temporary directory) with N
+stored articles from the stand-in NewsAPI fixtures spread over the index's
+window, then screens a run's worth of candidates against it. Reports the
+time to add a digest's articles (which rewrites the memory-mapped matrix),
+the time to screen the candidates and the index size on disk.
+
+Usage:
+    python benchmarks/novelty_benchmark.py --stored 100 500 2000 --candidates 300
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import novelty  # noqa: E402
+from sources import Article  # noqa: E402
+from stand_ins import generate_newsapi_articles  # noqa: E402
+
+DIGEST_DATE = date(2025, 3, 31)
+
+
+def articles(count, seed):
+    return [Article(title=raw['title'], url=f"{raw['url']}-{seed}", source='newsapi', summary=raw['description'],
+                    content=raw['content'], published=raw['publishedAt'])
+            for raw in generate_newsapi_articles(count, seed=seed)]
+
+
+def fill(index, count, seed):
+    """Store `count` articles as the previous weeks' digests; returns the seconds per weekly add."""
+    stored = articles(count, seed)
+    per_week = -(-count // index.weeks)
+    times = []
+    for week in range(index.weeks):
+        digest_date = (DIGEST_DATE - timedelta(weeks=index.weeks - week)).isoformat()
+        start = time.perf_counter()
+        index.add(stored[week * per_week:(week + 1) * per_week], digest_date)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stored', type=int, nargs='+', default=[100, 500, 2000])
+    parser.add_argument('--candidates', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    candidates = articles(args.candidates, args.seed + 1)
+    print(f"{'stored':>8s} {'MB':>7s} {'add ms':>8s} {'screen ms':>10s} {'us/candidate':>13s}")
+    results = []
+    for count in args.stored:
+        with tempfile.TemporaryDirectory(prefix='novelty-bench-') as tmp:
+            index = novelty.NoveltyIndex(str(Path(tmp) / 'index'))
+            add_seconds = fill(index, count, args.seed)
+            index = novelty.NoveltyIndex(str(Path(tmp) / 'index'))  # As a run opens it: mapped, not read
+            index.repeats(candidates, DIGEST_DATE.isoformat(), 0.4)
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                index.repeats(candidates, DIGEST_DATE.isoformat(), 0.4)
+                times.append(time.perf_counter() - start)
+            screen = float(np.median(times))
+            size = (Path(tmp) / 'index.npy').stat().st_size / 1e6
+        results.append({'stored': count, 'candidates': args.candidates, 'index_mb': round(size, 2),
+                        'add_ms': round(1000 * add_seconds, 2), 'screen_ms': round(1000 * screen, 2)})
+        print(f"{count:8d} {size:7.1f} {1000 * add_seconds:8.1f} {1000 * screen:10.1f} "
+              f"{1e6 * screen / args.candidates:13.1f}")
+    if args.output:
+        Path(args.output).write_text(json.dumps({'seed': args.seed, 'results': results}, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Offline end-to-end benchmark of the weekly digest pipeline.
+
+Runs each stage of daily_emailer.py (and main() as a whole) against the local
+stand-ins in stand_ins.py and records wall time, external calls made and peak
+Python memory per stage. Results are written to JSON so runs from different
+commits can be compared with --compare.
+
+Usage:
+    python benchmarks/pipeline_benchmark.py --gemini-latency 0.05 --output bench_results.json
+    python benchmarks/pipeline_benchmark.py --compare old_results.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+# daily_emailer reads its configuration at import time
+os.environ.setdefault('GEMINI_API_KEY', 'stand-in-key')
+os.environ.setdefault('NEWS_API_KEY', 'stand-in-key')
+os.environ.setdefault('SENDER_EMAIL', 'digest@example.com')
+os.environ.setdefault('SENDER_PASSWORD', 'stand-in-password')
+os.environ.setdefault('RECIPIENT_EMAIL_BULLETS', 'reader@example.com')
+os.environ.setdefault('SMTP_SERVER', '127.0.0.1')
+os.environ.setdefault('SMTP_PORT', '465')
+os.environ.setdefault('TRACE_REPORT_PATH', '')  # Don't append benchmark runs to the production run report
+
+import daily_emailer  # noqa: E402
+import sources  # noqa: E402
+from stand_ins import LocalStandIns  # noqa: E402
+
+
+def git_commit():
+    """Return the current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def measure(stand_ins, func, *args):
+    """Run func once and return (result, metrics) for wall time, calls and peak memory."""
+    calls_before = stand_ins.calls.snapshot()
+    tracemalloc.reset_peak()
+    start_current, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    result = func(*args)
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    calls_after = stand_ins.calls.snapshot()
+    calls = {name: count - calls_before.get(name, 0) for name, count in calls_after.items()
+             if count - calls_before.get(name, 0)}
+    return result, {
+        'wall_seconds': round(wall, 6),
+        'peak_memory_bytes': max(peak - start_current, 0),
+        'calls': calls,
+    }
+
+
+def fetch(source):
+    """Run one source adapter for the week ending now (US/Eastern), as ingest_sources() does."""
+    return source.fetch(daily_emailer.datetime.now(daily_emailer.pytz.timezone('US/Eastern')))
+
+
+def summarize_all(articles, region=None):
+    """Generate bullet points for every article, as main() does."""
+    summaries = []
+    for article in articles:
+        bullets, url, _ = daily_emailer.generate_bullet_points(article, region=region)
+        summaries.append({'summary': bullets, 'url': url, 'title': article.title, 'day': article.day})
+    return summaries
+
+
+def render(global_summaries, aus_summaries):
+    """Render both digest sections to HTML."""
+    return (daily_emailer.format_global_articles_by_day(global_summaries)
+            + daily_emailer.format_articles_html(aus_summaries, daily_emailer.SEGMENTS[0]['adjective']))
+
+
+def run_once(args):
+    """Run every stage once against fresh stand-ins and return per-stage metrics."""
+    stages = {}
+    with LocalStandIns(daily_emailer, gemini_latency=args.gemini_latency, gemini_jitter=args.gemini_jitter,
+                       http_latency=args.http_latency, smtp_latency=args.smtp_latency,
+                       newsapi_count=args.newsapi_articles, seed=args.seed) as stand_ins:
+        tldr = sources.TldrSource(daily_emailer.TLDR_BASE_URL, daily_emailer.fetcher,
+                                  feed_url=daily_emailer.TLDR_FEED_URL)
+        tldr_articles, stages['scrape'] = measure(stand_ins, fetch, tldr)
+        segment = daily_emailer.SEGMENTS[0]
+        newsapi = sources.NewsApiSource(segment, daily_emailer.NEWS_API_KEY, daily_emailer.fetcher)
+        aus_articles, stages['newsapi'] = measure(stand_ins, fetch, newsapi)
+        aus_articles = daily_emailer.top_regional_articles(aus_articles)
+        aus_articles, stages['enrich'] = measure(stand_ins, daily_emailer.enrich_regional_articles, aus_articles)
+        global_summaries, stages['generate_global'] = measure(stand_ins, summarize_all, tldr_articles)
+        aus_summaries, stages['generate_australian'] = measure(stand_ins, summarize_all, aus_articles,
+                                                               segment['adjective'])
+        _, stages['render'] = measure(stand_ins, render, global_summaries, aus_summaries)
+        _, stages['send'] = measure(stand_ins, daily_emailer.send_bullet_points_email, global_summaries, aus_summaries)
+
+        original_should_send = daily_emailer.should_send_email
+        daily_emailer.should_send_email = lambda: True
+        try:
+            _, stages['main'] = measure(stand_ins, daily_emailer.main)
+        finally:
+            daily_emailer.should_send_email = original_should_send
+    return stages
+
+
+def aggregate(runs):
+    """Collapse repeated runs to the median wall time and max peak memory per stage."""
+    result = {}
+    for stage in runs[0]:
+        walls = sorted(run[stage]['wall_seconds'] for run in runs)
+        result[stage] = {
+            'wall_seconds': walls[len(walls) // 2],
+            'wall_seconds_min': walls[0],
+            'wall_seconds_max': walls[-1],
+            'peak_memory_bytes': max(run[stage]['peak_memory_bytes'] for run in runs),
+            'calls': runs[0][stage]['calls'],
+        }
+    return result
+
+
+def compare(current, baseline_path):
+    """Print per-stage wall time and memory ratios against an earlier results file."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nComparison against {baseline_path} (commit {baseline.get('commit')}):")
+    for stage, metrics in current['stages'].items():
+        old = baseline['stages'].get(stage)
+        if not old:
+            print(f"{stage:22s} new stage")
+            continue
+        wall_ratio = metrics['wall_seconds'] / old['wall_seconds'] if old['wall_seconds'] else float('inf')
+        mem_ratio = metrics['peak_memory_bytes'] / old['peak_memory_bytes'] if old['peak_memory_bytes'] else float('inf')
+        print(f"{stage:22s} wall x{wall_ratio:.2f}  peak memory x{mem_ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage; the median is reported')
+    parser.add_argument('--gemini-latency', type=float, default=0.0, help='Stub Gemini latency per call (s)')
+    parser.add_argument('--gemini-jitter', type=float, default=0.0, help='Extra uniform random Gemini latency (s)')
+    parser.add_argument('--http-latency', type=float, default=0.0, help='Fixture HTTP server latency per request (s)')
+    parser.add_argument('--smtp-latency', type=float, default=0.0, help='SMTP sink latency per command (s)')
+    parser.add_argument('--newsapi-articles', type=int, default=100, help='Articles served by the fake NewsAPI')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results.json', help='Where to write the JSON results')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    parser.add_argument('--quiet', action='store_true', help='Silence the pipeline print output')
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)  # The email template loads its images from relative paths
+    tracemalloc.start()
+    runs = []
+    for _ in range(args.repeat):
+        if args.quiet:
+            with open(os.devnull, 'w') as devnull:
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    runs.append(run_once(args))
+                finally:
+                    sys.stdout = stdout
+        else:
+            runs.append(run_once(args))
+    tracemalloc.stop()
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'parameters': {k: v for k, v in vars(args).items() if k not in ('output', 'compare', 'quiet')},
+        'stages': aggregate(runs),
+    }
+    Path(args.output).write_text(json.dumps(results, indent=2))
+
+    print(f"\n{'stage':22s} {'wall (s)':>10s} {'peak mem (KiB)':>15s}  calls")
+    for stage, metrics in results['stages'].items():
+        print(f"{stage:22s} {metrics['wall_seconds']:10.4f} {metrics['peak_memory_bytes'] / 1024:15.1f}  {metrics['calls']}")
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
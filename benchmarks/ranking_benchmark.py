@@ -0,0 +1,92 @@
+"""Benchmark for picking a segment's regional top 5.
+
+Builds N candidate Articles from the stand-in NewsAPI fixtures (as the
+NewsAPI adapter would after filtering) and picks the top 5 twice: by the
+keyword-hit score (REGIONAL_RANKER=keyword) and with ranking.rank() (TF-IDF
+relevance to the AI profile plus MMR). Reports the time per pick, the mean
+profile relevance of the picked articles and how alike they are (mean
+pairwise cosine similarity; lower means more varied).
+
+Usage:
+    python benchmarks/ranking_benchmark.py --candidates 100 300 1000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ranking  # noqa: E402
+from sources import Article  # noqa: E402
+from stand_ins import generate_newsapi_articles  # noqa: E402
+
+
+def candidates(count, seed):
+    articles = []
+    for raw in generate_newsapi_articles(count, seed=seed):
+        text = f"{raw['title']} {raw['description']} {raw['content']}".lower()
+        # A stand-in for the keyword filter's hit count
+        score = sum(text.count(keyword) for keyword in ('artificial intelligence', 'machine learning', ' ai ', 'model'))
+        articles.append(Article(title=raw['title'], url=raw['url'], source='newsapi', summary=raw['description'],
+                                content=raw['content'], published=raw['publishedAt'],
+                                publisher=raw['source']['name'], relevance_score=score))
+    return articles
+
+
+def keyword_pick(articles, limit=5):
+    return sorted(articles, key=lambda x: (x.relevance_score, x.published), reverse=True)[:limit]
+
+
+def quality(articles, picked):
+    """(mean profile relevance, mean pairwise similarity) of the picked articles, scored over all candidates."""
+    documents = [ranking.terms(' '.join([title] * ranking.TITLE_WEIGHT + [summary, content]))
+                 for title, summary, content in (article.lowered for article in articles)]
+    matrix, idf, vocabulary = ranking.tfidf(documents, ranking.AI_PROFILE)
+    scores = ranking.relevance(matrix, idf, vocabulary)
+    rows = [articles.index(article) for article in picked]
+    similarity = (matrix[rows] @ matrix[rows].T).toarray()
+    pairs = similarity[np.triu_indices(len(rows), k=1)]
+    return float(scores[rows].mean()), float(pairs.mean())
+
+
+def timed(pick, articles, repeat):
+    pick(articles)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        picked = pick(articles)
+        times.append(time.perf_counter() - start)
+    return picked, 1000 * float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--candidates', type=int, nargs='+', default=[100, 300, 1000])
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    print(f"{'candidates':>10s} {'ranker':>8s} {'ms/pick':>8s} {'relevance':>10s} {'similarity':>11s}  picked titles")
+    results = []
+    for count in args.candidates:
+        articles = candidates(count, args.seed)
+        for name, pick in [('keyword', keyword_pick), ('tfidf', ranking.rank)]:
+            picked, ms = timed(pick, articles, args.repeat)
+            relevance, similarity = quality(articles, picked)
+            results.append({'candidates': count, 'ranker': name, 'ms_per_pick': round(ms, 3),
+                            'relevance': round(relevance, 4), 'similarity': round(similarity, 4),
+                            'picked': [article.title for article in picked]})
+            titles = '; '.join(article.title for article in picked[:3])
+            print(f"{count:10d} {name:>8s} {ms:8.2f} {relevance:10.3f} {similarity:11.3f}  {titles}...")
+    if args.output:
+        Path(args.output).write_text(json.dumps({'seed': args.seed, 'results': results}, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Offline delivery benchmark for the digest email.
+
+Builds the weekly digest email (HTML body plus inline logo and badges) and
+sends it with send_bullet_points_email() to a local SMTP sink (stand_ins.SmtpSink)
+for each recipient count given. The sink can add latency per SMTP command and
+cap the recipients it accepts per message, as real servers do. Reports the
+time to build the message, send throughput (messages and recipient
+deliveries per second), bytes on the wire, connections and commands used,
+and recipients refused.
+
+Usage:
+    python benchmarks/smtp_delivery_benchmark.py --recipients 100 5000 50000
+    python benchmarks/smtp_delivery_benchmark.py --recipients 5000 --latency RCPT=0.0005 --latency DATA=0.05 --max-recipients 1000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+# daily_emailer reads its configuration at import time
+os.environ.setdefault('GEMINI_API_KEY', 'stand-in-key')
+os.environ.setdefault('NEWS_API_KEY', 'stand-in-key')
+os.environ.setdefault('SENDER_EMAIL', 'digest@example.com')
+os.environ.setdefault('SENDER_PASSWORD', 'stand-in-password')
+os.environ.setdefault('SMTP_SERVER', '127.0.0.1')
+os.environ.setdefault('SMTP_PORT', '465')
+os.environ.setdefault('TRACE_REPORT_PATH', '')  # Don't append benchmark runs to the production run report
+
+import daily_emailer  # noqa: E402
+import tracing  # noqa: E402
+from stand_ins import SmtpSink  # noqa: E402
+
+BULLETS = "\n".join(f"- Key point {n} about the story, with enough words to look like a real summary line."
+                    for n in range(1, 6))
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+
+
+def digest_items():
+    """A full week's summary items: 15 global (3 per weekday) and 5 regional."""
+    global_items = [{'summary': BULLETS, 'url': f"https://example.com/global/{i}", 'title': f"Global story {i}",
+                     'day': DAYS[i // 3], 'date': f"2025-03-0{3 + i // 3}"} for i in range(15)]
+    regional_items = [{'summary': BULLETS, 'url': f"https://example.com.au/regional/{i}",
+                       'title': f"Regional story {i}"} for i in range(5)]
+    return global_items, regional_items
+
+
+def parse_latency(values):
+    """['RCPT=0.001', ...] -> {'RCPT': 0.001, ...}"""
+    latency = {}
+    for value in values or []:
+        verb, _, seconds = value.partition('=')
+        latency[verb.strip().upper()] = float(seconds)
+    return latency
+
+
+def run(sink, recipients, repeat):
+    """Build and send the digest `repeat` times to `recipients` addresses; returns the measurements."""
+    global_items, regional_items = digest_items()
+    segment = dict(daily_emailer.SEGMENTS[0], recipients=[f"reader{i:06d}@example.com" for i in range(recipients)])
+
+    build_seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        msg = daily_emailer.build_bullet_points_message(global_items, regional_items, segment)
+        message_bytes = len(msg.as_string())
+        build_seconds.append(time.perf_counter() - start)
+
+    calls_before, bytes_before, messages_before = sink.calls.snapshot(), sink.bytes_received, len(sink.messages)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            daily_emailer.send_bullet_points_email(global_items, regional_items, segment)
+    send_seconds = time.perf_counter() - start
+    calls = {name: count - calls_before.get(name, 0) for name, count in sink.calls.snapshot().items()}
+    messages = sink.messages[messages_before:]
+    delivered = sum(message['recipients'] for message in messages)
+    return {
+        'recipients': recipients,
+        'build_ms': round(1000 * min(build_seconds), 2),
+        'message_bytes': message_bytes,
+        'send_seconds': round(send_seconds, 4),
+        'messages': len(messages),
+        'messages_per_second': round(len(messages) / send_seconds, 2),
+        'deliveries_per_second': round(delivered / send_seconds, 1),
+        'delivered': delivered,
+        'refused': calls.get('smtp_rcpt_refused', 0),
+        'wire_bytes': sink.bytes_received - bytes_before,
+        'connections': calls.get('smtp_connections', 0),
+        'commands': calls.get('smtp_commands', 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recipients', type=int, nargs='+', default=[100, 5000, 50000])
+    parser.add_argument('--repeat', type=int, default=1, help='Sends per recipient count')
+    parser.add_argument('--command-latency', type=float, default=0.0, help='Seconds the sink waits before every reply')
+    parser.add_argument('--latency', action='append', metavar='VERB=SECONDS',
+                        help='Per-command sink latency overriding --command-latency, e.g. RCPT=0.001 (repeatable)')
+    parser.add_argument('--max-recipients', type=int, default=0,
+                        help='Recipients the sink accepts per message; the rest get a 452 (default 0 = no limit)')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)  # The inline images are read from assets/
+    tracing.reset()
+    sink = SmtpSink(command_latency=args.command_latency, verb_latency=parse_latency(args.latency),
+                    max_recipients=args.max_recipients).start()
+    original_connection = daily_emailer.open_smtp_connection
+    daily_emailer.open_smtp_connection = sink.connect
+    results = []
+    try:
+        print(f"{'recipients':>10s} {'build (ms)':>10s} {'msg (KiB)':>9s} {'send (s)':>9s} {'msgs/s':>8s} "
+              f"{'rcpts/s':>9s} {'refused':>8s} {'wire (KiB)':>10s} {'conns':>6s} {'cmds':>7s}")
+        for recipients in args.recipients:
+            result = run(sink, recipients, args.repeat)
+            results.append(result)
+            print(f"{recipients:10d} {result['build_ms']:10.1f} {result['message_bytes'] / 1024:9.0f} "
+                  f"{result['send_seconds']:9.3f} {result['messages_per_second']:8.2f} "
+                  f"{result['deliveries_per_second']:9.0f} {result['refused']:8d} {result['wire_bytes'] / 1024:10.0f} "
+                  f"{result['connections']:6d} {result['commands']:7d}")
+    finally:
+        daily_emailer.open_smtp_connection = original_connection
+        sink.stop()
+    if args.output:
+        Path(args.output).write_text(json.dumps({'command_latency': args.command_latency,
+                                                 'latency': parse_latency(args.latency),
+                                                 'max_recipients': args.max_recipients,
+                                                 'results': results}, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
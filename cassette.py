@@ -0,0 +1,269 @@
+"""Record/replay cassettes for every external interaction of a digest run.
+
+`--record run.cassette` captures TLDR and NewsAPI HTTP exchanges (anything
+sent through `requests`), Gemini prompts and responses, and SMTP transactions
+into one gzip-compressed JSON file. Every entry is stored once under a short
+hash of its request and listed in an index, so replay is a dictionary lookup.
+
+`--replay run.cassette` serves those interactions back without touching the
+network and pins the clock to the moment the cassette was recorded, so the
+date-based TLDR URLs and NewsAPI windows line up with what was captured.
+
+In both modes the run's caches, stores, saved digests, archive and run report
+go to a temporary directory. A replay never touches production state, and a
+recording captures every call rather than what the real caches skip.
+"""
+import gzip
+import hashlib
+import json
+import tempfile
+import threading
+from datetime import datetime, timezone
+from contextlib import nullcontext
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import archive
+import clock
+import tracing
+
+CASSETTE_VERSION = 2  # 2: HTTP keys include the scheme and host
+# Emailer state paths moved to the temporary directory, with the file name each gets there
+STATE_PATHS = {
+    'LAST_DIGEST_PATH': 'last_digest.json',
+    'DIGEST_HISTORY_DIR': 'digests',
+    'NOVELTY_INDEX_PATH': 'novelty_index',
+    'INGEST_STORE_PATH': 'weekly_ingest.json',
+    'ENRICH_CACHE_PATH': 'enrichment_cache.json',
+    'RELEVANCE_CACHE_PATH': 'relevance_cache.json',
+}
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _key(kind, *parts):
+    digest = hashlib.sha1('\x1f'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:16]
+    return f"{kind}:{digest}"
+
+
+class _ReplayedResponse:
+    """Stands in for a Gemini response object in replay mode."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class _CassetteModel:
+    """Wraps a Gemini model so generate_content() goes through the cassette."""
+
+    def __init__(self, cassette, inner):
+        self._cassette = cassette
+        self._inner = inner
+        self.model_name = getattr(inner, 'model_name', 'gemini')
+
+    def generate_content(self, prompt, **kwargs):
+        key = _key('gemini', prompt)
+        if self._cassette.replaying:
+            return _ReplayedResponse(self._cassette.play(key)['text'])
+        response = self._inner.generate_content(prompt, **kwargs)
+        self._cassette.record(key, {'model': self.model_name, 'prompt_chars': len(str(prompt)), 'text': response.text})
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class _CassetteSMTP:
+    """Wraps an SMTP connection; records transactions, or fakes the server in replay mode."""
+
+    def __init__(self, cassette, inner=None):
+        self._cassette = cassette
+        self._inner = inner
+
+    def login(self, user, password):
+        if self._inner is not None:
+            return self._inner.login(user, password)
+        return (235, b'2.7.0 Authentication successful (replayed)')
+
+    def sendmail(self, from_addr, to_addrs, msg, *args, **kwargs):
+        recipients = [to_addrs] if isinstance(to_addrs, str) else list(to_addrs)
+        key = _key('smtp', from_addr, *sorted(recipients))
+        if self._cassette.replaying:
+            return self._cassette.play(key)['refused']
+        refused = self._inner.sendmail(from_addr, to_addrs, msg, *args, **kwargs)
+        size = len(msg.encode('utf-8') if isinstance(msg, str) else msg)
+        self._cassette.record(key, {'from': from_addr, 'recipients': len(recipients), 'bytes': size,
+                                    'refused': refused})
+        return refused
+
+    def send_message(self, msg, from_addr=None, to_addrs=None, **kwargs):
+        from_addr = from_addr or msg['From']
+        to_addrs = to_addrs or [a.strip() for a in (msg['To'] or '').split(',') if a.strip()]
+        return self.sendmail(from_addr, to_addrs, msg.as_string())
+
+    def quit(self):
+        if self._inner is not None:
+            return self._inner.quit()
+        return (221, b'Bye (replayed)')
+
+    def close(self):
+        if self._inner is not None:
+            self._inner.close()
+
+    def __getattr__(self, name):
+        if self._inner is None:
+            return lambda *args, **kwargs: (250, b'OK (replayed)')
+        return getattr(self._inner, name)
+
+
+class Cassette:
+    """A recorded set of external interactions, installed into an emailer module with `with`."""
+
+    def __init__(self, path, mode, module):
+        if mode not in ('record', 'replay'):
+            raise ValueError("mode must be 'record' or 'replay'")
+        self.path = path
+        self.mode = mode
+        self.module = module
+        self.entries = []
+        self.index = {}
+        self.recorded_at = datetime.now(timezone.utc)
+        self._cursors = {}
+        self._saved = []
+        self._tmp = None
+        # Sources, segments and enrichment record and replay from pool threads
+        self._lock = threading.Lock()
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    # --- Storage ---
+
+    def load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {self.path}: {data.get('version')}")
+        self.entries = data['entries']
+        self.index = data['index']
+        self.recorded_at = datetime.fromisoformat(data['recorded_at'])
+
+    def save(self):
+        data = {'version': CASSETTE_VERSION, 'recorded_at': self.recorded_at.isoformat(),
+                'index': self.index, 'entries': self.entries}
+        with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    def record(self, key, entry):
+        with self._lock:
+            self.index.setdefault(key, []).append(len(self.entries))
+            self.entries.append(entry)
+
+    def play(self, key):
+        """Return the next recorded entry for key; repeats the last one once exhausted."""
+        positions = self.index.get(key)
+        if not positions:
+            raise CassetteMiss(f"No recorded interaction for {key} in {self.path}")
+        with self._lock:
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+        return self.entries[positions[min(cursor, len(positions) - 1)]]
+
+    # --- HTTP (requests) ---
+
+    def _send(self, original_send):
+        cassette = self
+
+        def send(session, request, **kwargs):
+            body = request.body or b''
+            # Pages with the same path on different sites are different requests. The stand-ins
+            # listen on a new port every run, so a loopback host is keyed without its port
+            parts = urlsplit(request.url)
+            host = parts.hostname if parts.hostname in LOOPBACK_HOSTS else parts.netloc
+            key = _key('http', request.method, parts.scheme, host, parts.path, parts.query, hashlib.sha1(
+                body if isinstance(body, bytes) else body.encode('utf-8')).hexdigest())
+            if cassette.replaying:
+                entry = cassette.play(key)
+                response = requests.Response()
+                response.status_code = entry['status']
+                response.reason = entry['reason']
+                response.headers = CaseInsensitiveDict(entry['headers'])
+                response._content = entry['body'].encode('utf-8')
+                response.encoding = 'utf-8'
+                response.url = request.url
+                response.request = request
+                return response
+            response = original_send(session, request, **kwargs)
+            content_type = response.headers.get('Content-Type', '')
+            cassette.record(key, {'method': request.method, 'url': request.url, 'status': response.status_code,
+                                  'reason': response.reason, 'headers': {'Content-Type': content_type},
+                                  'body': response.text})
+            return response
+        return send
+
+    # --- Installation ---
+
+    def _patch(self, target, name, value):
+        self._saved.append((target, name, getattr(target, name)))
+        setattr(target, name, value)
+
+    def __enter__(self):
+        if self.replaying:
+            self.load()
+        module = self.module
+        self._tmp = tempfile.TemporaryDirectory(prefix='cassette-')
+        for name, filename in STATE_PATHS.items():
+            if hasattr(module, name):
+                self._patch(module, name, str(Path(self._tmp.name) / filename))
+        self._patch(archive, 'ARCHIVE_PATH', str(Path(self._tmp.name) / 'news_archive.db'))
+        self._patch(tracing, 'TRACE_REPORT_PATH', str(Path(self._tmp.name) / 'run_report.jsonl'))
+        self._patch(requests.Session, 'send', self._send(requests.Session.send))
+        self._patch(module, 'model', _CassetteModel(self, module.model))
+        if hasattr(module, 'relevance_model'):
+            self._patch(module, 'relevance_model', _CassetteModel(self, module.relevance_model))
+        if hasattr(module, 'open_smtp_connection'):
+            open_connection = module.open_smtp_connection
+            if self.replaying:
+                self._patch(module, 'open_smtp_connection', lambda: _CassetteSMTP(self))
+            else:
+                self._patch(module, 'open_smtp_connection', lambda: _CassetteSMTP(self, open_connection()))
+        if self.replaying:
+            self._patch(module, 'datetime', clock.frozen_datetime(self.recorded_at))
+            if hasattr(module, 'GEMINI_CALL_DELAY'):
+                self._patch(module, 'GEMINI_CALL_DELAY', 0)
+            if not getattr(module, 'NEWS_API_KEY', None):
+                self._patch(module, 'NEWS_API_KEY', 'replayed')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for target, name, value in reversed(self._saved):
+            setattr(target, name, value)
+        self._saved.clear()
+        self._tmp.cleanup()
+        if not self.replaying:
+            self.save()
+            print(f"Cassette with {len(self.entries)} interactions written to {self.path}")
+        return False
+
+
+def add_arguments(parser):
+    """Add the --record and --replay options to an entry point's parser."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--record', metavar='CASSETTE', help='Record all external I/O to this cassette file')
+    group.add_argument('--replay', metavar='CASSETTE', help='Serve all external I/O from this cassette file')
+
+
+def from_args(args, module):
+    """Return the cassette context selected on the command line (a no-op when neither flag is set)."""
+    if args.record:
+        return Cassette(args.record, 'record', module)
+    if args.replay:
+        return Cassette(args.replay, 'replay', module)
+    return nullcontext()
@@ -0,0 +1,28 @@
+"""Clock control for runs that must behave as if it were another moment.
+
+The emailer modules take every date decision (TLDR issue dates, the NewsAPI
+window, the Monday check, the digest date) from `datetime.now()`. Replacing a
+module's `datetime` with frozen_datetime(moment) makes all of them agree on
+`moment`; replay and backfill runs both rely on this.
+"""
+from datetime import datetime, timezone
+
+
+def frozen_datetime(moment):
+    """Build a datetime subclass whose now() always returns `moment` (an aware datetime)."""
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls.fromtimestamp(moment.timestamp(), tz)
+
+        @classmethod
+        def utcnow(cls):
+            return cls.fromtimestamp(moment.timestamp(), timezone.utc).replace(tzinfo=None)
+    return FrozenDatetime
+
+
+def freeze(module, moment):
+    """Point module's datetime at `moment` for the rest of the process; returns the previous class."""
+    previous = module.datetime
+    module.datetime = frozen_datetime(moment)
+    return previous
@@ -0,0 +1,244 @@
+"""Long-running daemon mode for the weekly digest.
+
+Instead of a cold GitHub Actions runner per day, one process stays up, keeps
+the pooled HTTP session, the Gemini client and an authenticated SMTP
+connection warm, and runs daily_emailer.main() every day at --run-at
+(Australia/Sydney), like the daily cron. main() decides what a day's run
+does: send on Mondays (should_send_email), otherwise ingest with
+INCREMENTAL_INGEST or skip. Runs can also be triggered on demand over a
+localhost HTTP endpoint without restarting the process:
+
+    python daemon.py --run-at 06:00 --port 8765
+    curl -X POST http://127.0.0.1:8765/run      # trigger a run now
+    curl http://127.0.0.1:8765/status           # next/last run as JSON
+"""
+import argparse
+import json
+import signal
+import smtplib
+import threading
+import traceback
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytz
+
+import daily_emailer
+
+SCHEDULE_TZ = pytz.timezone('Australia/Sydney')
+MAX_SLEEP = 3600  # Re-check the schedule at least hourly (DST changes, clock drift)
+
+
+def next_run_time(now, run_at):
+    """Return the next `run_at` (a time) in Australia/Sydney, strictly after now."""
+    local_now = now.astimezone(SCHEDULE_TZ)
+    candidate = SCHEDULE_TZ.localize(datetime.combine(local_now.date(), run_at))
+    if candidate <= local_now:
+        candidate = SCHEDULE_TZ.localize(datetime.combine(local_now.date() + timedelta(days=1), run_at))
+    return candidate
+
+
+class WarmSMTPPool:
+    """Keeps one authenticated SMTP connection open between runs, reconnecting when it goes stale."""
+
+    def __init__(self, connect):
+        self._connect = connect
+        self._server = None
+        self._user = None
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _alive(self):
+        try:
+            return self._server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def acquire(self):
+        with self._lock:
+            if self._server is not None and not self._alive():
+                self.discard()
+            if self._server is None:
+                self._server = self._connect()
+                self._user = None
+                self.connections_opened += 1
+            return _PooledSMTP(self)
+
+    def discard(self):
+        if self._server is not None:
+            try:
+                self._server.close()
+            except Exception:
+                pass
+        self._server, self._user = None, None
+
+    def close(self):
+        with self._lock:
+            if self._server is not None:
+                try:
+                    self._server.quit()
+                except Exception:
+                    pass
+            self.discard()
+
+
+class _PooledSMTP:
+    """What open_smtp_connection() hands out in daemon mode: quit() keeps the connection."""
+
+    def __init__(self, pool):
+        self._pool = pool
+
+    def login(self, user, password):
+        if self._pool._user == user:
+            return (235, b'Already authenticated')
+        result = self._pool._server.login(user, password)
+        self._pool._user = user
+        return result
+
+    def sendmail(self, *args, **kwargs):
+        try:
+            return self._pool._server.sendmail(*args, **kwargs)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self._pool.discard()
+            raise
+
+    def quit(self):
+        return (221, b'Connection kept open by daemon')
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._pool._server, name)
+
+
+class DigestDaemon:
+    """Runs the digest on schedule and on demand, one run at a time."""
+
+    def __init__(self, run_at):
+        self.run_at = run_at
+        self.smtp_pool = WarmSMTPPool(daily_emailer.open_smtp_connection)
+        self.next_run = None
+        self.last_run = None
+        self.runs = 0
+        self._trigger = threading.Event()
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+
+    def install(self):
+        """Route the emailer's SMTP connections through the warm pool."""
+        daily_emailer.open_smtp_connection = self.smtp_pool.acquire
+
+    @property
+    def running(self):
+        return self._run_lock.locked()
+
+    def trigger(self):
+        self._trigger.set()
+
+    def stop(self, *_):
+        self._stop.set()
+        self._trigger.set()
+
+    def run_pipeline(self, force):
+        with self._run_lock:
+            started = datetime.now(pytz.utc)
+            print(f"\n[daemon] Starting {'on-demand' if force else 'scheduled'} run at {started.isoformat()}")
+            ok, error = True, None
+            try:
+                daily_emailer.main(force=force)
+            except Exception as e:
+                ok, error = False, str(e)
+                traceback.print_exc()
+            finished = datetime.now(pytz.utc)
+            self.runs += 1
+            self.last_run = {'started': started.isoformat(), 'finished': finished.isoformat(),
+                             'seconds': round((finished - started).total_seconds(), 3),
+                             'on_demand': force, 'ok': ok, 'error': error}
+            print(f"[daemon] Run finished in {self.last_run['seconds']}s (ok={ok})")
+
+    def status(self):
+        return {'running': self.running, 'runs': self.runs, 'last_run': self.last_run,
+                'next_run': self.next_run.isoformat() if self.next_run else None,
+                'smtp_connections_opened': self.smtp_pool.connections_opened}
+
+    def serve_forever(self):
+        while not self._stop.is_set():
+            now = datetime.now(pytz.utc)
+            self.next_run = next_run_time(now, self.run_at)
+            wait = min((self.next_run - now).total_seconds(), MAX_SLEEP)
+            print(f"[daemon] Next scheduled run {self.next_run.isoformat()} (sleeping up to {wait:.0f}s)")
+            if self._trigger.wait(timeout=max(wait, 0)):
+                self._trigger.clear()
+                if not self._stop.is_set():
+                    self.run_pipeline(force=True)
+            elif datetime.now(pytz.utc) >= self.next_run:
+                self.run_pipeline(force=False)
+        self.smtp_pool.close()
+        print("[daemon] Stopped.")
+
+
+def make_control_server(daemon, port):
+    """Localhost HTTP endpoint for on-demand runs (POST /run) and status (GET /status)."""
+
+    class ControlHandler(BaseHTTPRequestHandler):
+        def _json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/status':
+                self._json(200, daemon.status())
+            else:
+                self._json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/run':
+                self._json(404, {'error': 'not found'})
+            elif daemon.running:
+                self._json(409, {'error': 'a run is already in progress'})
+            else:
+                daemon.trigger()
+                self._json(202, {'status': 'triggered'})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), ControlHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the weekly digest as a long-running daemon.")
+    parser.add_argument('--run-at', default='06:00', help='Daily run time, Australia/Sydney (HH:MM, default 06:00)')
+    parser.add_argument('--port', type=int, default=8765, help='Localhost port for /run and /status (0 disables)')
+    parser.add_argument('--run-now', action='store_true', help='Trigger one run immediately on start-up')
+    args = parser.parse_args()
+
+    run_at = datetime.strptime(args.run_at, '%H:%M').time()
+    daemon = DigestDaemon(run_at)
+    daemon.install()
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+
+    control = None
+    if args.port:
+        control = make_control_server(daemon, args.port)
+        threading.Thread(target=control.serve_forever, daemon=True).start()
+        print(f"[daemon] Control endpoint on http://127.0.0.1:{args.port} (POST /run, GET /status)")
+    if args.run_now:
+        daemon.trigger()
+    try:
+        daemon.serve_forever()
+    finally:
+        if control:
+            control.shutdown()
+
+
+if __name__ == "__main__":
+    main()
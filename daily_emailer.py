@@ -1,22 +1,37 @@
 import os
+import sys
+import argparse
 import google.generativeai as genai
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import smtplib
-from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
 from dotenv import load_dotenv
-from newsapi import NewsApiClient
 import re
-from urllib.parse import urlparse, urlunparse # Added for URL cleaning
 import pytz # Added pytz import
 import html # Added for escaping HTML in email
 import json
 from pathlib import Path
 from email.utils import formataddr
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import tracing
+import http_fetch
+import profiling
+import cassette
+import stand_ins
+import model_router
+import extractive
+import relevance_classifier
+import enrichment
+import archive
+import segments
+import sources
+import email_body
+import ranking
+import novelty
 
 # Load environment variables
 load_dotenv()
@@ -24,19 +39,89 @@ load_dotenv()
 # Configure Gemini API
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-2.0-flash')  # Create model once
+GEMINI_PRIMARY_MODEL = os.getenv('GEMINI_PRIMARY_MODEL', 'gemini-2.0-flash')
+GEMINI_FALLBACK_MODEL = os.getenv('GEMINI_FALLBACK_MODEL', 'gemini-2.0-flash-lite')
+GEMINI_DEADLINE = float(os.getenv('GEMINI_DEADLINE', '20'))  # Seconds before hedging to the fallback model
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '90'))  # Give up on an article after this long
+# Create models once; the router hedges slow primary calls to the cheaper fallback tier
+model = model_router.ModelRouter([
+    ('primary', genai.GenerativeModel(GEMINI_PRIMARY_MODEL)),
+    ('fallback', genai.GenerativeModel(GEMINI_FALLBACK_MODEL)),
+], deadline=GEMINI_DEADLINE, timeout=GEMINI_TIMEOUT)
+
+# Optional second-pass classifier for borderline NewsAPI articles (one batched cheap-model call per run)
+RELEVANCE_CLASSIFIER = os.getenv('RELEVANCE_CLASSIFIER', '').lower() in ('1', 'true', 'yes')
+RELEVANCE_MODEL = os.getenv('RELEVANCE_MODEL', 'gemini-2.0-flash-lite')
+RELEVANCE_CACHE_PATH = os.getenv('RELEVANCE_CACHE_PATH', 'relevance_cache.json')
+relevance_model = genai.GenerativeModel(RELEVANCE_MODEL)
+
+# How each segment's regional top 5 is picked: 'tfidf' ranks on AI-topic relevance and keeps the pick varied
+# (ranking.py); 'keyword' sorts on the keyword-hit score, then recency
+REGIONAL_RANKER = os.getenv('REGIONAL_RANKER', 'tfidf').lower()
+
+# Full-text enrichment of each segment's selected regional articles (NewsAPI truncates 'content' to ~200 chars)
+ENRICH_FULL_TEXT = os.getenv('ENRICH_FULL_TEXT', 'true').lower() in ('1', 'true', 'yes')
+ENRICH_TOKEN_BUDGET = int(os.getenv('ENRICH_TOKEN_BUDGET', '1200'))  # Approximate tokens of page text per article
+ENRICH_CACHE_PATH = os.getenv('ENRICH_CACHE_PATH', 'enrichment_cache.json')
+
+# Cross-week novelty index of the stories recent digests summarized (novelty.py; empty disables)
+NOVELTY_INDEX_PATH = os.getenv('NOVELTY_INDEX_PATH', 'novelty_index')
+NOVELTY_WEEKS = int(os.getenv('NOVELTY_WEEKS', '4'))  # Digests a story is remembered for
+NOVELTY_THRESHOLD = float(os.getenv('NOVELTY_THRESHOLD', '0.4'))  # Cosine similarity at which a story counts as covered
+NOVELTY_ACTION = os.getenv('NOVELTY_ACTION', 'drop').lower()  # 'drop' skips repeats, 'flag' labels them as follow-ups
 
 # Email configuration
 SENDER_EMAIL = os.getenv('SENDER_EMAIL')
 SENDER_PASSWORD = os.getenv('SENDER_PASSWORD')
-# Split recipient emails by comma for different formats
-# Filter out empty strings that might result from trailing commas
-RECIPIENT_EMAILS_BULLETS = [email.strip() for email in os.getenv('RECIPIENT_EMAIL_BULLETS', '').split(',') if email.strip()]
+# Regional editions to build, each with its own recipients (RECIPIENT_EMAIL_BULLETS[_<ID>]); see segments.py
+SEGMENTS = segments.load(os.getenv('SEGMENTS'), os.getenv('SEGMENTS_CONFIG'))
 NEWS_API_KEY = os.getenv('NEWS_API_KEY') # Added News API Key loading
 
 SMTP_SERVER = os.getenv('SMTP_SERVER')
 SMTP_PORT = int(os.getenv('SMTP_PORT'))
 
+# Upstream endpoints and pacing (overridable so runs can target local stand-ins)
+TLDR_BASE_URL = os.getenv('TLDR_BASE_URL', 'https://tldr.tech/ai')
+# TLDR's RSS feed, tried before scraping issue pages (empty = always scrape)
+TLDR_FEED_URL = os.getenv('TLDR_FEED_URL', 'https://tldr.tech/api/rss/ai')
+# Extra RSS/Atom feeds for the global section: comma-separated `url` or `name=url` entries
+RSS_FEEDS = sources.parse_feed_list(os.getenv('RSS_FEEDS'))
+GEMINI_CALL_DELAY = float(os.getenv('GEMINI_CALL_DELAY', '3'))  # Seconds to wait between Gemini calls
+
+# Summaries: 'llm' uses Gemini with the extractive summarizer as fallback, 'draft' is extractive only
+SUMMARY_MODE = os.getenv('SUMMARY_MODE', 'llm').lower()
+GEMINI_CALL_BUDGET = int(os.getenv('GEMINI_CALL_BUDGET', '0'))  # Max Gemini calls per run; 0 = unlimited
+gemini_calls_made = 0
+# Segments summarize in parallel threads; the call budget, pacing and shared cache files are guarded by these
+_gemini_lock = threading.Lock()
+_next_gemini_slot = 0.0
+_cache_lock = threading.Lock()
+
+# Incremental mode: weekday runs ingest and summarize, Monday only assembles and sends
+INCREMENTAL_INGEST = os.getenv('INCREMENTAL_INGEST', '').lower() in ('1', 'true', 'yes')
+INGEST_STORE_PATH = os.getenv('INGEST_STORE_PATH', 'weekly_ingest.json')
+
+# Gmail clips HTML bodies over ~102KB; stay under it with some headroom (0 = no check)
+HTML_SIZE_BUDGET = int(os.getenv('HTML_SIZE_BUDGET', '95000'))
+HTML_SIZE_ACTION = os.getenv('HTML_SIZE_ACTION', 'trim').lower()  # 'trim' drops the oldest global stories, 'warn' only warns
+# The template's inline images: Content-ID -> asset file (preview.py, digest_api.py and backfill.py serve them as files)
+CID_ASSETS = {
+    'logo': 'assets/image001.png',
+    'goldBadge': 'assets/badges/goldBadge.png',
+    'silverBadge': 'assets/badges/silverBadge.png',
+    'bronzeBadge': 'assets/badges/bronzeBadge.png',
+}
+
+# The last run's summaries, kept so preview.py can re-render the digest without fetching anything (empty disables)
+LAST_DIGEST_PATH = os.getenv('LAST_DIGEST_PATH', 'last_digest.json')
+# Every digest's summaries, one <digest date>.json per week, served by digest_api.py (empty disables)
+DIGEST_HISTORY_DIR = os.getenv('DIGEST_HISTORY_DIR', 'digests')
+
+# Shared HTTP session so TLDR and NewsAPI requests reuse pooled connections,
+# wrapped in the fetch layer for timeouts, retries and circuit breaking
+http_session = requests.Session()
+fetcher = http_fetch.Fetcher(http_session)
+
 def save_sent_articles(cache):
     """Save sent articles to cache file."""
     cache_file = Path('sent_articles_cache.json')
@@ -71,309 +156,79 @@ def get_date_range_et():
     
     return from_date, to_date
 
-def get_australian_date_range():
-    """Get weekly date range for Australian news (last 7 days)."""
-    et_tz = pytz.timezone('US/Eastern')
-    et_now = datetime.now(et_tz)
-    
-    to_date = et_now
-    from_date = et_now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=7)
-    print("Fetching Australian news from the past 7 days")
-    
-    return from_date, to_date
-
-def get_australian_ai_news():
-    """Fetches relevant Australian AI news using News API."""
-    try:
-        print("Fetching Australian AI news using News API...")
-        if not NEWS_API_KEY:
-            print("Error: NEWS_API_KEY not found in environment variables.")
-            return []
-
-        newsapi = NewsApiClient(api_key=NEWS_API_KEY)
-
-        # Get weekly date range for Australian news
-        from_date, to_date = get_australian_date_range()
-        from_param = from_date.strftime('%Y-%m-%d')
-        to_param = to_date.strftime('%Y-%m-%d')
-
-        print(f"Searching for news from {from_param} to {to_param}")
-
-        # AI-related keywords for relevance checking (broadened)
-        ai_keywords = [
-            'artificial intelligence', 'ai ', 'machine learning', 'deep learning',
-            'neural network', 'chatbot', 'language model', 'llm', 'ml ',
-            'computer vision', 'nlp ', 'natural language processing',
-            'ai-powered', 'ai powered', 'ai-based', 'ai based',
-            'automation', 'robotics', 'algorithm'
-        ]
-
-        # Combined search query to reduce API calls
-        combined_query = '''
-            ("artificial intelligence" OR "AI" OR "machine learning" OR "deep learning" OR 
-            "neural network" OR "chatbot" OR "language model" OR "LLM" OR 
-            "AI startup" OR "AI policy" OR "AI regulation")
-            AND 
-            (Australia OR Australian OR Sydney OR Melbourne OR Brisbane OR Perth OR Adelaide)
-        '''
-
-        print(f"Querying News API with combined query for date range {from_param} to {to_param}")
-        try:
-            response = newsapi.get_everything(
-                q=combined_query,
-                from_param=from_param,
-                to=to_param,
-                language='en',
-                sort_by='publishedAt',
-                page_size=100  # Increased to get more results in one call
-            )
-            
-            if response['status'] == 'ok':
-                # Filter articles by publishedAt date within our date range
-                valid_articles = [
-                    article for article in response['articles']
-                    if article.get('publishedAt') and 
-                    from_date.date() <= datetime.strptime(article['publishedAt'][:10], '%Y-%m-%d').date() <= to_date.date()
-                ]
-                print(f"Found {len(valid_articles)} articles within date range")
-            else:
-                print(f"Error in query: {response.get('message', 'Unknown error')}")
-                return []
-        
-        except Exception as e:
-            print(f"Error processing query: {str(e)}")
-            return []
-
-        # Deduplicate articles based on URL
-        seen_urls = set()
-        unique_articles = []
-        for article in valid_articles:
-            url = article.get('url', '')
-            if url and url not in seen_urls:
-                seen_urls.add(url)
-                unique_articles.append(article)
-
-        print(f"Total unique articles found for the period: {len(unique_articles)}")
-
-        # Whitelist of trusted Australian news domains
-        australian_sources = [
-            'abc.net.au', 'smh.com.au', 'theage.com.au', 'itnews.com.au',
-            'afr.com', 'news.com.au', 'drive.com.au', 'sbs.com.au', 'theguardian.com.au'
-        ]
-        aus_terms = ['australia', 'australian', 'sydney', 'melbourne', 'brisbane', 'perth', 'adelaide']
-        def is_australian(article):
-            url = article.get('url', '').lower()
-            source_name = article.get('source', {}).get('name', '').lower()
-            title = article.get('title', '').lower()
-            description = article.get('description', '').lower() if article.get('description') else ''
-            content = article.get('content', '').lower() if article.get('content') else ''
-            domain = urlparse(url).netloc
-            # .au domain or whitelisted source
-            if domain.endswith('.au') or any(src in domain for src in australian_sources):
-                return True
-            # Australia/cities in title/desc/content/source
-            if any(term in title for term in aus_terms) or \
-               any(term in description for term in aus_terms) or \
-               any(term in content for term in aus_terms) or \
-               any(term in source_name for term in aus_terms):
-                return True
-            return False
-
-        # Enhanced relevance checking
-        filtered_articles = []
-        for article in unique_articles:
-            title = article.get('title', '').lower()
-            description = article.get('description', '').lower() if article.get('description') else ''
-            content = article.get('content', '').lower() if article.get('content') else ''
-            source_name = article.get('source', {}).get('name', '').lower()
-            url = article.get('url', '').lower()
-
-            # Use improved Australian relevance
-            is_aus = is_australian(article)
-
-            # Check for AI relevance (more strict)
-            ai_relevance_score = sum(
-                2 if keyword in title else  # Higher weight for title matches
-                1 if keyword in description or keyword in content else
-                0
-                for keyword in ai_keywords
-            )
-
-            # Additional context check
-            def has_strong_ai_context(text):
-                ai_term_count = sum(text.count(keyword) for keyword in ai_keywords)
-                ai_in_beginning = any(keyword in text[:100] for keyword in ai_keywords)
-                ai_focus_phrases = [
-                    'artificial intelligence', 'machine learning', 'deep learning',
-                    'ai technology', 'ai development', 'ai research'
-                ]
-                has_focus_phrase = any(phrase in text for phrase in ai_focus_phrases)
-                return (ai_term_count >= 2 and (ai_in_beginning or has_focus_phrase))
-
-            has_context = has_strong_ai_context(title + ' ' + description + ' ' + content)
-
-            if is_aus and ai_relevance_score >= 2 and has_context:
-                filtered_articles.append({
-                    'title': article.get('title', ''),
-                    'summary': description if description else 'No description available.',
-                    'content': content,
-                    'url': article.get('url', ''),
-                    'publishedAt': article.get('publishedAt', ''),
-                    'relevance_score': ai_relevance_score
-                })
-                print(f"Added (Relevant): {article.get('title', '')}")
-                print(f"Source: {source_name}")
-                print(f"AI relevance score: {ai_relevance_score}")
-                print(f"Published at: {article.get('publishedAt', '')}")
-            else:
-                print(f"Skipped: {article.get('title', '')}")
-                print(f"Reason: {'Not Australian' if not is_aus else ''} "
-                      f"{'Low AI relevance' if ai_relevance_score < 2 else ''} "
-                      f"{'Weak AI context' if not has_context else ''}")
-
-        print(f"Total relevant articles found for the period: {len(filtered_articles)}")
-        
-        # Sort by publication date (most recent first) and then relevance score
-        filtered_articles.sort(key=lambda x: (
-            datetime.strptime(x.get('publishedAt', '2000-01-01'), '%Y-%m-%dT%H:%M:%SZ'),
-            x['relevance_score']
-        ), reverse=True)
-        
-        return filtered_articles
-
-    except Exception as e:
-        print(f"Error in get_australian_ai_news: {str(e)}")
-        return []
-
-
-def get_tldr_articles():
-    """Fetches and scrapes TLDR AI articles from the past week (Monday-Friday only)."""
-    try:
-        # Get date range in US/Eastern Time
-        et_tz = pytz.timezone('US/Eastern')
-        et_now = datetime.now(et_tz)
-        
-        # Calculate the date range (past 7 days)
-        end_date = et_now
-        start_date = et_now - timedelta(days=7)
-        
-        print(f"Fetching TLDR articles from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
-        
-        all_articles = []
-        current_date = start_date
-        
-        # Iterate through each day in the range
-        while current_date <= end_date:
-            # Skip weekends (5 = Saturday, 6 = Sunday)
-            if current_date.weekday() >= 5:
-                print(f"Skipping weekend day: {current_date.strftime('%Y-%m-%d')}")
-                current_date += timedelta(days=1)
-                continue
-                
-            date_str = current_date.strftime("%Y-%m-%d")
-            url = f"https://tldr.tech/ai/{date_str}"
-            print(f"\nFetching articles from: {url}")
-
-            # Add a common browser User-Agent header
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-            response = requests.get(url, headers=headers)
-            print(f"Response status code: {response.status_code}")
-
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                sections = soup.find_all('h3')
-                print(f"Found {len(sections)} sections for {date_str}")
-
-                # Find the Headlines & Launches section
-                headlines_section = None
-                for section in sections:
-                    if section.text.strip() == "Headlines & Launches":
-                        headlines_section = section
-                        break
-
-                if headlines_section:
-                    print(f"Found Headlines & Launches section for {date_str}")
-                    # Get all h3 elements after Headlines & Launches until the next section
-                    current = headlines_section.find_next('h3')
-                    articles_for_day = 0
-                    
-                    while current and current.text.strip() != "Research & Innovation":
-                        title_text = current.text.strip()
-                        if '(' in title_text and ')' in title_text:
-                            # Split into title and reading time
-                            parts = title_text.rsplit('(', 1)
-                            title = parts[0].strip()
-                            
-                            # Find the anchor tag containing or related to the headline
-                            anchor_tag = current.find_parent('a')
-                            if not anchor_tag:
-                                print(f"Warning: No anchor tag found for article: {title}")
-                                current = current.find_next('h3')
-                                continue
-                                
-                            # Find the div.newsletter-html that is the immediate next sibling
-                            summary_div = anchor_tag.find_next_sibling('div', class_='newsletter-html')
-                            if not summary_div:
-                                print(f"Warning: No summary div found for article: {title}")
-                                current = current.find_next('h3')
-                                continue
-                                
-                            summary_text = summary_div.text.strip()
-                            if not summary_text:
-                                print(f"Warning: Empty summary for article: {title}")
-                                current = current.find_next('h3')
-                                continue
-                            
-                            # Get the URL and clean it
-                            raw_url = anchor_tag['href']
-                            if not raw_url:
-                                print(f"Warning: No URL found for article: {title}")
-                                current = current.find_next('h3')
-                                continue
-                                
-                            parsed_url = urlparse(raw_url)
-                            url = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, parsed_url.params, '', ''))
-
-                            all_articles.append({
-                                'title': title,
-                                'summary': summary_text,
-                                'url': url,
-                                'date': date_str,
-                                'day': current_date.strftime('%A')  # Add day name for better organization
-                            })
-                            articles_for_day += 1
-                            print(f"Added article {articles_for_day} for {date_str}: {title}")
-                            
-                            # Safety check - TLDR typically has 3 articles per day
-                            if articles_for_day >= 3:
-                                print(f"Reached 3 articles for {date_str}, moving to next day")
-                                break
-                                
-                        current = current.find_next('h3')
-                    
-                    print(f"Total articles found for {date_str}: {articles_for_day}")
-                else:
-                    print(f"Warning: Could not find Headlines & Launches section for {date_str}")
-            else:
-                print(f"Warning: Could not fetch TLDR for {date_str} (Status code: {response.status_code})")
-
-            # Move to next day
-            current_date += timedelta(days=1)
-
-        print(f"\nTotal articles found across all weekdays: {len(all_articles)}")
-        print("Articles by day:")
-        for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']:
-            day_articles = [a for a in all_articles if a['day'] == day]
-            print(f"{day}: {len(day_articles)} articles")
-            
-        return all_articles
-    except Exception as e:
-        print(f"Error in get_tldr_articles: {str(e)}")
-        raise
-
-
-def generate_bullet_points(article, is_australian=False):
-    """Generates 5 bullet points summarizing an article."""
+def classify_borderline(raw_articles):
+    """Decide borderline NewsAPI articles with one batched cheap-model call (verdicts cached per canonical URL).
+
+    sources.ingest() calls this once per run with every segment's borderline articles.
+    """
+    cache = relevance_classifier.load_cache(RELEVANCE_CACHE_PATH)
+    verdicts = relevance_classifier.classify(relevance_model, raw_articles, cache)
+    # A backfill worker may have saved verdicts since we loaded; keep theirs too
+    saved = relevance_classifier.load_cache(RELEVANCE_CACHE_PATH)
+    relevance_classifier.save_cache(RELEVANCE_CACHE_PATH, {**saved, **cache})
+    return verdicts
+
+
+def configured_sources(skip_dates=()):
+    """The source adapters a run ingests: TLDR, NewsAPI once per segment, and any RSS_FEEDS."""
+    configured = [sources.TldrSource(TLDR_BASE_URL, fetcher, skip_dates=skip_dates, feed_url=TLDR_FEED_URL)]
+    classifier = classify_borderline if RELEVANCE_CLASSIFIER else None
+    configured += [sources.NewsApiSource(segment, NEWS_API_KEY, fetcher, classifier=classifier) for segment in SEGMENTS]
+    configured += [sources.FeedSource(url, fetcher, name=name) for name, url in RSS_FEEDS]
+    return configured
+
+
+def ingest_sources(skip_dates=()):
+    """Fetch every configured source concurrently for the week ending now.
+
+    Returns (global articles, {segment id: regional articles}).
+    """
+    et_now = datetime.now(pytz.timezone('US/Eastern'))
+    configured = configured_sources(skip_dates)
+    print(f"\nFetching articles from {len(configured)} sources...")
+    sections = sources.by_section(configured, sources.ingest(configured, et_now))
+    return sections.get('global', []), {segment['id']: sections.get(segment['id'], []) for segment in SEGMENTS}
+
+
+def article_source_text(article, regional=False):
+    """Pick the text to summarize: NewsAPI 'content' when substantially longer than the description."""
+    if regional:
+        # Prioritize using 'content' if available and substantially longer
+        content_text = article.content or ''
+        description_text = article.summary or '' # 'summary' holds the description
+        if content_text and len(content_text) > len(description_text) + 20:
+            return content_text, 'content'
+        return description_text, 'summary/description'
+    # For global news, use the scraped summary
+    return article.summary, 'summary/description'
+
+
+def extractive_bullet_points(article, regional=False, reason='draft'):
+    """Offline fallback: 5 key sentences picked by TextRank, no Gemini call."""
+    text, source_used = article_source_text(article, regional)
+    tracing.debug(f"Extractive bullet points for article: {article.title} (Using {source_used}, {reason})")
+    tracing.count(f"summaries.extractive.{reason}")
+    return extractive.summarize(text, title=article.title), article.url, 'extractive'
+
+
+def generate_bullet_points(article, region=None):
+    """Generates 5 bullet points summarizing an article.
+
+    `region` is the adjective of a regional article's segment (e.g.
+    'Australian'); None for global news. Falls back to the extractive
+    summarizer in draft mode, once the Gemini call budget is spent, or when
+    the Gemini call fails. Returns (bullets, url, model tier that wrote them).
+    """
+    global gemini_calls_made
+    regional = region is not None
+    if SUMMARY_MODE == 'draft':
+        return extractive_bullet_points(article, regional, reason='draft')
+    with _gemini_lock:
+        over_budget = GEMINI_CALL_BUDGET and gemini_calls_made >= GEMINI_CALL_BUDGET
+        if not over_budget:
+            gemini_calls_made += 1
+    if over_budget:
+        return extractive_bullet_points(article, regional, reason='budget')
     try:
         # Construct the prompt for generating 5 key bullet points
         guidelines = """
@@ -384,46 +239,49 @@ Guidelines:
 4. Do not include introductory or concluding sentences, just the bullet points.
 5. Start each bullet point with a standard bullet character (e.g., '-', '*')."""
 
-        if is_australian:
-            guidelines += "\n6. Ensure the Australian context is clear if relevant to the key points."
-            prompt_prefix = "Australian News: "
-            # Prioritize using 'content' if available and substantially longer
-            content_text = article.get('content', '') or ''
-            description_text = article.get('summary', '') or '' # 'summary' key holds description
-            if content_text and len(content_text) > len(description_text) + 20:
-                 summary_to_use = content_text
-                 source_used = 'content'
-            else:
-                 summary_to_use = description_text
-                 source_used = 'summary/description'
+        if regional:
+            guidelines += f"\n6. Ensure the {region} context is clear if relevant to the key points."
+            prompt_prefix = f"{region} News: "
         else:
             prompt_prefix = "Global News: "
-            # For global news, use the scraped summary
-            summary_to_use = article.get('summary', '')
-            source_used = 'summary/description'
+        summary_to_use, source_used = article_source_text(article, regional)
 
         prompt = f"""Generate 5 key bullet points summarizing the following article for a consumer audience.
 {guidelines}
 
 Article:
-{prompt_prefix}{article['title']}
+{prompt_prefix}{article.title}
 {summary_to_use}
 """
-        print(f"Generating bullet points for article: {article['title']} (Using {source_used})")
-        response = model.generate_content(prompt)
-        print("Bullet points generated successfully")
-        # Return the raw text (bullet points) and the URL
-        return response.text, article['url']
+        tracing.debug(f"Generating bullet points for article: {article.title} (Using {source_used})")
+        with tracing.external_call('gemini.generate_content'):
+            response = model.generate_content(prompt)
+        # Record which model tier served this article
+        tier = getattr(response, 'tier', 'primary')
+        tracing.count(f"gemini.tier.{tier}")
+        tracing.debug(f"Bullet points generated successfully (tier: {tier})")
+        # Return the raw text (bullet points), the URL and the tier
+        return response.text, article.url, tier
     except Exception as e:
-        print(f"Error generating bullet points: {str(e)}")
-        raise
+        print(f"Error generating bullet points: {str(e)} - using extractive summary instead")
+        return extractive_bullet_points(article, regional, reason='llm_error')
 
 
+def follow_up_note(article):
+    """A line under a story's title naming the earlier digest's story it follows up ('' for most stories)."""
+    earlier = article.get('follow_up')
+    if not earlier:
+        return ""
+    return (f"<p class='follow-up' style='color: #666; font-style: italic; margin: 0 0 8px;'>Follow-up to "
+            f"<a href='{html.escape(earlier['url'])}' target='_blank'>{html.escape(earlier['title'])}</a> "
+            f"({html.escape(earlier['digest_date'])} digest)</p>")
+
 def format_global_articles_by_day(articles_list):
     """Format global articles grouped by weekday for HTML email."""
     if not articles_list:
         return "<div class='no-updates'><p style='color: #666; font-style: italic;'>No global AI updates available for this week.</p></div>"
-    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+    # TLDR only publishes on weekdays, but RSS feeds can add weekend stories
+    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
     html_output = ""
     for day in days:
         day_articles = [a for a in articles_list if a.get('day') == day]
@@ -447,6 +305,7 @@ def format_global_articles_by_day(articles_list):
             html_output += f"""
                 <div class='article'>
                     <h4>{html.escape(article.get('title', 'No Title'))}</h4>
+                    {follow_up_note(article)}
                     <ul style='color: #333;'>{list_items}</ul>
                     <p class='read-more'><a href='{html.escape(article.get('url', '#'))}' target='_blank'>Read more →</a></p>
                 </div>
@@ -465,13 +324,14 @@ def format_articles_html(articles_list, section_type=""):
             if section_type == "Global":
                 message = "No global AI updates available on weekends."
             else:
-                message = "No Australian AI updates available on weekends."
-        elif section_type == "Australian" and weekday == 0:
-            message = "No Australian AI news found for the weekend period."
-        elif section_type == "Australian":
-            message = "No Australian AI news found for today."
+                message = f"No {section_type or 'regional'} AI updates available on weekends."
         elif section_type == "Global":
             message = "No global AI updates available for today."
+        elif section_type and weekday == 0:
+            # Any other section type is a segment's regional adjective, e.g. "Australian"
+            message = f"No {section_type} AI news found for the weekend period."
+        elif section_type:
+            message = f"No {section_type} AI news found for today."
         else:
             message = "No updates found."
             
@@ -505,39 +365,29 @@ def format_articles_html(articles_list, section_type=""):
         html_output += f"""
             <div class="article">
                 <h4>{html.escape(article.get('title', 'No Title'))}</h4>
+                {follow_up_note(article)}
                 <ul style="color: #333;">{list_items}</ul>
                 <p class="read-more"><a href="{html.escape(article.get('url', '#'))}" target="_blank">Read more →</a></p>
             </div>
         """
     return html_output
 
-def send_bullet_points_email(global_articles_data, australian_articles_data):
-    """Sends the bullet point summaries as an HTML email."""
-    if not RECIPIENT_EMAILS_BULLETS or not any(RECIPIENT_EMAILS_BULLETS):
-        print("Error: No recipient emails configured for bullet points (RECIPIENT_EMAIL_BULLETS).")
-        return
+def open_smtp_connection():
+    """Open a connection to the configured SMTP server."""
+    return smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT)
 
-    try:
-        print(f"Preparing bullet points email via BCC to {len(RECIPIENT_EMAILS_BULLETS)} recipients.")
-        msg = MIMEMultipart()
-        msg['From'] = formataddr(("Responsible AI Australia", SENDER_EMAIL))
-        msg['To'] = ", ".join(RECIPIENT_EMAILS_BULLETS)
-        
-        # Get current time in both ET and AET
-        et_tz = pytz.timezone('US/Eastern')
-        aet_tz = pytz.timezone('Australia/Sydney')
-        et_now = datetime.now(et_tz)
-        aet_now = datetime.now(aet_tz)
-        
-        # Use AET for display, but keep ET in subject for reference
-        msg['Subject'] = f"Weekly AI News Summary - {et_now.strftime('%Y-%m-%d')} (ET)"
-        
-        # Format articles with section type for appropriate messaging
-        global_html = format_global_articles_by_day(global_articles_data)
-        australian_html = format_articles_html(australian_articles_data, "Australian")
+def render_bullet_points_html(global_articles_data, regional_articles_data, segment=None):
+    """Render one segment's weekly digest HTML body (default: the first configured segment)."""
+    segment = segment or SEGMENTS[0]
+    aet_tz = pytz.timezone('Australia/Sydney')
+    aet_now = datetime.now(aet_tz)
+
+    # Format articles with section type for appropriate messaging
+    global_html = format_global_articles_by_day(global_articles_data)
+    regional_html = format_articles_html(regional_articles_data, segment['adjective'])
 
-        # HTML Body with improved styling and logo
-        body = f"""
+    # HTML Body with improved styling and logo
+    return f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -722,9 +572,9 @@ def send_bullet_points_email(global_articles_data, australian_articles_data):
             {global_html}
         </div>
 
-        <h2 class="section-title">Australian AI Updates</h2>
+        <h2 class="section-title">{html.escape(segment['adjective'])} AI Updates</h2>
         <div class="article-section">
-            {australian_html}
+            {regional_html}
         </div>
 
         <div class="footer">
@@ -743,35 +593,99 @@ def send_bullet_points_email(global_articles_data, australian_articles_data):
 </body>
 </html>
 """
-        # Add HTML content
-        msg_html = MIMEText(body, 'html', 'utf-8')
-        msg.attach(msg_html)
 
-        # Add logo image
-        with open('assets/image001.png', 'rb') as f:
+def render_email_html(global_articles_data, regional_articles_data, segment):
+    """The compacted HTML body for one segment, kept within HTML_SIZE_BUDGET (encoded size).
+
+    In 'trim' mode the oldest global stories are dropped until the body fits;
+    the regional top 5 is always kept.
+    """
+    global_articles_data = list(global_articles_data)
+    trimmed = 0
+    while True:
+        html_body = email_body.compact_html(
+            render_bullet_points_html(global_articles_data, regional_articles_data, segment))
+        size = len(email_body.text_part(html_body, 'html').get_payload())
+        if not HTML_SIZE_BUDGET or size <= HTML_SIZE_BUDGET:
+            break
+        if HTML_SIZE_ACTION != 'trim' or not global_articles_data:
+            print(f"Warning: {segment['name']} email HTML is {size} bytes, over the {HTML_SIZE_BUDGET} byte budget; "
+                  f"some clients will clip it")
+            tracing.count('emails.over_budget')
+            break
+        global_articles_data.remove(min(global_articles_data, key=lambda x: x.get('date') or ''))
+        trimmed += 1
+    if trimmed:
+        print(f"Warning: dropped the {trimmed} oldest global stories to keep the {segment['name']} email "
+              f"under {HTML_SIZE_BUDGET} bytes")
+        tracing.count('emails.trimmed_articles', trimmed)
+    tracing.count('emails.html_bytes', size)
+    return html_body
+
+
+def build_bullet_points_message(global_articles_data, regional_articles_data, segment):
+    """Build one segment's digest email.
+
+    multipart/related holds a multipart/alternative (plain text, then the
+    compacted HTML) followed by the inline logo and badge images.
+    """
+    msg = MIMEMultipart('related')
+    msg['From'] = formataddr((segment['sender_name'], SENDER_EMAIL))
+    msg['To'] = ", ".join(segment['recipients'])
+
+    et_tz = pytz.timezone('US/Eastern')
+    et_now = datetime.now(et_tz)
+
+    # Use AET for display, but keep ET in subject for reference
+    msg['Subject'] = f"Weekly AI News Summary - {et_now.strftime('%Y-%m-%d')} (ET)"
+
+    with tracing.span('render', segment=segment['id'], articles=len(global_articles_data) + len(regional_articles_data)):
+        body = render_email_html(global_articles_data, regional_articles_data, segment)
+
+    # Plain text first: clients show the last alternative they can render
+    alternative = MIMEMultipart('alternative')
+    alternative.attach(email_body.text_part(email_body.html_to_text(body), 'plain'))
+    alternative.attach(email_body.text_part(body, 'html'))
+    msg.attach(alternative)
+
+    # Add the logo and badge images
+    for cid, path in CID_ASSETS.items():
+        with open(path, 'rb') as f:
             img = MIMEImage(f.read())
-            img.add_header('Content-ID', '<logo>')
-            img.add_header('Content-Disposition', 'inline', filename='image001.png')
+            img.add_header('Content-ID', f'<{cid}>')
+            img.add_header('Content-Disposition', 'inline', filename=os.path.basename(path))
             msg.attach(img)
+    return msg
+
 
-        # Add badge images
-        badge_files = ['goldBadge', 'silverBadge', 'bronzeBadge']
-        for badge in badge_files:
-            with open(f'assets/badges/{badge}.png', 'rb') as f:
-                img = MIMEImage(f.read())
-                img.add_header('Content-ID', f'<{badge}>')
-                img.add_header('Content-Disposition', 'inline', filename=f'{badge}.png')
-                msg.attach(img)
-
-        print("Connecting to SMTP server for bullet points email...")
-        server = smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT)
-        print("Logging in...")
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        print("Sending bullet points email...")
-        server.sendmail(SENDER_EMAIL, RECIPIENT_EMAILS_BULLETS, msg.as_string())
-        print("Closing connection...")
-        server.quit()
-        print("Bullet points email sent successfully!")
+def send_bullet_points_email(global_articles_data, regional_articles_data, segment=None):
+    """Sends one segment's bullet point summaries as an HTML email (default: the first configured segment)."""
+    segment = segment or SEGMENTS[0]
+    recipients = segment['recipients']
+    if not recipients:
+        print(f"Error: No recipient emails configured for bullet points ({segment['recipients_env']}).")
+        return
+
+    try:
+        print(f"Preparing {segment['name']} bullet points email via BCC to {len(recipients)} recipients.")
+        msg = build_bullet_points_message(global_articles_data, regional_articles_data, segment)
+
+        with tracing.span('send', segment=segment['id'], recipients=len(recipients)):
+            print("Connecting to SMTP server for bullet points email...")
+            with tracing.external_call('smtp.send'):
+                server = open_smtp_connection()
+                print("Logging in...")
+                server.login(SENDER_EMAIL, SENDER_PASSWORD)
+                print("Sending bullet points email...")
+                refused = server.sendmail(SENDER_EMAIL, recipients, msg.as_string())
+                print("Closing connection...")
+                server.quit()
+        if refused:
+            # The server took the message for some recipients only (e.g. a per-message recipient limit)
+            tracing.count('emails.recipients_refused', len(refused))
+            print(f"Warning: {len(refused)} of {len(recipients)} recipients were refused by the SMTP server")
+        tracing.count('emails.sent')
+        print(f"{segment['name']} bullet points email sent successfully!")
     except Exception as e:
         print(f"Error sending bullet points email: {str(e)}")
         raise
@@ -782,78 +696,399 @@ def should_send_email():
     aet_now = datetime.now(aet_tz)
     return aet_now.weekday() == 0  # 0 = Monday
 
-def main():
-    """Main function to fetch news, generate content, and send emails."""
+def pace_gemini_calls():
+    """Wait GEMINI_CALL_DELAY after a Gemini call, keeping calls that far apart across all segment threads."""
+    global _next_gemini_slot
+    if not GEMINI_CALL_DELAY:
+        return
+    with _gemini_lock:
+        now = time.monotonic()
+        _next_gemini_slot = max(now, _next_gemini_slot) + GEMINI_CALL_DELAY
+        wait = _next_gemini_slot - now
+    time.sleep(wait)
+
+
+def summarize_global_articles(global_articles):
+    """Generate bullet points for TLDR articles, most recent first."""
+    global_bullet_points = []
+    if not global_articles:
+        return global_bullet_points
+    print("\nGenerating global content...")
+    # Sort articles by date (most recent first)
+    global_articles.sort(key=lambda x: x.published, reverse=True)
+    with tracing.span('generate', section='global', articles=len(global_articles)):
+        for article in global_articles:
+            try:
+                bullets, url, tier = generate_bullet_points(article)
+                global_bullet_points.append({'summary': bullets, 'url': url, 'title': article.title, 'day': article.day, 'date': article.date, 'tier': tier})
+                tracing.count('summaries.generated')
+                if tier != 'extractive':
+                    pace_gemini_calls()
+            except Exception as e:
+                tracing.count('summaries.failed')
+                print(f"Failed to generate bullet points for global article '{article.title}': {e}")
+    return global_bullet_points
+
+
+def top_regional_articles(regional_articles, limit=5):
+    """Pick the regional articles to summarize (see REGIONAL_RANKER)."""
+    if REGIONAL_RANKER == 'tfidf':
+        return ranking.rank(regional_articles, limit)
+    return sorted(regional_articles, key=lambda x: (x.relevance_score, x.published), reverse=True)[:limit]
+
+
+def fetch_article_page(url):
+    """GET a news article's page (used for full-text enrichment)."""
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+    return fetcher.get(url, headers=headers)
+
+
+def enrich_regional_articles(regional_articles):
+    """Swap NewsAPI's truncated 'content' for the full page text (fetched concurrently, cached by canonical URL)."""
+    if not ENRICH_FULL_TEXT or not regional_articles:
+        return regional_articles
+    with tracing.span('enrich', source='newsapi', articles=len(regional_articles)) as span_attrs:
+        cache = enrichment.load_cache(ENRICH_CACHE_PATH)
+        regional_articles, enriched = enrichment.enrich_articles(regional_articles, fetch_article_page, cache,
+                                                                 ENRICH_TOKEN_BUDGET)
+        with _cache_lock:
+            # Another segment may have saved pages since we loaded; keep theirs too
+            enrichment.save_cache(ENRICH_CACHE_PATH, {**enrichment.load_cache(ENRICH_CACHE_PATH), **cache})
+        span_attrs['enriched'] = enriched
+    print(f"Full text available for {enriched} of {len(regional_articles)} regional articles")
+    return regional_articles
+
+
+def summarize_regional_articles(regional_articles, segment):
+    """Generate bullet points for the given articles of one segment, in order."""
+    regional_bullet_points = []
+    if not regional_articles:
+        return regional_bullet_points
+    # Enrichment returns copies, so page text doesn't end up in the weekly store's candidates
+    regional_articles = enrich_regional_articles(regional_articles)
+    print(f"\nGenerating {segment['adjective']} content...")
+    with tracing.span('generate', section='regional', segment=segment['id'], articles=len(regional_articles)):
+        for article in regional_articles:
+            try:
+                bullets, url, tier = generate_bullet_points(article, region=segment['adjective'])
+                regional_bullet_points.append({'summary': bullets, 'url': url, 'title': article.title, 'tier': tier})
+                tracing.count('summaries.generated')
+                if tier != 'extractive':
+                    pace_gemini_calls()
+            except Exception as e:
+                tracing.count('summaries.failed')
+                print(f"Failed to generate bullet points for {segment['adjective']} article '{article.title}': {e}")
+    return regional_bullet_points
+
+
+def screen_repeats(global_articles, regional_articles, digest_date):
+    """Drop (or flag) candidates too close to a story an earlier digest covered, before anything is summarized.
+
+    Returns (global articles, {segment id: regional articles}, {url: earlier story} for flagged articles).
+    """
+    if not NOVELTY_INDEX_PATH:
+        return global_articles, regional_articles, {}
+    candidates = list({a.url: a for group in [global_articles, *regional_articles.values()] for a in group}.values())
+    with tracing.span('novelty', articles=len(candidates)) as span_attrs:
+        index = novelty.NoveltyIndex(NOVELTY_INDEX_PATH, NOVELTY_WEEKS)
+        repeats = index.repeats(candidates, digest_date, NOVELTY_THRESHOLD)
+        span_attrs['repeats'] = len(repeats)
+    tracing.count('novelty.repeats', len(repeats))
+    for url, earlier in repeats.items():
+        tracing.debug(f"Repeat ({earlier['similarity']}) of '{earlier['title']}' from the {earlier['digest_date']} digest: {url}")
+    if not repeats:
+        return global_articles, regional_articles, {}
+    if NOVELTY_ACTION == 'flag':
+        print(f"Flagging {len(repeats)} of {len(candidates)} articles as follow-ups to earlier digests' stories")
+        return global_articles, regional_articles, repeats
+    print(f"Dropping {len(repeats)} of {len(candidates)} articles already covered by earlier digests")
+    return ([a for a in global_articles if a.url not in repeats],
+            {key: [a for a in articles if a.url not in repeats] for key, articles in regional_articles.items()}, {})
+
+
+def mark_follow_ups(bullet_points, follow_ups):
+    """Label summary items that follow up an earlier digest's story (NOVELTY_ACTION=flag)."""
+    for item in bullet_points:
+        if item['url'] in follow_ups:
+            item['follow_up'] = follow_ups[item['url']]
+
+
+def record_covered(articles, bullet_points, digest_date):
+    """Add the articles this digest summarized to the novelty index, for later digests to check against."""
+    if not NOVELTY_INDEX_PATH:
+        return
+    summarized = {item['url'] for item in bullet_points}
+    covered = [a for a in {a.url: a for a in articles}.values() if a.url in summarized]
+    if not covered:
+        return
     try:
-        print("Starting main process...")
-        # Only run on Mondays (Australia/Sydney time)
-        if not should_send_email():
-            print("Not Monday in Australia/Sydney - skipping email generation.")
-            return
-        
-        # Lists to hold generated content
-        global_bullet_points = []
-        aus_bullet_points = []
+        novelty.NoveltyIndex(NOVELTY_INDEX_PATH, NOVELTY_WEEKS).add(covered, digest_date)
+        tracing.count('novelty.recorded', len(covered))
+    except Exception as e:
+        print(f"Error updating novelty index: {e}")
 
-        # Get global articles
-        print("\nFetching global articles...")
-        try:
-            global_articles = get_tldr_articles()
-        except Exception as e:
-            print(f"Error fetching global articles: {e}")
-            global_articles = []
 
-        if global_articles:
-            print("\nGenerating global content...")
-            # Sort articles by date (most recent first)
-            global_articles.sort(key=lambda x: x.get('date', ''), reverse=True)
+def archive_run(global_articles, global_bullet_points, regional):
+    """Keep this run's articles and summaries in the local search archive (see archive.py).
+
+    regional maps each segment id to its (candidate articles, bullet items). Global
+    articles are filed under the feed that found them ('tldr' or 'rss').
+    """
+    if not archive.ARCHIVE_PATH:
+        return
+    try:
+        feeds = {segment['id']: segment['feed'] for segment in SEGMENTS}
+        summaries = {item['url']: item for item in global_bullet_points}
+        for _, bullet_points in regional.values():
+            summaries.update((item['url'], item) for item in bullet_points)
+        with tracing.span('archive'), archive.Archive(archive.ARCHIVE_PATH) as db:
+            digest_date = upcoming_send_date()
             for article in global_articles:
-                try:
-                    bullets, url = generate_bullet_points(article, is_australian=False)
-                    global_bullet_points.append({'summary': bullets, 'url': url, 'title': article['title'], 'day': article.get('day')})
-                    time.sleep(3)
-                except Exception as e:
-                    print(f"Failed to generate bullet points for global article '{article.get('title', 'N/A')}': {e}")
-
-        # Get Australian articles
-        print("\nFetching Australian articles...")
+                db.add(article, article.source, summaries.get(article.url), digest_date)
+            for key, (regional_articles, _) in regional.items():
+                for article in regional_articles:
+                    db.add(article, feeds[key], summaries.get(article.url), digest_date)
+        tracing.count('archive.articles', len(global_articles) + sum(len(a) for a, _ in regional.values()))
+    except Exception as e:
+        print(f"Error archiving articles: {e}")
+
+
+def upcoming_send_date():
+    """Date (Australia/Sydney) of the Monday digest the current week's items belong to."""
+    aet_tz = pytz.timezone('Australia/Sydney')
+    aet_today = datetime.now(aet_tz).date()
+    return (aet_today + timedelta(days=(7 - aet_today.weekday()) % 7)).isoformat()
+
+
+def new_ingest_store(week_of):
+    """An empty weekly store: global items plus per-segment regional candidates and summaries."""
+    return {'week_of': week_of, 'tldr_dates': [], 'global': {}, 'regions': {}}
+
+
+def load_ingest_store():
+    """Load this week's ingested items, starting fresh if the store is missing or from a past week."""
+    week_of = upcoming_send_date()
+    try:
+        with open(INGEST_STORE_PATH) as f:
+            store = json.load(f)
+    except FileNotFoundError:
+        return new_ingest_store(week_of)
+    except Exception as e:
+        print(f"Error loading ingest store: {e}")
+        return new_ingest_store(week_of)
+    if store.get('week_of') != week_of:
+        print(f"Ingest store is for the week of {store.get('week_of')}, starting a new week ({week_of})")
+        return new_ingest_store(week_of)
+    if 'australian_candidates' in store:
+        # Stores written before segments existed kept the Australian section at the top level
+        store['regions'] = {'au': {'candidates': store.pop('australian_candidates'), 'items': store.pop('australian', {})}}
+    return store
+
+
+def save_ingest_store(store):
+    """Save the weekly ingest store."""
+    try:
+        with open(INGEST_STORE_PATH, 'w') as f:
+            json.dump(store, f)
+    except Exception as e:
+        print(f"Error saving ingest store: {e}")
+
+
+def ingest_regional_articles(segment, region, regional_articles, week_start):
+    """Add a segment's newly fetched articles to its store entry and summarize its current top 5.
+
+    Returns the new bullet items.
+    """
+    for article in regional_articles:
+        # Allow one day of slack: Monday morning in Sydney is still Sunday in the US
+        if article.date >= (week_start - timedelta(days=1)).isoformat():
+            region['candidates'].setdefault(article.url, article.to_dict())
+    top = top_regional_articles([sources.Article.from_dict(c) for c in region['candidates'].values()])
+    new_items = summarize_regional_articles([a for a in top if a.url not in region['items']], segment)
+    for item in new_items:
+        region['items'][item['url']] = item
+    return new_items
+
+
+def ingest_new_articles(store):
+    """Fetch, filter and summarize anything not yet in the weekly store, then save it."""
+    # This week's issues start on the Monday (ET) after the previous digest went out
+    week_start = datetime.strptime(store['week_of'], '%Y-%m-%d').date() - timedelta(days=7)
+    previous_week = {(week_start - timedelta(days=n)).isoformat() for n in range(1, 8)}
+    regions = {segment['id']: store['regions'].setdefault(segment['id'], {'candidates': {}, 'items': {}})
+               for segment in SEGMENTS}
+
+    # TLDR issues already ingested are not fetched again; feed items already stored are skipped
+    global_articles, regional_articles = ingest_sources(skip_dates=set(store['tldr_dates']) | previous_week)
+    new_global = [a for a in global_articles if a.url not in store['global'] and a.date >= week_start.isoformat()]
+    fresh_global, fresh_regional, follow_ups = screen_repeats(new_global, regional_articles, store['week_of'])
+
+    # Regional: every segment keeps all its relevant candidates but only summarizes its current top 5,
+    # in parallel with each other and with the global section
+    with ThreadPoolExecutor(max_workers=len(SEGMENTS), thread_name_prefix='segment') as pool:
+        futures = {segment['id']: pool.submit(ingest_regional_articles, segment, regions[segment['id']],
+                                              fresh_regional[segment['id']], week_start)
+                   for segment in SEGMENTS}
+        new_items = summarize_global_articles(fresh_global)
+        for item in new_items:
+            store['global'][item['url']] = item
+        # A TLDR issue counts as ingested only once every fresh story in it has been summarized, so an
+        # issue with a failed headline is fetched and retried next run; repeats need no summary
+        fresh_urls = {a.url for a in fresh_global}
+        summarized_urls = {item['url'] for item in new_items}
+        issues = {}
+        for article in new_global:
+            if article.source == 'tldr':
+                issues.setdefault(article.date, []).append(article.url)
+        done = {day for day, urls in issues.items()
+                if all(url in summarized_urls or url not in fresh_urls for url in urls)}
+        store['tldr_dates'] = sorted(set(store['tldr_dates']) | done)
+        regional = {key: (regional_articles[key], future.result()) for key, future in futures.items()}
+
+    # The archive keeps every candidate, repeats included
+    archive_run(new_global, new_items, regional)
+    summarized = new_items + [item for _, bullet_points in regional.values() for item in bullet_points]
+    mark_follow_ups(summarized, follow_ups)
+    # Regional items are summarized from the stored candidates, which may have come in on an earlier day
+    candidates = [sources.Article.from_dict(c) for region in regions.values() for c in region['candidates'].values()]
+    record_covered(fresh_global + candidates, summarized, store['week_of'])
+    tracing.count('ingest.global_items', len(store['global']))
+    tracing.count('ingest.regional_candidates', sum(len(region['candidates']) for region in regions.values()))
+    save_ingest_store(store)
+    return store
+
+
+def assemble_from_store(store):
+    """Build the digest sections from the weekly store; returns (global items, {segment id: regional items})."""
+    global_bullet_points = sorted(store['global'].values(), key=lambda x: x.get('date', ''), reverse=True)
+    regional_bullet_points = {}
+    for segment in SEGMENTS:
+        region = store['regions'].get(segment['id'], {'candidates': {}, 'items': {}})
+        top = top_regional_articles([sources.Article.from_dict(c) for c in region['candidates'].values()])
+        regional_bullet_points[segment['id']] = [region['items'][a.url] for a in top if a.url in region['items']]
+    print(f"Assembled {len(global_bullet_points)} global and "
+          f"{sum(len(items) for items in regional_bullet_points.values())} regional summaries "
+          f"({len(SEGMENTS)} segments) from the weekly store")
+    return global_bullet_points, regional_bullet_points
+
+
+def save_last_digest(global_bullet_points, regional_bullet_points):
+    """Keep the summary items this run is about to send, for preview.py and the digest history."""
+    digest = {'digest_date': upcoming_send_date(), 'built_at': datetime.now(pytz.utc).isoformat(timespec='seconds'),
+              'global': global_bullet_points, 'regional': regional_bullet_points}
+    paths = [LAST_DIGEST_PATH] if LAST_DIGEST_PATH else []
+    if DIGEST_HISTORY_DIR:
+        paths.append(os.path.join(DIGEST_HISTORY_DIR, f"{digest['digest_date']}.json"))
+    for path in paths:
         try:
-            australian_articles = get_australian_ai_news()
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            # Written whole then renamed, so a reader never sees half a file
+            with open(f"{path}.tmp", 'w') as f:
+                json.dump(digest, f)
+            os.replace(f"{path}.tmp", path)
         except Exception as e:
-            print(f"Error fetching Australian articles: {e}")
-            australian_articles = []
-
-        if australian_articles:
-            print("\nGenerating Australian content...")
-            # Sort by relevance score and date
-            australian_articles.sort(key=lambda x: (x['relevance_score'], x['publishedAt']), reverse=True)
-            # Take top 5 most relevant articles
-            num_aus_articles = min(len(australian_articles), 5)
-            for i in range(num_aus_articles):
-                article = australian_articles[i]
-                try:
-                    bullets, url = generate_bullet_points(article, is_australian=True)
-                    aus_bullet_points.append({'summary': bullets, 'url': url, 'title': article['title']})
-                    time.sleep(3)
-                except Exception as e:
-                    print(f"Failed to generate bullet points for Australian article '{article.get('title', 'N/A')}': {e}")
-
-        # Send bullet points email (HTML)
-        if RECIPIENT_EMAILS_BULLETS:
-            print("\nSending bullet points email...")
+            print(f"Error saving digest to {path}: {e}")
+
+
+def build_digest():
+    """Fetch and summarize the week ending now; returns (global items, {segment id: regional items}).
+
+    Every source is fetched concurrently first. The global section is then
+    summarized once and shared by every segment, while each segment's
+    regional top 5 is summarized in its own thread alongside it.
+    """
+    global_articles, regional_articles = ingest_sources()
+    digest_date = upcoming_send_date()
+    fresh_global, fresh_regional, follow_ups = screen_repeats(global_articles, regional_articles, digest_date)
+    with ThreadPoolExecutor(max_workers=len(SEGMENTS), thread_name_prefix='segment') as pool:
+        futures = {segment['id']: pool.submit(summarize_regional_articles,
+                                              top_regional_articles(fresh_regional[segment['id']]), segment)
+                   for segment in SEGMENTS}
+        global_bullet_points = summarize_global_articles(fresh_global)
+        regional = {key: (regional_articles[key], future.result()) for key, future in futures.items()}
+
+    # The archive keeps every candidate, repeats included
+    archive_run(global_articles, global_bullet_points, regional)
+    summarized = global_bullet_points + [item for _, bullet_points in regional.values() for item in bullet_points]
+    mark_follow_ups(summarized, follow_ups)
+    record_covered(fresh_global + [a for articles in fresh_regional.values() for a in articles], summarized, digest_date)
+    return global_bullet_points, {key: bullet_points for key, (_, bullet_points) in regional.items()}
+
+
+def main(force=False, incremental=None):
+    """Main function to fetch news, generate content, and send emails."""
+    global gemini_calls_made
+    incremental = INCREMENTAL_INGEST if incremental is None else incremental
+    gemini_calls_made = 0
+    try:
+        print("Starting main process...")
+        tracing.reset()
+        # Only send on Mondays (Australia/Sydney time) unless forced
+        if not force and not should_send_email():
+            if incremental:
+                print("Not Monday in Australia/Sydney - ingesting today's articles for the weekly digest.")
+                ingest_new_articles(load_ingest_store())
+            else:
+                print("Not Monday in Australia/Sydney - skipping email generation.")
+            return
+
+        if incremental:
+            # Pick up anything the weekday runs missed, then assemble the stored week
+            store = ingest_new_articles(load_ingest_store())
+            global_bullet_points, regional_bullet_points = assemble_from_store(store)
+        else:
+            global_bullet_points, regional_bullet_points = build_digest()
+        save_last_digest(global_bullet_points, regional_bullet_points)
+
+        # Send each segment's edition (HTML) to its own recipients
+        sent, failed = 0, 0
+        for segment in SEGMENTS:
+            if not segment['recipients']:
+                print(f"\nSkipping {segment['name']} bullet points email: No recipients configured ({segment['recipients_env']}).")
+                continue
+            print(f"\nSending {segment['name']} bullet points email...")
             try:
-                send_bullet_points_email(global_bullet_points, aus_bullet_points)
+                send_bullet_points_email(global_bullet_points, regional_bullet_points[segment['id']], segment)
+                sent += 1
             except Exception as e:
-                print(f"Failed to send bullet points email: {e}")
-        else:
-            print("\nSkipping bullet points email: No recipients configured (RECIPIENT_EMAIL_BULLETS).")
+                failed += 1
+                print(f"Failed to send {segment['name']} bullet points email: {e}")
+        if incremental and sent and not failed:
+            # The week has been delivered; the next run starts a new store
+            save_ingest_store(new_ingest_store(None))
 
         print("\nProcess completed successfully!")
 
     except Exception as e:
         print(f"Error in main: {str(e)}")
         raise
+    finally:
+        tracing.attach('http', fetcher.stats())
+        if hasattr(model, 'stats'):
+            tracing.attach('gemini', model.stats())
+        tracing.write_report()
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Weekly AI news digest emailer.")
+    parser.add_argument('--force', action='store_true',
+                        help='Run even when it is not Monday in Australia/Sydney')
+    parser.add_argument('--incremental', action='store_true', default=None,
+                        help='Ingest and summarize daily, assemble from the stored week on Monday (also INCREMENTAL_INGEST=true)')
+    parser.add_argument('--draft', action='store_true',
+                        help='Summarize with the offline extractive summarizer only, no Gemini calls (also SUMMARY_MODE=draft)')
+    profiling.add_arguments(parser)
+    stand_ins.add_arguments(parser)
+    cassette.add_arguments(parser)
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.draft:
+        SUMMARY_MODE = 'draft'
+    module = sys.modules[__name__]
+    # Stand-ins go in first so a cassette recorded with --stand-ins captures their traffic
+    with stand_ins.from_args(args, module), cassette.from_args(args, module):
+        profiling.run(lambda: main(force=args.force, incremental=args.incremental), args)
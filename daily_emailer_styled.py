@@ -1,17 +1,25 @@
 import os
+import re
+import sys
+import json
+import argparse
 import google.generativeai as genai
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from datetime import datetime
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
-from newsapi import NewsApiClient
-import re
-from urllib.parse import urlparse, urlunparse # Added for URL cleaning
 import pytz # Added pytz import
 import html # Added for escaping HTML in email
+import tracing
+import http_fetch
+import profiling
+import cassette
+import stand_ins
+import model_router
+import extractive
+import segments
+import sources
 
 # Load environment variables
 load_dotenv()
@@ -19,7 +27,15 @@ load_dotenv()
 # Configure Gemini API
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-2.0-flash')  # Create model once
+GEMINI_PRIMARY_MODEL = os.getenv('GEMINI_PRIMARY_MODEL', 'gemini-2.0-flash')
+GEMINI_FALLBACK_MODEL = os.getenv('GEMINI_FALLBACK_MODEL', 'gemini-2.0-flash-lite')
+GEMINI_DEADLINE = float(os.getenv('GEMINI_DEADLINE', '20'))  # Seconds before hedging to the fallback model
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '90'))  # Give up on an article after this long
+# Create models once; the router hedges slow primary calls to the cheaper fallback tier
+model = model_router.ModelRouter([
+    ('primary', genai.GenerativeModel(GEMINI_PRIMARY_MODEL)),
+    ('fallback', genai.GenerativeModel(GEMINI_FALLBACK_MODEL)),
+], deadline=GEMINI_DEADLINE, timeout=GEMINI_TIMEOUT)
 
 # Email configuration
 SENDER_EMAIL = os.getenv('SENDER_EMAIL')
@@ -29,158 +45,34 @@ SENDER_PASSWORD = os.getenv('SENDER_PASSWORD')
 RECIPIENT_EMAILS_LINKEDIN = [email.strip() for email in os.getenv('RECIPIENT_EMAIL_LINKEDIN', '').split(',') if email.strip()]
 RECIPIENT_EMAILS_BULLETS = [email.strip() for email in os.getenv('RECIPIENT_EMAIL_BULLETS', '').split(',') if email.strip()]
 NEWS_API_KEY = os.getenv('NEWS_API_KEY') # Added News API Key loading
+# Alternative LinkedIn drafts per article, all from one request and ranked best first
+LINKEDIN_VARIANTS = max(1, int(os.getenv('LINKEDIN_VARIANTS', '1')))
+LINKEDIN_TARGET_WORDS = 200  # "Keep it around 200 words"
 
-def get_australian_ai_news():
-    """Fetches relevant Australian AI news from the past 7 days using News API."""
-    try:
-        print("Fetching Australian AI news using News API...")
-        if not NEWS_API_KEY:
-            print("Error: NEWS_API_KEY not found in environment variables.")
-            return []
+# Upstream endpoint (overridable so runs can target local stand-ins)
+TLDR_BASE_URL = os.getenv('TLDR_BASE_URL', 'https://tldr.tech/ai')
+TLDR_FEED_URL = os.getenv('TLDR_FEED_URL', 'https://tldr.tech/api/rss/ai')
 
-        newsapi = NewsApiClient(api_key=NEWS_API_KEY)
+# All outbound HTTP goes through the fetch layer (timeouts, retries, circuit breaking)
+fetcher = http_fetch.Fetcher()
 
-        # Calculate dates for the past 7 days based on US/Eastern Time
-        et_tz = pytz.timezone('US/Eastern')
-        et_now = datetime.now(et_tz)
-        to_date = et_now
-        from_date = to_date - timedelta(days=7) # Fetch news from the past week
-        from_param = from_date.strftime('%Y-%m-%d')
-        to_param = to_date.strftime('%Y-%m-%d')
-
-        # Refined search query for AI news specifically related to Australia
-        query = '("Australian AI" OR "AI in Australia" OR ("artificial intelligence" AND Australia))'
-        print(f"Querying News API with: '{query}', from: {from_param}, to: {to_param}")
-
-        all_articles = newsapi.get_everything(q=query,
-                                              from_param=from_param,
-                                              to=to_param,
-                                              language='en',
-                                              sort_by='relevancy',
-                                              page_size=20) # Fetch more results for better filtering
-
-        filtered_articles = []
-        if all_articles['status'] == 'ok':
-            print(f"News API returned {all_articles['totalResults']} raw articles.")
-            for article in all_articles['articles']:
-                title = article.get('title', '')
-                description = article.get('description', '') or '' # Ensure description is string
-                url = article.get('url', '')
-                source_name = article.get('source', {}).get('name', '')
-                content = article.get('content', '') or '' # Get content field, ensure string
-
-                # Check for Australian relevance in title, description, source, or URL
-                is_relevant = False
-                if re.search(r'\b(Australia|Australian)\b', title, re.IGNORECASE):
-                    is_relevant = True
-                elif description and re.search(r'\b(Australia|Australian)\b', description, re.IGNORECASE):
-                     is_relevant = True
-                elif re.search(r'\b(Australia|Australian)\b', source_name, re.IGNORECASE):
-                     is_relevant = True
-                elif '.au' in url:
-                     is_relevant = True
-
-                if is_relevant:
-                    filtered_articles.append({
-                        'title': title,
-                        # Store both description and content
-                        'summary': description if description else 'No description available.',
-                        'content': content,
-                        'url': url
-                    })
-                    print(f"Added (Relevant): {title}")
-                else:
-                     print(f"Skipped (Not relevant): {title} | Source: {source_name}") # Log skipped articles
-
-                # Stop if we have enough relevant articles
-                if len(filtered_articles) >= 3:
-                    break
-        else:
-            print(f"Error fetching from News API: {all_articles.get('message', 'Unknown error')}")
-            return []
 
-        print(f"Total relevant Australian articles found and filtered: {len(filtered_articles)}")
-        # Return up to 3 relevant articles (already ensured by the break condition)
-        return filtered_articles
+def open_smtp_connection():
+    """Open a connection to the SMTP server."""
+    return smtplib.SMTP_SSL('mail.inventico.io', 465)
 
-    except Exception as e:
-        print(f"Error in get_australian_ai_news: {str(e)}")
-        return []
+def fetch_articles():
+    """Fetch yesterday's TLDR issue and this week's Australian NewsAPI stories concurrently.
 
-
-def get_tldr_articles():
-    """Fetches and scrapes TLDR AI articles from yesterday (US/ET)."""
-    try:
-        # Get yesterday's date in US/Eastern Time
-        et_tz = pytz.timezone('US/Eastern')
-        et_yesterday = datetime.now(et_tz) - timedelta(days=1)
-        date_str = et_yesterday.strftime("%Y-%m-%d")
-
-        url = f"https://tldr.tech/ai/{date_str}"
-        print(f"Fetching articles from: {url}")
-
-        # Add a common browser User-Agent header
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = requests.get(url, headers=headers)
-        print(f"Response status code: {response.status_code}")
-
-        if response.status_code != 200:
-            print(f"Error: Received status code {response.status_code}")
-            return []
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Extract articles from the Headlines & Launches section
-        articles = []
-        sections = soup.find_all('h3')
-        print(f"Found {len(sections)} sections")
-
-        # Find the Headlines & Launches section
-        headlines_section = None
-        for section in sections:
-            if section.text.strip() == "Headlines & Launches":
-                headlines_section = section
-                break
-
-        if headlines_section:
-            print("Found Headlines & Launches section")
-            # Get all h3 elements after Headlines & Launches until the next section
-            current = headlines_section.find_next('h3')
-            while current and current.text.strip() != "Research & Innovation":
-                title_text = current.text.strip()
-                if '(' in title_text and ')' in title_text:
-                    # Split into title and reading time
-                    parts = title_text.rsplit('(', 1)
-                    title = parts[0].strip()
-                    # Find the anchor tag containing or related to the headline (h3 is inside a)
-                    anchor_tag = current.find_parent('a')
-                    # Find the div.newsletter-html that is the immediate next sibling of the anchor tag
-                    summary_div = anchor_tag.find_next_sibling('div', class_='newsletter-html') if anchor_tag else None
-                    summary_text = summary_div.text.strip() if summary_div else '' # Get stripped text for actual use
-                    # Get the URL and clean it
-                    raw_url = anchor_tag['href'] if anchor_tag else '' # Get URL from the anchor tag
-                    if raw_url:
-                        parsed_url = urlparse(raw_url)
-                        # Reconstruct URL without query parameters or fragment
-                        url = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, parsed_url.params, '', ''))
-                    else:
-                        url = ''
-
-                    articles.append({
-                        'title': title,
-                        'summary': summary_text,
-                        'url': url
-                    })
-                    print(f"Added article: {title}")
-                current = current.find_next('h3')
-        else:
-            print("Warning: Could not find Headlines & Launches section")
-
-        print(f"Total articles found: {len(articles)}")
-        return articles
-    except Exception as e:
-        print(f"Error in get_tldr_articles: {str(e)}")
-        raise
+    Uses the same source adapters as the weekly digest (sources.py); returns
+    (global articles, Australian articles ranked by relevance), 3 of each at most.
+    """
+    et_now = datetime.now(pytz.timezone('US/Eastern'))
+    tldr = sources.TldrSource(TLDR_BASE_URL, fetcher, days_back=(1, 1), feed_url=TLDR_FEED_URL)
+    australia = sources.NewsApiSource(segments.load('au')[0], NEWS_API_KEY, fetcher)
+    results = sources.ingest([tldr, australia], et_now)
+    australian = sorted(results[australia.name], key=lambda a: (a.relevance_score, a.published), reverse=True)
+    return results[tldr.name][:3], australian[:3]
 
 
 def generate_bullet_points(article, is_australian=False):
@@ -199,8 +91,8 @@ Guidelines:
             guidelines += "\n6. Ensure the Australian context is clear if relevant to the key points."
             prompt_prefix = "Australian News: "
             # Prioritize using 'content' if available and substantially longer
-            content_text = article.get('content', '') or ''
-            description_text = article.get('summary', '') or '' # 'summary' key holds description
+            content_text = article.content or ''
+            description_text = article.summary or '' # 'summary' holds the description
             if content_text and len(content_text) > len(description_text) + 20:
                  summary_to_use = content_text
                  source_used = 'content'
@@ -210,28 +102,77 @@ Guidelines:
         else:
             prompt_prefix = "Global News: "
             # For global news, use the scraped summary
-            summary_to_use = article.get('summary', '')
+            summary_to_use = article.summary
             source_used = 'summary/description'
 
         prompt = f"""Generate 5 key bullet points summarizing the following article for a consumer audience.
 {guidelines}
 
 Article:
-{prompt_prefix}{article['title']}
+{prompt_prefix}{article.title}
 {summary_to_use}
 """
-        print(f"Generating bullet points for article: {article['title']} (Using {source_used})")
-        response = model.generate_content(prompt)
-        print("Bullet points generated successfully")
+        tracing.debug(f"Generating bullet points for article: {article.title} (Using {source_used})")
+        try:
+            with tracing.external_call('gemini.generate_content'):
+                response = model.generate_content(prompt)
+        except Exception as e:
+            # Don't drop the article from the digest; fall back to an offline extractive summary
+            print(f"Error generating bullet points: {str(e)} - using extractive summary instead")
+            tracing.count('summaries.extractive.llm_error')
+            return extractive.summarize(summary_to_use, title=article.title), article.url
+        # Record which model tier served this article
+        tier = getattr(response, 'tier', 'primary')
+        tracing.count(f"gemini.tier.{tier}")
+        tracing.debug(f"Bullet points generated successfully (tier: {tier})")
         # Return the raw text (bullet points) and the URL
-        return response.text, article['url']
+        return response.text, article.url
     except Exception as e:
         print(f"Error generating bullet points: {str(e)}")
         raise
 
 
-def generate_linkedin_post(article, is_australian=False):
-    """Generates a LinkedIn post based on an article."""
+_HASHTAG_RE = re.compile(r'(?<![\w#])#\w+')
+_EMOJI_RE = re.compile('[\U0001F1E6-\U0001F1FF\U0001F300-\U0001FAFF\u2600-\u27BF]')
+_DASH_RE = re.compile(r'(?:^|\s)[-\u2013\u2014](?:\s|$)', re.MULTILINE)
+
+
+def parse_linkedin_drafts(text):
+    """Drafts from the model's JSON array of posts; an answer that isn't one is taken as a single draft."""
+    match = re.search(r'\[.*\]', text or '', re.DOTALL)
+    try:
+        items = json.loads(match.group(0)) if match else None
+    except ValueError:
+        items = None
+    if not isinstance(items, list):
+        tracing.count('linkedin.unparsed')
+        return [text.strip()] if text and text.strip() else []
+    return [item.strip() for item in items if isinstance(item, str) and item.strip()]
+
+
+def linkedin_post_penalty(post, is_australian=False):
+    """How far a draft strays from the prompt's guidelines; 0 follows all the ones checked here."""
+    text = _HASHTAG_RE.sub('', post)
+    lower = post.lower()
+    penalty = abs(len(text.split()) - LINKEDIN_TARGET_WORDS) / LINKEDIN_TARGET_WORDS
+    penalty += abs(len(_HASHTAG_RE.findall(post)) - 2)  # 2 hashtags
+    penalty += abs(len(_EMOJI_RE.findall(post)) - 1)  # 1 emoji
+    lines = [line.strip() for line in _EMOJI_RE.sub('', text).splitlines() if line.strip()]
+    penalty += 0 if lines and lines[-1].endswith('?') else 1  # Ends with a question
+    penalty += 0 if 'responsble.ai' in lower else 1
+    penalty += 1 if 'responsible.ai' in lower else 0  # The misspelling is the brand
+    penalty += 0.5 if _DASH_RE.search(text) else 0  # No "-"
+    if is_australian:
+        penalty += 0 if re.search(r'\b(australia|australian|aussie)', lower) else 1
+    return penalty
+
+
+def generate_linkedin_post(article, is_australian=False, variants=1):
+    """Generates a LinkedIn post based on an article.
+
+    With variants > 1, asks for that many drafts in one JSON response and
+    returns them as a list, ranked by linkedin_post_penalty().
+    """
     try:
         # Construct the prompt for LinkedIn post (from daily_emailer.py)
         guidelines = """
@@ -248,8 +189,8 @@ Guidelines:
             guidelines += "\n8. Use 2 relevant hashtags and 1 well-placed emoji."
             prompt_prefix = "Australian AI Update: "
             # Prioritize using 'content' if available and substantially longer
-            content_text = article.get('content', '') or ''
-            description_text = article.get('summary', '') or '' # 'summary' key holds description
+            content_text = article.content or ''
+            description_text = article.summary or '' # 'summary' holds the description
             if content_text and len(content_text) > len(description_text) + 20:
                  summary_to_use = content_text
                  source_used = 'content' # Keep track for potential debugging
@@ -262,7 +203,7 @@ Guidelines:
             guidelines += "\n7. Use 2 relevant hashtags and 1 well-placed emoji."
             prompt_prefix = "" # No prefix for global posts
             # For global news, use the scraped summary
-            summary_to_use = article.get('summary', '')
+            summary_to_use = article.summary
             source_used = 'summary/description' # Indicate source for consistency
 
         # LinkedIn prompt structure (from daily_emailer.py)
@@ -272,14 +213,33 @@ Guidelines:
 Tone: Authentic, clear, and conversational — like a seasoned Australian copywriter writing for a professional but curious audience. No "-"
 
 Article:
-{prompt_prefix}{article['title']}
+{prompt_prefix}{article.title}
 {summary_to_use}
 """
-        print(f"Generating LinkedIn post for article: {article['title']} (Using {source_used})")
-        response = model.generate_content(prompt)
-        print("Post generated successfully")
+        tracing.debug(f"Generating LinkedIn post for article: {article.title} (Using {source_used})")
+        if variants > 1:
+            # One request for all the drafts instead of one call each
+            prompt += f"""
+Write {variants} distinct drafts of this post, each following all the guidelines, with a different hook and angle.
+Return only a JSON array of {variants} strings, one complete post per string."""
+            with tracing.external_call('gemini.generate_content'):
+                response = model.generate_content(prompt, generation_config={'response_mime_type': 'application/json',
+                                                                             'temperature': 1.0})
+        else:
+            with tracing.external_call('gemini.generate_content'):
+                response = model.generate_content(prompt)
+        tier = getattr(response, 'tier', 'primary')
+        tracing.count(f"gemini.tier.{tier}")
+        tracing.debug(f"Post generated successfully (tier: {tier})")
+        if variants > 1:
+            drafts = parse_linkedin_drafts(response.text)[:variants]
+            if not drafts:
+                raise ValueError("model returned no drafts")
+            tracing.count('linkedin.drafts', len(drafts))
+            ranked = sorted(drafts, key=lambda draft: linkedin_post_penalty(draft, is_australian))
+            return [f"{draft}\n\nRead more: {article.url}" for draft in ranked]
         # Return formatted post string
-        return f"{response.text}\n\nRead more: {article['url']}"
+        return f"{response.text}\n\nRead more: {article.url}"
     except Exception as e:
         print(f"Error generating LinkedIn post: {str(e)}")
         raise
@@ -324,8 +284,9 @@ def send_bullet_points_email(global_articles_data, australian_articles_data): #
             return html_output
         # --- End Helper ---
 
-        global_html = format_articles_html(global_articles_data)
-        australian_html = format_articles_html(australian_articles_data)
+        with tracing.span('render', articles=len(global_articles_data) + len(australian_articles_data)):
+            global_html = format_articles_html(global_articles_data)
+            australian_html = format_articles_html(australian_articles_data)
 
         # HTML Body for bullet points
         body = f"""
@@ -368,20 +329,33 @@ def send_bullet_points_email(global_articles_data, australian_articles_data): #
 """
         msg.attach(MIMEText(body, 'html', 'utf-8')) # Specify utf-8 encoding
 
-        print("Connecting to SMTP server for bullet points email...")
-        server = smtplib.SMTP_SSL('mail.inventico.io', 465)
-        print("Logging in...")
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        print("Sending bullet points email...")
-        server.sendmail(SENDER_EMAIL, RECIPIENT_EMAILS_BULLETS, msg.as_string())
-        print("Closing connection...")
-        server.quit()
+        with tracing.span('send', recipients=len(RECIPIENT_EMAILS_BULLETS)):
+            print("Connecting to SMTP server for bullet points email...")
+            with tracing.external_call('smtp.send'):
+                server = open_smtp_connection()
+                print("Logging in...")
+                server.login(SENDER_EMAIL, SENDER_PASSWORD)
+                print("Sending bullet points email...")
+                server.sendmail(SENDER_EMAIL, RECIPIENT_EMAILS_BULLETS, msg.as_string())
+                print("Closing connection...")
+                server.quit()
+        tracing.count('emails.sent')
         print("Bullet points email sent successfully!")
     except Exception as e:
         print(f"Error sending bullet points email: {str(e)}")
         raise
 
 
+def format_linkedin_post(post):
+    """One article's post, or its ranked drafts labelled best first."""
+    if isinstance(post, str):
+        return post
+    if len(post) == 1:
+        return post[0]
+    return "\n\n".join(f"Draft {i} of {len(post)}{' (closest to the guidelines)' if i == 1 else ''}:\n{draft}"
+                       for i, draft in enumerate(post, 1))
+
+
 def send_linkedin_email(global_posts_list, australian_posts_list):
     """Sends the LinkedIn posts as a plain text email."""
     # Use the specific recipient list for LinkedIn posts
@@ -391,8 +365,8 @@ def send_linkedin_email(global_posts_list, australian_posts_list):
 
     try:
         # Combine posts with separators
-        global_combined = "\n\n-------------------\n\n".join(global_posts_list)
-        australian_combined = "\n\n-------------------\n\n".join(australian_posts_list) # Corrected variable name
+        global_combined = "\n\n-------------------\n\n".join(map(format_linkedin_post, global_posts_list))
+        australian_combined = "\n\n-------------------\n\n".join(map(format_linkedin_post, australian_posts_list)) # Corrected variable name
 
         print(f"Preparing LinkedIn posts email via BCC to {len(RECIPIENT_EMAILS_LINKEDIN)} recipients.")
         msg = MIMEMultipart()
@@ -418,14 +392,17 @@ Feel free to edit and customize before posting! You can choose to post these sep
 """
         msg.attach(MIMEText(body, 'plain')) # Plain text email
 
-        print("Connecting to SMTP server for LinkedIn posts email...")
-        server = smtplib.SMTP_SSL('mail.inventico.io', 465)
-        print("Logging in...")
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        print("Sending LinkedIn posts email...")
-        server.sendmail(SENDER_EMAIL, RECIPIENT_EMAILS_LINKEDIN, msg.as_string())
-        print("Closing connection...")
-        server.quit()
+        with tracing.span('send', recipients=len(RECIPIENT_EMAILS_LINKEDIN)):
+            print("Connecting to SMTP server for LinkedIn posts email...")
+            with tracing.external_call('smtp.send'):
+                server = open_smtp_connection()
+                print("Logging in...")
+                server.login(SENDER_EMAIL, SENDER_PASSWORD)
+                print("Sending LinkedIn posts email...")
+                server.sendmail(SENDER_EMAIL, RECIPIENT_EMAILS_LINKEDIN, msg.as_string())
+                print("Closing connection...")
+                server.quit()
+        tracing.count('emails.sent')
         print("LinkedIn posts email sent successfully!")
     except Exception as e:
         print(f"Error sending LinkedIn posts email: {str(e)}")
@@ -436,6 +413,7 @@ def main():
     """Main function to fetch news, generate content, and send emails."""
     try:
         print("Starting main process...")
+        tracing.reset()
 
         # Lists to hold generated content
         global_linkedin_posts = []
@@ -443,54 +421,52 @@ def main():
         aus_linkedin_posts = []
         aus_bullet_points = []
 
-        # Get global articles
-        print("\nFetching global articles...")
-        global_articles = get_tldr_articles()
+        # Get global (TLDR) and Australian (NewsAPI) articles at the same time
+        print("\nFetching global and Australian articles...")
+        global_articles, australian_articles = fetch_articles()
 
         if not global_articles:
             print("No global articles found for today.")
         else:
             print("\nGenerating global content (LinkedIn posts and bullet points)...") # Updated print
             num_global_articles = min(len(global_articles), 3)
-            for i in range(num_global_articles):
-                article = global_articles[i]
-                # Generate LinkedIn post
-                try:
-                    linkedin_post = generate_linkedin_post(article, is_australian=False)
-                    global_linkedin_posts.append(linkedin_post) # Store the formatted string
-                except Exception as e:
-                    print(f"Failed to generate LinkedIn post for global article '{article.get('title', 'N/A')}': {e}")
-                # Generate bullet points
-                try:
-                    bullets, url = generate_bullet_points(article, is_australian=False)
-                    global_bullet_points.append({'summary': bullets, 'url': url, 'title': article['title']}) # Store dict for HTML email
-                except Exception as e:
-                    print(f"Failed to generate bullet points for global article '{article.get('title', 'N/A')}': {e}")
-
-
-        # Get Australian articles
-        print("\nFetching Australian articles...")
-        australian_articles = get_australian_ai_news()
+            with tracing.span('generate', section='global', articles=num_global_articles):
+                for i in range(num_global_articles):
+                    article = global_articles[i]
+                    # Generate LinkedIn post
+                    try:
+                        linkedin_post = generate_linkedin_post(article, is_australian=False, variants=LINKEDIN_VARIANTS)
+                        global_linkedin_posts.append(linkedin_post) # Store the formatted string (a ranked list with LINKEDIN_VARIANTS > 1)
+                    except Exception as e:
+                        print(f"Failed to generate LinkedIn post for global article '{article.title}': {e}")
+                    # Generate bullet points
+                    try:
+                        bullets, url = generate_bullet_points(article, is_australian=False)
+                        global_bullet_points.append({'summary': bullets, 'url': url, 'title': article.title}) # Store dict for HTML email
+                    except Exception as e:
+                        print(f"Failed to generate bullet points for global article '{article.title}': {e}")
+
 
         if not australian_articles:
             print("No Australian articles found.")
         else:
             print("\nGenerating Australian content (LinkedIn posts and bullet points)...") # Updated print
             num_aus_articles = min(len(australian_articles), 3)
-            for i in range(num_aus_articles):
-                article = australian_articles[i]
-                 # Generate LinkedIn post
-                try:
-                    linkedin_post = generate_linkedin_post(article, is_australian=True)
-                    aus_linkedin_posts.append(linkedin_post) # Store the formatted string
-                except Exception as e:
-                    print(f"Failed to generate LinkedIn post for Australian article '{article.get('title', 'N/A')}': {e}")
-               # Generate bullet points
-                try:
-                    bullets, url = generate_bullet_points(article, is_australian=True)
-                    aus_bullet_points.append({'summary': bullets, 'url': url, 'title': article['title']}) # Store dict for HTML email
-                except Exception as e:
-                    print(f"Failed to generate bullet points for Australian article '{article.get('title', 'N/A')}': {e}")
+            with tracing.span('generate', section='australian', articles=num_aus_articles):
+                for i in range(num_aus_articles):
+                    article = australian_articles[i]
+                     # Generate LinkedIn post
+                    try:
+                        linkedin_post = generate_linkedin_post(article, is_australian=True, variants=LINKEDIN_VARIANTS)
+                        aus_linkedin_posts.append(linkedin_post) # Store the formatted string (a ranked list with LINKEDIN_VARIANTS > 1)
+                    except Exception as e:
+                        print(f"Failed to generate LinkedIn post for Australian article '{article.title}': {e}")
+                   # Generate bullet points
+                    try:
+                        bullets, url = generate_bullet_points(article, is_australian=True)
+                        aus_bullet_points.append({'summary': bullets, 'url': url, 'title': article.title}) # Store dict for HTML email
+                    except Exception as e:
+                        print(f"Failed to generate bullet points for Australian article '{article.title}': {e}")
 
 
         # --- Email Sending Section ---
@@ -526,7 +502,25 @@ def main():
     except Exception as e:
         print(f"Error in main: {str(e)}")
         raise
+    finally:
+        tracing.attach('http', fetcher.stats())
+        if hasattr(model, 'stats'):
+            tracing.attach('gemini', model.stats())
+        tracing.write_report()
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Daily AI LinkedIn post and bullet point emailer.")
+    profiling.add_arguments(parser)
+    stand_ins.add_arguments(parser)
+    cassette.add_arguments(parser)
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    module = sys.modules[__name__]
+    # Stand-ins go in first so a cassette recorded with --stand-ins captures their traffic
+    with stand_ins.from_args(args, module), cassette.from_args(args, module):
+        profiling.run(main, args)
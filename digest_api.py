@@ -0,0 +1,252 @@
+"""HTTP API serving the current and past digests from precomputed renders.
+
+Each run saves its summaries to DIGEST_HISTORY_DIR/<digest date>.json (see
+daily_emailer.save_last_digest). This service renders every saved digest
+once per segment, as HTML through the email template and as JSON. It keeps
+the plain and gzipped bytes and an ETag for each, and re-renders only
+digest files that are new or changed since the last check. Requests are
+dictionary lookups. Nothing is scraped or summarized, and no model is
+called.
+
+    python digest_api.py --port 8080
+    curl http://127.0.0.1:8080/digests                      # index of saved digests
+    curl http://127.0.0.1:8080/digests/latest.json          # newest digest, default segment
+    curl http://127.0.0.1:8080/digests/latest/nz.html       # newest digest, one segment
+    curl http://127.0.0.1:8080/digests/2025-03-10/au.json   # a past digest
+
+Responses carry an ETag (If-None-Match gives a 304) and are gzipped when
+the client accepts it.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# daily_emailer reads its configuration at import time; the API never uses the credentials
+os.environ.setdefault('GEMINI_API_KEY', 'digest-api')
+os.environ.setdefault('SMTP_PORT', '465')
+os.environ.setdefault('TRACE_REPORT_PATH', '')
+
+import clock  # noqa: E402
+import daily_emailer  # noqa: E402
+import segments  # noqa: E402
+
+REFRESH_INTERVAL = 5  # Seconds between checks of the history directory
+LATEST_MAX_AGE = 60  # Cache-Control max-age for the newest digest, which a --force rerun rewrites
+PAST_MAX_AGE = 86400  # Older digests don't change
+GZIP_MIN_BYTES = 512  # Smaller bodies, and images (already compressed), are sent as they are
+
+
+def make_response(body, content_type, max_age):
+    """Precomputed response: plain and gzipped bytes with their ETags."""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    etag = hashlib.sha1(body).hexdigest()[:20]
+    response = {'body': body, 'etag': f'"{etag}"', 'type': content_type, 'cache': f"public, max-age={max_age}"}
+    if len(body) >= GZIP_MIN_BYTES and not content_type.startswith('image/'):
+        # Different bytes need a different strong ETag
+        response['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+        response['gzip_etag'] = f'"{etag}-gzip"'
+    return response
+
+
+def bullet_list(summary):
+    return [line.strip().lstrip('-*• ').strip() for line in (summary or '').splitlines() if line.strip().lstrip('-*• ')]
+
+
+def digest_json(digest, segment):
+    """The JSON form of one segment's digest."""
+    def item(entry):
+        return {key: entry[key] for key in ('title', 'url', 'date', 'day', 'follow_up') if entry.get(key)} | {
+            'bullets': bullet_list(entry.get('summary'))}
+    return {'digest_date': digest['digest_date'], 'built_at': digest.get('built_at'),
+            'segment': {'id': segment['id'], 'name': segment['name']},
+            'global': [item(entry) for entry in digest['global']],
+            'regional': [item(entry) for entry in digest['regional'].get(segment['id'], [])]}
+
+
+def render_html(digest, segment):
+    """One segment's email HTML as it was sent, dated as of the run, with images served from /assets/."""
+    moment = datetime.fromisoformat(digest['built_at']) if digest.get('built_at') else None
+    previous = clock.freeze(daily_emailer, moment) if moment else None
+    try:
+        body = daily_emailer.render_email_html(digest['global'], digest['regional'].get(segment['id'], []), segment)
+    finally:
+        if previous:
+            daily_emailer.datetime = previous
+    for cid, path in daily_emailer.CID_ASSETS.items():
+        body = body.replace(f'cid:{cid}', f'/{path}')
+    return body
+
+
+class DigestStore:
+    """Renders of every saved digest, keyed by request path and swapped whole on each refresh."""
+
+    def __init__(self, history_dir):
+        self.history_dir = Path(history_dir)
+        self.renders = {}
+        self.digests = {}  # digest date -> (file mtime, index entry, {path: body})
+        self.refreshed_at = None
+        self._lock = threading.Lock()
+
+    def render_digest(self, path):
+        digest = json.loads(path.read_text())
+        digest.setdefault('digest_date', path.stem)
+        segment_ids = list(digest['regional']) or [daily_emailer.SEGMENTS[0]['id']]
+        digest_segments = segments.load(','.join(segment_ids), os.getenv('SEGMENTS_CONFIG'))
+        responses = {}
+        for segment in digest_segments:
+            base = f"/digests/{digest['digest_date']}/{segment['id']}"
+            responses[f"{base}.html"] = render_html(digest, segment)
+            responses[f"{base}.json"] = json.dumps(digest_json(digest, segment), ensure_ascii=False)
+        # Without a segment: the one configured first here, else the digest's first
+        configured = [segment['id'] for segment in daily_emailer.SEGMENTS if segment['id'] in segment_ids]
+        default = (configured or segment_ids)[0]
+        for ext in ('html', 'json'):
+            responses[f"/digests/{digest['digest_date']}.{ext}"] = responses[f"/digests/{digest['digest_date']}/{default}.{ext}"]
+        return {'date': digest['digest_date'], 'built_at': digest.get('built_at'),
+                'segments': [segment['id'] for segment in digest_segments]}, responses
+
+    def refresh(self):
+        """Render new or changed digest files and rebuild the lookup table; returns the dates rendered."""
+        with self._lock:
+            files = {path.stem: path for path in self.history_dir.glob('*.json')}
+            rendered = []
+            digests = {}
+            for date, path in files.items():
+                try:
+                    mtime = path.stat().st_mtime_ns
+                    if date in self.digests and self.digests[date][0] == mtime:
+                        digests[date] = self.digests[date]
+                        continue
+                    info, bodies = self.render_digest(path)
+                    digests[date] = (mtime, info, bodies)
+                    rendered.append(date)
+                except Exception as e:
+                    print(f"[digest-api] Could not render {path}: {e}")
+                    if date in self.digests:
+                        digests[date] = self.digests[date]
+            if not rendered and digests.keys() == self.digests.keys():
+                return rendered
+            renders = {}
+            latest = max(digests) if digests else None
+            for date, (_, _, bodies) in digests.items():
+                for path, body in bodies.items():
+                    content_type = 'text/html; charset=utf-8' if path.endswith('.html') else 'application/json'
+                    # The newest date's own paths too, not just /digests/latest/...
+                    renders[path] = make_response(body, content_type,
+                                                  LATEST_MAX_AGE if date == latest else PAST_MAX_AGE)
+                    if date == latest:
+                        renders[path.replace(f"/digests/{date}", '/digests/latest', 1)] = renders[path]
+            index = [info for _, (_, info, _) in sorted(digests.items(), reverse=True)]
+            renders['/digests'] = make_response(json.dumps({'latest': latest, 'digests': index}),
+                                                'application/json', LATEST_MAX_AGE)
+            for path in daily_emailer.CID_ASSETS.values():
+                renders[f"/{path}"] = make_response(Path(path).read_bytes(), 'image/png', PAST_MAX_AGE)
+            self.digests = digests
+            self.renders = renders  # One assignment, so readers see the old table or the new one
+            self.refreshed_at = time.time()
+            return rendered
+
+    def watch(self, interval=REFRESH_INTERVAL):
+        """Pick up digests written by new runs (runs in its own thread)."""
+        while True:
+            time.sleep(interval)
+            rendered = self.refresh()
+            if rendered:
+                print(f"[digest-api] Rendered {', '.join(sorted(rendered))}")
+
+
+def accepts_gzip(header):
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def make_api_server(store, host, port):
+    """HTTP server answering from store.renders."""
+
+    class DigestHandler(BaseHTTPRequestHandler):
+        def _json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0].rstrip('/') or '/digests'
+            response = store.renders.get(path)
+            if response is None:
+                self._json(404, {'error': 'not found', 'index': '/digests'})
+                return
+            if 'gzip' in response and accepts_gzip(self.headers.get('Accept-Encoding')):
+                body, etag, encoding = response['gzip'], response['gzip_etag'], 'gzip'
+            else:
+                body, etag, encoding = response['body'], response['etag'], None
+            if_none_match = self.headers.get('If-None-Match')
+            if if_none_match and (if_none_match.strip() == '*' or etag in [tag.strip().removeprefix('W/')
+                                                                          for tag in if_none_match.split(',')]):
+                self.send_response(304)
+                body = b''
+            else:
+                self.send_response(200)
+                self.send_header('Content-Type', response['type'])
+                self.send_header('Content-Length', str(len(body)))
+                if encoding:
+                    self.send_header('Content-Encoding', encoding)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', response['cache'])
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        do_HEAD = do_GET
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), DigestHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve saved digests as HTML and JSON.")
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--history', default=daily_emailer.DIGEST_HISTORY_DIR or 'digests',
+                        help='Directory of saved digests (default DIGEST_HISTORY_DIR or digests)')
+    parser.add_argument('--refresh', type=float, default=REFRESH_INTERVAL,
+                        help=f'Seconds between checks for new digests (default {REFRESH_INTERVAL})')
+    args = parser.parse_args()
+
+    store = DigestStore(Path(args.history).resolve())
+    os.chdir(Path(__file__).resolve().parent)  # The inline images are read from assets/
+    start = time.perf_counter()
+    rendered = store.refresh()
+    print(f"[digest-api] Rendered {len(rendered)} digests in {time.perf_counter() - start:.2f}s")
+    threading.Thread(target=store.watch, args=(args.refresh,), daemon=True).start()
+    server = make_api_server(store, args.host, args.port)
+    print(f"[digest-api] Serving {store.history_dir} on http://{args.host}:{args.port}/digests (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Post-render compaction of the digest's HTML body, and its plain-text alternative.
+
+The template in daily_emailer.py is written for readability: deep
+indentation, and the same inline style repeated on every bullet. Email
+clients render whitespace runs and a class rule in the <style> block exactly
+like the original, so compact_html() collapses the first and moves styles
+repeated on several elements into generated classes. Those rules are marked
+!important so they still win over the stylesheet, as inline styles do. The
+layout already depends on the <style> block, so this adds no client
+requirement. html_to_text() builds the text/plain part for
+multipart/alternative.
+"""
+import re
+from email.charset import QP, Charset
+from email.mime.text import MIMEText
+
+from bs4 import BeautifulSoup
+
+# Whitespace around these tags never renders, so it can go entirely
+BLOCK_TAGS = ('html', 'head', 'body', 'meta', 'title', 'style', 'div', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+              'ul', 'ol', 'li', 'table', 'thead', 'tbody', 'tr', 'td', 'th', 'br', 'hr')
+MIN_STYLE_REPEATS = 2  # An inline style used at least this often becomes a class
+CLASS_PREFIX = 'c'
+
+_BLOCK_TAG_RE = re.compile(r'\s*(</?(?:%s)\b[^>]*>)\s*' % '|'.join(BLOCK_TAGS), re.IGNORECASE)
+_START_TAG_RE = re.compile(r'<([a-zA-Z][\w-]*)(\s[^<>]*?)?(/?)>')
+_ATTR_RE = re.compile(r'''\s(style|class)\s*=\s*(["'])(.*?)\2''', re.IGNORECASE | re.DOTALL)
+_STYLE_BLOCK_RE = re.compile(r'(<style[^>]*>)(.*?)(</style>)', re.IGNORECASE | re.DOTALL)
+
+# Quoted-printable keeps mostly-ASCII HTML near its raw size (base64 adds a third)
+UTF8_QP = Charset('utf-8')
+UTF8_QP.body_encoding = QP
+
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+def _declarations(style):
+    """Normalise an inline style ('color: #333; ' -> 'color:#333') so equal styles compare equal."""
+    parts = []
+    for declaration in style.split(';'):
+        prop, _, value = declaration.partition(':')
+        if prop.strip() and value.strip():
+            parts.append(f"{prop.strip().lower()}:{' '.join(value.split())}")
+    return ';'.join(parts)
+
+
+def dedupe_inline_styles(html_text):
+    """Move inline styles that repeat across elements into classes in the <style> block."""
+    counts = {}
+    for match in _START_TAG_RE.finditer(html_text):
+        for name, _, value in _ATTR_RE.findall(match.group(2) or ''):
+            if name.lower() == 'style':
+                key = _declarations(value)
+                counts[key] = counts.get(key, 0) + 1
+    classes = {}
+    for key, count in sorted(counts.items(), key=lambda kv: -kv[1]):
+        if key and count >= MIN_STYLE_REPEATS:
+            classes[key] = f"{CLASS_PREFIX}{len(classes)}"
+    if not classes or not _STYLE_BLOCK_RE.search(html_text):
+        return html_text
+
+    def rewrite(match):
+        tag, attrs, close = match.group(1), match.group(2) or '', match.group(3)
+        found = {name.lower(): value for name, _, value in _ATTR_RE.findall(attrs)}
+        class_name = classes.get(_declarations(found.get('style', '')))
+        if 'style' not in found or not class_name:
+            return match.group(0)
+        attrs = _ATTR_RE.sub(lambda m: '' if m.group(1).lower() in ('style', 'class') else m.group(0), attrs)
+        merged = ' '.join(filter(None, [found.get('class', '').strip(), class_name]))
+        return f'<{tag}{attrs} class="{merged}"{close}>'
+
+    html_text = _START_TAG_RE.sub(rewrite, html_text)
+    rules = ''.join(f".{name}{{{';'.join(d + '!important' for d in key.split(';'))}}}"
+                    for key, name in classes.items())
+    return _STYLE_BLOCK_RE.sub(lambda m: m.group(1) + m.group(2) + rules + m.group(3), html_text, count=1)
+
+
+def minify_html(html_text):
+    """Collapse whitespace the way browsers do, drop it around block tags and minify the <style> block."""
+    html_text = re.sub(r'<!--(?!\[if).*?-->', '', html_text, flags=re.DOTALL)  # Keep Outlook conditionals
+    html_text = _STYLE_BLOCK_RE.sub(lambda m: m.group(1) + minify_css(m.group(2)) + m.group(3), html_text)
+    html_text = re.sub(r'\s+', ' ', html_text)
+    return _BLOCK_TAG_RE.sub(r'\1', html_text).strip()
+
+
+def compact_html(html_text):
+    """Minified HTML with repeated inline styles turned into classes; renders the same as the input."""
+    return minify_html(dedupe_inline_styles(html_text))
+
+
+def html_to_text(html_text):
+    """Plain-text version of a rendered digest: headings, bullets and 'Read more' links."""
+    soup = BeautifulSoup(html_text, 'html.parser')
+    lines, in_link_run = [], False
+    for element in soup.find_all(['h1', 'h2', 'h3', 'h4', 'li', 'p', 'a']):
+        text = ' '.join(element.get_text(' ').split()).rstrip(' →')
+        if element.name == 'a':
+            # Links inside the elements above are written with them
+            if not text or element.find_parent(['h1', 'h2', 'h3', 'h4', 'li', 'p']):
+                continue
+            if not in_link_run:
+                lines.append('')  # A run of standalone links (e.g. the footer) gets its own paragraph
+            lines.append(f"{text}: {element.get('href', '')}")
+            in_link_run = True
+            continue
+        in_link_run = False
+        if element.name in ('h1', 'h2'):
+            lines += ['', text.upper(), '=' * len(text) if element.name == 'h1' else '-' * len(text)]
+        elif element.name in ('h3', 'h4'):
+            lines += ['', text]
+        elif element.name == 'li':
+            lines.append(f"- {text}")
+        else:
+            link = element.find('a', href=True)
+            link_text = ' '.join(link.get_text(' ').split()).rstrip(' →') if link else None
+            lines.append(f"{text}: {link['href']}" if link and text == link_text else text)
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip() + '\n'
+
+
+def text_part(text, subtype):
+    """A MIMEText part in quoted-printable UTF-8."""
+    return MIMEText(text, subtype, UTF8_QP)
@@ -0,0 +1,169 @@
+"""Full-text enrichment for NewsAPI articles.
+
+NewsAPI truncates `content` to about 200 characters, so the Australian
+summaries were often written from a one-line description. This stage fetches
+the selected articles' pages concurrently (a bounded pool, at most
+PER_HOST_LIMIT requests in flight per host), pulls out the main text with a
+paragraph-density boilerplate filter, caps it to a token budget and caches it
+by canonical URL so a page is downloaded once.
+"""
+import dataclasses
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+
+import tracing
+
+MAX_WORKERS = 8
+PER_HOST_LIMIT = 2
+CHARS_PER_TOKEN = 4  # Rough average for English prose
+MIN_PARAGRAPH_CHARS = 60  # Shorter blocks are usually captions, bylines or buttons
+MAX_LINK_DENSITY = 0.5  # Paragraphs that are mostly link text are navigation
+CACHE_MAX_ENTRIES = 500
+
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'figure',
+                    'iframe', 'svg', 'button']
+BOILERPLATE_HINTS = re.compile(r'(comment|share|social|related|promo|newsletter|subscribe|cookie|footer|sidebar|'
+                               r'advert|breadcrumb|menu)', re.I)
+
+
+def extract_main_text(page_html):
+    """Return the main article text of an HTML page, or '' if none is found.
+
+    Drops boilerplate elements, then keeps the paragraphs of the container
+    holding the most paragraph text (<article> or <main> when present),
+    skipping short and link-heavy paragraphs.
+    """
+    soup = BeautifulSoup(page_html, 'html.parser')
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(attrs={'class': BOILERPLATE_HINTS}):
+        if tag.name not in ('html', 'body', 'article', 'main'):
+            tag.decompose()
+
+    root = soup.find('article') or soup.find('main')
+    if root is None:
+        # Score each paragraph's parent by the text it holds; the densest container is the article body
+        totals = {}
+        for p in soup.find_all('p'):
+            parent = p.parent
+            totals[id(parent)] = (parent, totals.get(id(parent), (parent, 0))[1] + len(p.get_text(strip=True)))
+        if not totals:
+            return ''
+        root = max(totals.values(), key=lambda item: item[1])[0]
+
+    paragraphs = []
+    for p in root.find_all(['p', 'li']) or [root]:
+        text = ' '.join(p.get_text(' ', strip=True).split())
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        link_chars = sum(len(a.get_text(strip=True)) for a in p.find_all('a'))
+        if link_chars / len(text) > MAX_LINK_DENSITY:
+            continue
+        paragraphs.append(text)
+    return "\n".join(paragraphs)
+
+
+def cap_to_budget(text, token_budget):
+    """Trim text to roughly `token_budget` tokens, ending on a sentence (or word) boundary."""
+    limit = token_budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    sentence_end = max(cut.rfind('. '), cut.rfind('.\n'))
+    if sentence_end > limit // 2:
+        return cut[:sentence_end + 1]
+    return cut.rsplit(' ', 1)[0]
+
+
+def load_cache(path):
+    """Load cached page text ({canonical url: {'text': str, 'fetched_at': iso}})."""
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(path, cache):
+    # Dicts keep insertion order, so the oldest entries are dropped first
+    for key in list(cache)[:max(0, len(cache) - CACHE_MAX_ENTRIES)]:
+        del cache[key]
+    # Written whole then renamed, so a reader in another process (backfill workers) never sees half a file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        Path(tmp).write_text(json.dumps(cache))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Error saving enrichment cache: {e}")
+
+
+class _HostLimiter:
+    """Per-host semaphores so no site gets more than `limit` concurrent requests."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.limit)
+            return self._semaphores[host]
+
+
+def enrich_articles(articles, fetch_page, cache, token_budget, max_workers=MAX_WORKERS,
+                    per_host_limit=PER_HOST_LIMIT):
+    """Replace each article's truncated 'content' with its page's main text when that is longer.
+
+    fetch_page(url) returns a requests.Response. Pages are fetched
+    concurrently and stored in `cache` (by canonical URL); failed fetches are
+    not cached, so they are retried on the next run. Returns (articles, number
+    enriched); enriched articles are replaced by copies carrying the page text.
+    """
+    limiter = _HostLimiter(per_host_limit)
+
+    def fetch(url):
+        with limiter(url):
+            with tracing.external_call('article.fetch'):
+                response = fetch_page(url)
+        response.raise_for_status()
+        return extract_main_text(response.text)
+
+    to_fetch = {}
+    for article in articles:
+        key = article.canonical_url
+        if key and key not in cache:
+            to_fetch.setdefault(key, article.url)
+    tracing.count('enrich.cache_hits', len(articles) - len(to_fetch))
+
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(to_fetch)), thread_name_prefix='enrich') as pool:
+            futures = {key: pool.submit(fetch, url) for key, url in to_fetch.items()}
+            for key, future in futures.items():
+                try:
+                    text = future.result()
+                except Exception as e:
+                    tracing.count('enrich.failures')
+                    print(f"Could not fetch full text for {to_fetch[key]}: {e}")
+                    continue
+                cache[key] = {'text': text, 'fetched_at': datetime.now(timezone.utc).isoformat()}
+
+    result, enriched = [], 0
+    for article in articles:
+        entry = cache.get(article.canonical_url)
+        text = cap_to_budget(entry['text'], token_budget) if entry and entry['text'] else ''
+        if len(text) > len(article.content or ''):
+            article = dataclasses.replace(article, content=text, content_source='page')
+            enriched += 1
+        result.append(article)
+    tracing.count('enrich.articles_enriched', enriched)
+    return result, enriched
@@ -0,0 +1,102 @@
+"""Offline extractive summarizer used when Gemini is unavailable (and for draft runs).
+
+TextRank over sentence vectors: each sentence becomes an L2-normalised
+term-frequency vector (NumPy), sentences are linked by cosine similarity, and
+PageRank over that graph scores them. The top-scoring sentences are returned
+as bullet points in their original order. No network, a few milliseconds per
+article.
+"""
+import re
+
+import numpy as np
+
+DAMPING = 0.85
+ITERATIONS = 50
+TOLERANCE = 1e-6
+MIN_FRAGMENT_WORDS = 4  # Shorter fragments aren't useful on their own as a bullet
+
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from had has have he her
+his how i if in into is it its just may more most new not of on or our out over she so some such than that the
+their them then there these they this those through to up was we were what when which while who will with would
+you your
+""".split())
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+(?=[A-Z0-9"\'(\[])')
+_CLAUSE_BREAK = re.compile(r';\s+|\s+[—–-]\s+|,\s+(?:and|but|while|which|with)\s+')
+_WORD = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+_TRUNCATION = re.compile(r'\s*\[\+\d+ chars\]\s*$')  # NewsAPI's "... [+1234 chars]" suffix
+
+
+def split_sentences(text):
+    """Split text into sentences, dropping empty fragments."""
+    text = _TRUNCATION.sub('', ' '.join((text or '').split()))
+    return [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+
+
+def _fragments(text, wanted):
+    """Sentences, broken further at clause boundaries when there are fewer than `wanted`."""
+    sentences = split_sentences(text)
+    if len(sentences) >= wanted:
+        return sentences
+    fragments = []
+    for sentence in sentences:
+        parts = [p.strip(' ,;') for p in _CLAUSE_BREAK.split(sentence)]
+        parts = [p for p in parts if len(p.split()) >= MIN_FRAGMENT_WORDS]
+        fragments.extend(parts if len(parts) > 1 else [sentence])
+    return fragments
+
+
+def _tokens(sentence):
+    return [w for w in _WORD.findall(sentence.lower()) if w not in STOPWORDS]
+
+
+def sentence_vectors(sentences, title=''):
+    """L2-normalised term-frequency matrix (sentences x vocabulary); title words get extra weight."""
+    token_lists = [_tokens(s) for s in sentences]
+    vocabulary = {}
+    for tokens in token_lists:
+        for token in tokens:
+            vocabulary.setdefault(token, len(vocabulary))
+    matrix = np.zeros((len(sentences), max(len(vocabulary), 1)))
+    for row, tokens in enumerate(token_lists):
+        for token in tokens:
+            matrix[row, vocabulary[token]] += 1.0
+    title_tokens = [vocabulary[t] for t in _tokens(title) if t in vocabulary]
+    if title_tokens:
+        matrix[:, title_tokens] *= 1.5
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def textrank(vectors):
+    """PageRank scores over the cosine-similarity graph of the given sentence vectors."""
+    n = len(vectors)
+    if n == 1:
+        return np.ones(1)
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    # Sentences sharing no words with any other link uniformly
+    transition = np.where(row_sums > 0, similarity / np.where(row_sums == 0, 1.0, row_sums), 1.0 / n)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(ITERATIONS):
+        updated = (1 - DAMPING) / n + DAMPING * transition.T @ scores
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def summarize(text, title='', bullets=5):
+    """Return up to `bullets` key sentences from text as '- ' bullet lines, in original order."""
+    fragments = _fragments(text, bullets)
+    if not fragments:
+        return f"- {title}" if title else ''
+    if len(fragments) <= bullets:
+        chosen = fragments
+    else:
+        scores = textrank(sentence_vectors(fragments, title))
+        keep = sorted(np.argsort(-scores, kind='stable')[:bullets])
+        chosen = [fragments[i] for i in keep]
+    return "\n".join(f"- {fragment[0].upper()}{fragment[1:]}" for fragment in chosen)
@@ -0,0 +1,222 @@
+"""Bounded-latency HTTP fetch layer shared by all outbound HTTP calls.
+
+Every request gets connect/read timeouts, retries with jittered exponential
+backoff on transient failures (connection errors, timeouts, 429 and 5xx),
+a per-host circuit breaker, and optionally a hedged second request once the
+first has been outstanding longer than the host's recent latency percentile.
+
+`Fetcher.get()` has the same shape as `requests.Session.get()`, so a Fetcher
+can be handed to NewsApiClient(session=...) as well as used directly.
+`Fetcher.stats()` reports per-host tail latency, retries, hedges and breaker
+state for tuning.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlsplit
+
+import requests
+
+CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '20'))
+MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', '0.5'))  # Seconds; doubles per attempt
+BACKOFF_MAX = 8.0
+HEDGE_PERCENTILE = float(os.getenv('HTTP_HEDGE_PERCENTILE', '0'))  # e.g. 95; 0 disables hedging
+HEDGE_MIN_SAMPLES = 20  # Don't hedge until a host has this many latency samples
+BREAKER_THRESHOLD = int(os.getenv('HTTP_BREAKER_THRESHOLD', '5'))  # Consecutive failures before opening
+BREAKER_COOLDOWN = float(os.getenv('HTTP_BREAKER_COOLDOWN', '60'))  # Seconds before a trial request
+
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+LATENCY_WINDOW = 200  # Samples kept per host for percentiles
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of contacting a host whose circuit breaker is open."""
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class HostState:
+    """Latency window, counters and circuit breaker for one host."""
+
+    def __init__(self):
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def breaker_state(self, now):
+        if self.opened_at is None:
+            return 'closed'
+        return 'open' if now - self.opened_at < BREAKER_COOLDOWN else 'half-open'
+
+    def summary(self):
+        values = [round(v, 4) for v in sorted(self.latencies)]
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'retries': self.retries,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'p50': _percentile(values, 50),
+            'p90': _percentile(values, 90),
+            'p99': _percentile(values, 99),
+            'max': values[-1] if values else None,
+            'breaker': self.breaker_state(time.monotonic()),
+        }
+
+
+class Fetcher:
+    """requests.Session wrapper adding timeouts, retries, hedging and circuit breaking."""
+
+    def __init__(self, session=None, timeout=None, max_retries=MAX_RETRIES, hedge_percentile=HEDGE_PERCENTILE):
+        self.session = session or requests.Session()
+        self.timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+        self.max_retries = max_retries
+        self.hedge_percentile = hedge_percentile
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostState()
+            return host, self._hosts[host]
+
+    # --- Circuit breaker ---
+
+    def _check_breaker(self, host, state):
+        with self._lock:
+            status = state.breaker_state(time.monotonic())
+            if status == 'open' or (status == 'half-open' and state.trial_in_flight):
+                raise CircuitOpenError(f"Circuit open for {host} after {state.consecutive_failures} consecutive failures")
+            if status == 'half-open':
+                state.trial_in_flight = True
+
+    def _record(self, state, ok, latency=None):
+        with self._lock:
+            state.requests += 1
+            state.trial_in_flight = False
+            if latency is not None:
+                state.latencies.append(latency)
+            if ok:
+                state.consecutive_failures = 0
+                state.opened_at = None
+            else:
+                state.failures += 1
+                state.consecutive_failures += 1
+                if state.consecutive_failures >= BREAKER_THRESHOLD:
+                    state.opened_at = time.monotonic()
+
+    def _release(self, state):
+        """Let another request try a half-open host when an attempt ends without a verdict."""
+        with self._lock:
+            state.trial_in_flight = False
+
+    # --- Single attempt, optionally hedged ---
+
+    def _timed_get(self, url, kwargs):
+        start = time.perf_counter()
+        response = self.session.get(url, **kwargs)
+        return response, time.perf_counter() - start
+
+    def _hedge_after(self, state):
+        if not self.hedge_percentile or len(state.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        with self._lock:
+            return _percentile(sorted(state.latencies), self.hedge_percentile)
+
+    def _attempt(self, url, state, kwargs):
+        delay = self._hedge_after(state)
+        if delay is None:
+            return self._timed_get(url, kwargs)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='http-hedge')
+        first = self._executor.submit(self._timed_get, url, kwargs)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+        with self._lock:
+            state.hedges += 1
+        second = self._executor.submit(self._timed_get, url, kwargs)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is second:
+                    with self._lock:
+                        state.hedge_wins += 1
+                return result
+        raise error
+
+    # --- Public API ---
+
+    def get(self, url, **kwargs):
+        """GET url with retries; returns the final Response (which may still be a 4xx/5xx)."""
+        kwargs.setdefault('timeout', self.timeout)
+        host, state = self._host(url)
+        attempt = 0
+        while True:
+            self._check_breaker(host, state)
+            try:
+                response, latency = self._attempt(url, state, kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(state, ok=False)
+                if attempt >= self.max_retries:
+                    raise
+                wait_for = self._backoff(attempt)
+                print(f"Transient error fetching {url} ({type(e).__name__}), retrying in {wait_for:.1f}s")
+            except requests.RequestException:
+                # Redirect loops, broken chunked bodies and the like: a failure, but not worth retrying
+                self._record(state, ok=False)
+                raise
+            except BaseException:
+                self._release(state)
+                raise
+            else:
+                transient = response.status_code in TRANSIENT_STATUS
+                self._record(state, ok=not transient, latency=latency)
+                if not transient or attempt >= self.max_retries:
+                    return response
+                wait_for = self._backoff(attempt, response.headers.get('Retry-After'))
+                print(f"HTTP {response.status_code} from {url}, retrying in {wait_for:.1f}s")
+            attempt += 1
+            with self._lock:
+                state.retries += 1
+            time.sleep(wait_for)
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(float(retry_after), BACKOFF_MAX)
+            except ValueError:
+                pass
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def stats(self):
+        """Per-host latency percentiles (seconds), retry/hedge counts and breaker state."""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: state.summary() for host, state in hosts.items()}
@@ -0,0 +1,107 @@
+"""Tiered Gemini model router with a per-call deadline and hedged fallback.
+
+The router sends each prompt to the primary model. If no valid answer has
+arrived when the deadline passes, or the primary fails first, the same prompt
+goes to the next (cheaper/faster) tier while the earlier request keeps
+running. The first valid answer wins. Responses carry `.tier` and `.latency`
+so callers can record which tier served each article.
+
+The router looks like a model (`generate_content(prompt)` returning an object
+with `.text`), so it can be used wherever the scripts expect `model`, and it
+can be exercised offline by giving it stub models (see stand_ins.py and
+benchmarks/model_router_benchmark.py).
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class RouterTimeout(TimeoutError):
+    """No tier produced a valid answer before the overall timeout."""
+
+
+class RoutedResponse:
+    """A model response annotated with the tier that produced it."""
+
+    def __init__(self, text, tier, latency, raw=None):
+        self.text = text
+        self.tier = tier
+        self.latency = latency
+        self.raw = raw
+
+
+def has_text(response):
+    """Default validity check: the response has non-empty text (blocked responses raise on .text)."""
+    try:
+        return bool(response.text and response.text.strip())
+    except Exception:
+        return False
+
+
+class ModelRouter:
+    """Routes generate_content() across ordered (name, model) tiers with deadline-based hedging."""
+
+    def __init__(self, tiers, deadline=20.0, timeout=90.0, validate=has_text, max_workers=8):
+        if not tiers:
+            raise ValueError("ModelRouter needs at least one tier")
+        self.tiers = list(tiers)
+        self.deadline = deadline
+        self.timeout = timeout
+        self.validate = validate
+        self.model_name = getattr(self.tiers[0][1], 'model_name', self.tiers[0][0])
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='model-router')
+        self._lock = threading.Lock()
+        self.served = {name: 0 for name, _ in self.tiers}
+        self.hedges = 0
+        self.failures = 0
+
+    def _call(self, tier_index, prompt, kwargs):
+        name, model = self.tiers[tier_index]
+        start = time.perf_counter()
+        response = model.generate_content(prompt, **kwargs)
+        return tier_index, response, time.perf_counter() - start
+
+    def generate_content(self, prompt, **kwargs):
+        started = time.perf_counter()
+        give_up_at = started + self.timeout
+        pending = {self._executor.submit(self._call, 0, prompt, kwargs)}
+        next_tier = 1
+        last_error = None
+        while pending:
+            now = time.perf_counter()
+            if now >= give_up_at:
+                break
+            # Wait until the next tier's deadline (or the overall timeout if no tiers are left)
+            hedge_at = started + self.deadline * next_tier if next_tier < len(self.tiers) else give_up_at
+            done, pending = wait(pending, timeout=max(0.0, min(hedge_at, give_up_at) - now),
+                                 return_when=FIRST_COMPLETED)
+            launch_next = not done
+            for future in done:
+                try:
+                    tier_index, response, latency = future.result()
+                except Exception as e:
+                    last_error = e
+                    launch_next = True
+                    continue
+                if self.validate(response):
+                    name = self.tiers[tier_index][0]
+                    with self._lock:
+                        self.served[name] += 1
+                    return RoutedResponse(response.text, name, time.perf_counter() - started, raw=response)
+                last_error = ValueError(f"Invalid response from tier {self.tiers[tier_index][0]}")
+                launch_next = True
+            if launch_next and next_tier < len(self.tiers):
+                with self._lock:
+                    self.hedges += 1
+                pending.add(self._executor.submit(self._call, next_tier, prompt, kwargs))
+                next_tier += 1
+        with self._lock:
+            self.failures += 1
+        if pending:
+            raise RouterTimeout(f"No valid model response within {self.timeout}s")
+        raise last_error
+
+    def stats(self):
+        with self._lock:
+            return {'served': dict(self.served), 'hedges': self.hedges, 'failures': self.failures,
+                    'deadline': self.deadline, 'timeout': self.timeout}
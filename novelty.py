@@ -0,0 +1,135 @@
+"""Cross-week novelty index: spots stories an earlier digest already covered.
+
+URL de-duplication misses follow-up coverage, because a story summarized last
+week comes back as a new article, often on another site with a reworded
+title. Every article a digest summarizes is kept as a hashed term-frequency
+vector:
+
+  - unigrams and bigrams from ranking.terms() (title terms counted twice) are
+    bucketed into FEATURES columns by a stable hash with a hashed sign, so
+    the vocabulary never has to be stored
+  - counts are sublinear (1 + log tf) and each row is L2-normalised
+  - rows live in a float32 matrix in <path>.npy, memory-mapped rather than
+    read in, with one entry per row in <path>.json (URL, title, digest date)
+
+Before anything is summarized, each candidate is compared with every row
+from the previous WEEKS digests in one sparse matrix-vector product. Rows
+from the digest being built are ignored, so re-running a week doesn't
+suppress its own stories. Rows older than the window are dropped when new
+ones are added.
+"""
+import json
+import math
+import os
+import zlib
+from collections import Counter
+from datetime import date, timedelta
+
+import numpy as np
+from scipy import sparse
+
+import ranking
+
+FEATURES = 2 ** 13  # Hashed columns per vector: 32 KB per stored article
+WEEKS = 4
+COPY_CHUNK = 512  # Rows copied at a time when the matrix is rewritten
+
+
+def _feature(term):
+    """(column, sign) for a term; crc32 is stable across runs, unlike hash()."""
+    h = zlib.crc32(term.encode('utf-8'))
+    return h % FEATURES, 1.0 if h & 0x80000000 else -1.0
+
+
+def vectorize(articles):
+    """CSR matrix with one L2-normalised hashed TF row per Article."""
+    rows, columns, values = [], [], []
+    for row, (title, summary, content) in enumerate(article.lowered for article in articles):
+        counts = Counter(ranking.terms(' '.join([title] * ranking.TITLE_WEIGHT + [summary, content])))
+        for term, count in counts.items():
+            column, sign = _feature(term)
+            rows.append(row)
+            columns.append(column)
+            values.append(sign * (1 + math.log(count)))
+    # Colliding terms are summed into their shared column
+    matrix = sparse.csr_matrix((values, (rows, columns)), shape=(len(articles), FEATURES), dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    return sparse.diags(1 / np.where(norms == 0, 1.0, norms)).astype(np.float32) @ matrix
+
+
+class NoveltyIndex:
+    """Vectors of the articles recent digests covered, memory-mapped from <path>.npy."""
+
+    def __init__(self, path, weeks=WEEKS):
+        self.path = path
+        self.weeks = weeks
+        self.rows = []  # {'url', 'title', 'digest_date'} for each matrix row
+        self.matrix = np.zeros((0, FEATURES), dtype=np.float32)
+        try:
+            with open(f"{path}.json") as f:
+                rows = json.load(f)['rows']
+            matrix = np.load(f"{path}.npy", mmap_mode='r')
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Error loading novelty index: {e}")
+            return
+        if matrix.shape != (len(rows), FEATURES):
+            # A run stopped between writing the two files, or FEATURES changed
+            print(f"Novelty index {path} doesn't match its row list, starting a new one")
+            return
+        self.rows, self.matrix = rows, matrix
+
+    def earliest(self, digest_date):
+        return (date.fromisoformat(digest_date) - timedelta(weeks=self.weeks)).isoformat()
+
+    def repeats(self, articles, digest_date, threshold):
+        """{url: earlier story} for the articles at least `threshold` similar to one from a previous digest.
+
+        The earlier story is a dict with its url, title, digest_date and the
+        cosine similarity.
+        """
+        earliest = self.earliest(digest_date)
+        live = np.array([earliest <= row['digest_date'] < digest_date for row in self.rows], dtype=bool)
+        if not articles or not live.any():
+            return {}
+        # Each row of the product is one candidate's matrix-vector cosine against every stored row
+        similarity = np.asarray(vectorize(articles) @ self.matrix.T)
+        similarity[:, ~live] = -1.0
+        best = similarity.argmax(axis=1)
+        found = {}
+        for article, row, score in zip(articles, best, similarity[np.arange(len(articles)), best]):
+            if score >= threshold:
+                found[article.url] = dict(self.rows[row], similarity=round(float(score), 3))
+        return found
+
+    def add(self, articles, digest_date):
+        """Store the articles a digest covered and drop rows older than the window.
+
+        The matrix is rewritten to a temporary file and renamed over the old
+        one, so a reader never maps half a matrix.
+        """
+        urls = {article.url for article in articles}
+        earliest = self.earliest(digest_date)
+        kept = [i for i, row in enumerate(self.rows)
+                if row['digest_date'] >= earliest and not (row['digest_date'] == digest_date and row['url'] in urls)]
+        rows = [self.rows[i] for i in kept] + [{'url': article.url, 'title': article.title, 'digest_date': digest_date}
+                                               for article in articles]
+        if not rows:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        matrix = np.lib.format.open_memmap(f"{self.path}.tmp.npy", mode='w+', dtype=np.float32,
+                                           shape=(len(rows), FEATURES))
+        for start in range(0, len(kept), COPY_CHUNK):
+            chunk = kept[start:start + COPY_CHUNK]
+            matrix[start:start + len(chunk)] = self.matrix[chunk]
+        if articles:
+            matrix[len(kept):] = vectorize(articles).toarray()
+        matrix.flush()
+        del matrix
+        self.matrix = None
+        os.replace(f"{self.path}.tmp.npy", f"{self.path}.npy")
+        with open(f"{self.path}.json.tmp", 'w') as f:
+            json.dump({'features': FEATURES, 'rows': rows}, f)
+        os.replace(f"{self.path}.json.tmp", f"{self.path}.json")
+        self.rows, self.matrix = rows, np.load(f"{self.path}.npy", mmap_mode='r')
@@ -0,0 +1,250 @@
+"""Local preview server for the digest layout.
+
+Re-renders the last run's summaries (LAST_DIGEST_PATH, written by every
+daily_emailer.py run) through the email template on each request. Nothing
+is scraped, summarized or sent. The server watches the template modules,
+the assets and the saved digest. When one changes it reloads the modules
+and any open preview page refreshes itself:
+
+    python preview.py                   # http://127.0.0.1:8000/
+    python preview.py --port 8001 --digest /tmp/last_digest.json
+
+With no saved digest yet, build one offline from the local stand-ins first:
+    python preview.py --stand-ins
+
+Pages: / lists the segments, /<segment id> is the HTML body as sent
+(compacted), /<segment id>?raw=1 is the template output before compaction
+and /<segment id>.txt is the plain-text part.
+"""
+import argparse
+import html
+import importlib
+import json
+import mimetypes
+import os
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# daily_emailer reads its configuration at import time; the preview never uses the credentials
+os.environ.setdefault('GEMINI_API_KEY', 'preview')
+os.environ.setdefault('SMTP_PORT', '465')
+os.environ.setdefault('TRACE_REPORT_PATH', '')
+
+import daily_emailer  # noqa: E402
+import email_body  # noqa: E402
+
+# Reloaded in this order when any of them change, so daily_emailer picks up the others
+TEMPLATE_MODULES = ['email_body', 'segments', 'daily_emailer']
+POLL_INTERVAL = 0.1  # Seconds between file checks
+LONG_POLL_TIMEOUT = 25  # Seconds a page's change request waits before asking again
+
+RELOAD_SCRIPT = """<script>
+(function poll() {
+  fetch('/changes?version=%d').then(function (r) { return r.json(); }).then(function (d) {
+    if (d.changed) { location.reload(); } else { poll(); }
+  }).catch(function () { setTimeout(poll, 1000); });
+})();
+</script>"""
+
+
+class Preview:
+    """The saved digest, the template modules and a version number bumped on every change."""
+
+    def __init__(self, digest_path):
+        self.digest_path = Path(digest_path)
+        self.version = 0
+        self.stale_modules = set()
+        self._changed = threading.Condition()
+        self._lock = threading.Lock()
+        self._mtimes = self._scan()
+
+    def watched_files(self):
+        files = {Path(f"{name}.py"): name for name in TEMPLATE_MODULES}
+        files.update((path, None) for path in Path('assets').rglob('*') if path.is_file())
+        files[self.digest_path] = None
+        return files
+
+    def _scan(self):
+        mtimes = {}
+        for path in self.watched_files():
+            try:
+                mtimes[path] = path.stat().st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    def watch(self):
+        """Bump the version whenever a watched file changes (runs in its own thread)."""
+        while True:
+            time.sleep(POLL_INTERVAL)
+            mtimes = self._scan()
+            changed = [path for path in mtimes if mtimes[path] != self._mtimes.get(path)]
+            self._mtimes = mtimes
+            if not changed:
+                continue
+            modules = self.watched_files()
+            with self._lock:
+                self.stale_modules.update(modules[path] for path in changed if modules.get(path))
+            print(f"[preview] Changed: {', '.join(str(path) for path in changed)}")
+            with self._changed:
+                self.version += 1
+                self._changed.notify_all()
+
+    def wait_for_change(self, version, timeout=LONG_POLL_TIMEOUT):
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version != version
+
+    def load(self):
+        """(global items, {segment id: regional items}) from the saved digest, reloading edited modules first."""
+        with self._lock:
+            if self.stale_modules:
+                for name in TEMPLATE_MODULES:
+                    if name in self.stale_modules or name == 'daily_emailer':
+                        importlib.reload(importlib.import_module(name))
+                self.stale_modules.clear()
+        with open(self.digest_path) as f:
+            digest = json.load(f)
+        return digest['global'], digest['regional']
+
+    def segments(self):
+        return daily_emailer.SEGMENTS
+
+    def render(self, segment_id, raw=False, text=False):
+        """One segment's body, rendered from the saved summaries by the current template."""
+        global_items, regional_items = self.load()
+        segment = next((s for s in self.segments() if s['id'] == segment_id), None)
+        if segment is None:
+            raise KeyError(segment_id)
+        regional = regional_items.get(segment_id, [])
+        if raw:
+            return daily_emailer.render_bullet_points_html(global_items, regional, segment)
+        body = daily_emailer.render_email_html(global_items, regional, segment)
+        return email_body.html_to_text(body) if text else body
+
+
+def build_stand_in_digest(digest_path):
+    """Build a digest offline against the local stand-ins and save it where the preview reads it."""
+    import stand_ins
+    print("[preview] Building a digest from the local stand-ins...")
+    with stand_ins.LocalStandIns(daily_emailer):
+        global_items, regional_items = daily_emailer.build_digest()
+    # The stand-ins keep a run's saved digests in their scratch directory; this one is asked for
+    saved = daily_emailer.LAST_DIGEST_PATH, daily_emailer.DIGEST_HISTORY_DIR
+    daily_emailer.LAST_DIGEST_PATH, daily_emailer.DIGEST_HISTORY_DIR = str(digest_path), ''
+    try:
+        daily_emailer.save_last_digest(global_items, regional_items)
+    finally:
+        daily_emailer.LAST_DIGEST_PATH, daily_emailer.DIGEST_HISTORY_DIR = saved
+
+
+def make_preview_server(preview, port):
+    """Localhost HTTP server for the preview pages, the assets and the change long-poll."""
+
+    class PreviewHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type):
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _page(self, status, body):
+            # Inline images point at /assets/ instead of the message's cid: parts
+            for cid, path in daily_emailer.CID_ASSETS.items():
+                body = body.replace(f'cid:{cid}', f'/{path}')
+            script = RELOAD_SCRIPT % preview.version
+            body = body.replace('</body>', script + '</body>') if '</body>' in body else body + script
+            self._send(status, body, 'text/html; charset=utf-8')
+
+        def _index(self):
+            items = "".join(f"<li><a href='/{s['id']}'>{html.escape(s['name'])}</a> "
+                            f"(<a href='/{s['id']}?raw=1'>uncompacted</a>, <a href='/{s['id']}.txt'>text</a>)</li>"
+                            for s in preview.segments())
+            return (f"<html><head><meta charset='utf-8'><title>Digest preview</title></head>"
+                    f"<body style='font-family: Arial, sans-serif;'><h1>Digest preview</h1>"
+                    f"<p>Rendering {html.escape(str(preview.digest_path))}</p><ul>{items}</ul></body></html>")
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            path = url.path.strip('/')
+            if path == 'changes':
+                version = int(query.get('version', ['0'])[0])
+                changed = preview.wait_for_change(version)
+                self._send(200, json.dumps({'changed': changed, 'version': preview.version}), 'application/json')
+                return
+            if path.startswith('assets/'):
+                asset = Path(path)
+                if '..' in asset.parts or not asset.is_file():
+                    self._send(404, 'not found', 'text/plain')
+                else:
+                    self._send(200, asset.read_bytes(), mimetypes.guess_type(asset.name)[0] or 'application/octet-stream')
+                return
+            start = time.perf_counter()
+            try:
+                if not path:
+                    preview.load()  # Picks up template edits before listing segments
+                    self._page(200, self._index())
+                    return
+                segment_id, text = (path[:-4], True) if path.endswith('.txt') else (path, False)
+                body = preview.render(segment_id, raw='raw' in query, text=text)
+            except KeyError:
+                self._page(404, f"<p>No segment '{html.escape(path)}'. <a href='/'>All segments</a></p>")
+                return
+            except FileNotFoundError:
+                self._page(404, f"<p>No saved digest at {html.escape(str(preview.digest_path))}. Run "
+                                f"<code>python preview.py --stand-ins</code> to make one offline.</p>")
+                return
+            except Exception:
+                # A half-edited template shows its error; the page reloads once the file is saved again
+                self._page(500, f"<pre>{html.escape(traceback.format_exc())}</pre>")
+                return
+            if text:
+                self._send(200, body, 'text/plain; charset=utf-8')
+            else:
+                self._page(200, body)
+            print(f"[preview] Rendered /{path} in {1000 * (time.perf_counter() - start):.1f} ms")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), PreviewHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preview the digest layout from the last run's saved summaries.")
+    parser.add_argument('--port', type=int, default=8000, help='Localhost port (default 8000)')
+    parser.add_argument('--digest', default=daily_emailer.LAST_DIGEST_PATH or 'last_digest.json',
+                        help='Saved digest to render (default LAST_DIGEST_PATH or last_digest.json)')
+    parser.add_argument('--stand-ins', action='store_true',
+                        help='First build a digest from the local stand-ins and save it to --digest')
+    args = parser.parse_args()
+
+    digest_path = Path(args.digest).resolve()
+    os.chdir(Path(__file__).resolve().parent)  # Template modules and assets are watched by relative path
+    if args.stand_ins:
+        build_stand_in_digest(digest_path)
+    preview = Preview(digest_path)
+    threading.Thread(target=preview.watch, daemon=True).start()
+    server = make_preview_server(preview, args.port)
+    print(f"[preview] Serving {digest_path} on http://127.0.0.1:{args.port}/ (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
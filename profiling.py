@@ -0,0 +1,217 @@
+"""Built-in CPU and memory profiling for the digest entry points (`--profile`).
+
+Hooks into the tracing spans so every stage (scrape, parse, filter, generate,
+render, send) gets its own cProfile profile and tracemalloc snapshot diff.
+Spans are followed in whichever thread opens them, so stages running in the
+source, segment and enrichment pools are profiled too: each span gets a
+cProfile profile enabled in its own thread, merged per stage in the reports.
+Nested stages are profiled separately from their parent: when `parse` starts
+inside `scrape`, the scrape profiler is paused until parse ends. Wall times
+are summed over spans, so stages that run in several threads at once can add
+up to more than the run took, and memory diffs of overlapping stages include
+each other's allocations.
+
+A background sampler also records the stack of the main thread and of every
+thread inside a span every few milliseconds, including time spent blocked on
+I/O, and writes it in the folded-stack format read by flamegraph.pl and
+speedscope.
+
+Output (in --profile-dir):
+    summary.txt             wall time, call count and top hot spots per stage
+    <stage>.txt / .pstats   cProfile report sorted by own time and cumulative time
+    <stage>.memory.txt      largest allocation growth per source line
+    flamegraph.folded       `stage;frame;frame count` lines for flamegraph tools
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+import tracing
+
+SAMPLE_INTERVAL = 0.005  # Seconds between flamegraph stack samples
+TOP_N = 30  # Rows per hot-spot report
+
+
+def add_arguments(parser):
+    """Add the --profile and --profile-dir options to an entry point's parser."""
+    parser.add_argument('--profile', action='store_true',
+                        help='Capture per-stage cProfile/tracemalloc reports and a flamegraph file')
+    parser.add_argument('--profile-dir', default='profile_output',
+                        help='Where --profile writes its reports (default: profile_output)')
+
+
+def _snapshot():
+    """Take a tracemalloc snapshot that leaves out the profiler's own allocations."""
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+
+
+class StageProfiler:
+    """Tracing listener that keeps cProfile profiles and memory diffs per stage, in every thread."""
+
+    def __init__(self):
+        self.profiles = {}  # stage -> [cProfile.Profile], one per span
+        self.memory = {}
+        self.wall = Counter()
+        self.calls = Counter()
+        self.unprofiled = Counter()  # Spans cProfile couldn't follow (one active profiler at a time on 3.12+)
+        self._stacks = {}  # thread ident -> [[stage, start time, tracemalloc snapshot, profiler overhead, profile]]
+        self._lock = threading.Lock()
+
+    def current_stage(self, thread_id=None):
+        stack = self._stacks.get(threading.get_ident() if thread_id is None else thread_id)
+        return stack[-1][0] if stack else 'untraced'
+
+    def _enable(self, frame):
+        try:
+            frame[4].enable()
+        except ValueError:
+            frame[4] = None
+            with self._lock:
+                self.unprofiled[frame[0]] += 1
+
+    def span_started(self, name, attrs):
+        hook_start = time.perf_counter()
+        stack = self._stacks.setdefault(threading.get_ident(), [])
+        if stack and stack[-1][4]:
+            stack[-1][4].disable()
+        snapshot = _snapshot()
+        if stack:
+            stack[-1][3] += time.perf_counter() - hook_start
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.setdefault(name, []).append(profile)
+        stack.append([name, time.perf_counter(), snapshot, 0.0, profile])
+        self._enable(stack[-1])
+
+    def span_ended(self, name):
+        thread_id = threading.get_ident()
+        stack = self._stacks.get(thread_id)
+        if not stack:
+            return
+        if stack[-1][4]:
+            stack[-1][4].disable()
+        hook_start = time.perf_counter()
+        stage, start, before, overhead, _ = stack.pop()
+        after = _snapshot()
+        with self._lock:
+            # Snapshot time spent in nested stages' hooks is not part of this stage's wall time
+            self.wall[stage] += hook_start - start - overhead
+            self.calls[stage] += 1
+            self.memory.setdefault(stage, []).extend(after.compare_to(before, 'lineno')[:TOP_N])
+        if stack:
+            stack[-1][3] += time.perf_counter() - hook_start
+            if stack[-1][4]:
+                self._enable(stack[-1])
+        else:
+            del self._stacks[thread_id]  # Idents are reused once a thread exits
+
+    def write(self, output_dir):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        summary = io.StringIO()
+        summary.write(f"{'stage':12s} {'spans':>6s} {'wall (s)':>10s}\n")
+        for stage, seconds in self.wall.most_common():
+            summary.write(f"{stage:12s} {self.calls[stage]:6d} {seconds:10.4f}\n")
+
+        for stage, skipped in self.unprofiled.items():
+            summary.write(f"({stage}: {skipped} spans overlapped another thread's profile and are missing "
+                          f"from its cProfile report)\n")
+
+        for stage, profiles in self.profiles.items():
+            profiles = [profile for profile in profiles if profile.getstats()]
+            if not profiles:
+                continue
+            report = io.StringIO()
+            stats = pstats.Stats(*profiles, stream=report)
+            stats.dump_stats(str(output_dir / f"{stage}.pstats"))
+            stats.strip_dirs()
+            report.write(f"=== {stage}: sorted by own time ===\n")
+            stats.sort_stats('tottime').print_stats(TOP_N)
+            report.write(f"\n=== {stage}: sorted by cumulative time ===\n")
+            stats.sort_stats('cumulative').print_stats(TOP_N)
+            (output_dir / f"{stage}.txt").write_text(report.getvalue())
+
+            # Top three own-time functions per stage in the summary
+            summary.write(f"\n{stage} hot spots (own time):\n")
+            rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:3]
+            for (filename, line, func), (_, ncalls, tottime, cumtime, _) in rows:
+                summary.write(f"  {tottime:8.4f}s own {cumtime:8.4f}s cum {ncalls:7d} calls  {func} ({filename}:{line})\n")
+
+        for stage, diffs in self.memory.items():
+            merged = Counter()
+            for diff in diffs:
+                merged[str(diff.traceback)] += diff.size_diff
+            lines = [f"{size / 1024:10.1f} KiB  {where}" for where, size in merged.most_common(TOP_N)]
+            (output_dir / f"{stage}.memory.txt").write_text(
+                f"=== {stage}: allocation growth by line ===\n" + "\n".join(lines) + "\n")
+        (output_dir / 'summary.txt').write_text(summary.getvalue())
+
+
+class StackSampler:
+    """Samples the main thread's stack, and every thread inside a span, at a fixed interval into folded-stack counts."""
+
+    def __init__(self, stage_profiler, interval=SAMPLE_INTERVAL):
+        self.stage_profiler = stage_profiler
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._main_id = threading.main_thread().ident
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                stage = self.stage_profiler.current_stage(thread_id)
+                # Idle pool workers and the stand-in servers' threads would drown out the pipeline
+                if thread_id != self._main_id and stage == 'untraced':
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                frames.append(stage)
+                self.samples[';'.join(reversed(frames))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def run(func, args):
+    """Run an entry point's main function, profiling it when --profile is set."""
+    if not args.profile:
+        return func()
+
+    output_dir = Path(args.profile_dir)
+    stage_profiler = StageProfiler()
+    sampler = StackSampler(stage_profiler)
+    tracemalloc.start()
+    tracing.tracer.listeners.append(stage_profiler)
+    sampler.start()
+    try:
+        return func()
+    finally:
+        sampler.stop()
+        tracing.tracer.listeners.remove(stage_profiler)
+        stage_profiler.write(output_dir)
+        sampler.write(output_dir / 'flamegraph.folded')
+        tracemalloc.stop()
+        print(f"\nProfile reports written to {output_dir}/ (start with summary.txt)")
@@ -0,0 +1,111 @@
+"""TF-IDF ranking of candidate articles against an AI-topic profile, with MMR diversification.
+
+The keyword filter in sources.py decides whether a story is about AI and the
+region at all; its integer score counts keyword hits and ties constantly.
+rank() orders the surviving candidates by how central AI is to each one:
+
+  - every candidate becomes a sublinear TF-IDF vector (SciPy CSR, unigrams
+    and bigrams, title terms counted twice), L2-normalised
+  - relevance is the cosine similarity to AI_PROFILE, a weighted list of AI
+    terms kept here, using the same IDF weights
+  - the pick is built greedily by maximal marginal relevance: each step takes
+    the article with the best MMR_LAMBDA * relevance (scaled so the best is
+    1) - (1 - MMR_LAMBDA) * (similarity to the closest article already
+    picked), and near-copies (DUPLICATE_SIMILARITY) are skipped, so five
+    rewrites of one story don't fill the section
+
+Ties fall back to the keyword score, then recency. A few hundred candidates
+rank in a few milliseconds.
+"""
+import re
+from itertools import chain, filterfalse
+
+import numpy as np
+from scipy import sparse
+
+from extractive import STOPWORDS
+
+# Maintained AI-topic profile: term (unigram or bigram) -> weight
+AI_PROFILE = {
+    'artificial intelligence': 3.0, 'ai': 2.5, 'machine learning': 2.5, 'deep learning': 2.5,
+    'generative ai': 3.0, 'language model': 2.5, 'large language': 2.0, 'llm': 2.5, 'llms': 2.5,
+    'neural network': 2.0, 'chatbot': 2.0, 'chatgpt': 2.0, 'openai': 1.5, 'gemini': 1.5, 'anthropic': 1.5,
+    'copilot': 1.0, 'ai-powered': 2.0, 'ai-driven': 2.0, 'ai-generated': 2.0, 'model': 1.0, 'models': 1.0,
+    'training': 0.5, 'inference': 1.0, 'agent': 1.0, 'agents': 1.0, 'agentic': 1.5, 'computer vision': 1.5,
+    'natural language': 1.5, 'nlp': 1.5, 'data centre': 0.5, 'data center': 0.5, 'gpu': 0.5,
+    'ai safety': 2.0, 'ai policy': 2.0, 'ai regulation': 2.0, 'ai adoption': 1.5,
+    'automation': 0.5, 'robotics': 0.5, 'algorithm': 0.3,
+}
+TITLE_WEIGHT = 2  # Title terms count this many times
+MMR_LAMBDA = 0.5  # 1.0 ranks on relevance alone; lower values favour variety
+DUPLICATE_SIMILARITY = 0.8  # Articles at least this similar to a picked one are the same story
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+
+
+def terms(text):
+    """Unigrams (stopwords dropped) and the bigrams between them."""
+    words = list(filterfalse(STOPWORDS.__contains__, _WORD.findall(text)))
+    return words + list(map(' '.join, zip(words, words[1:])))
+
+
+def tfidf(documents, seed_terms=()):
+    """Row-normalised sublinear TF-IDF CSR matrix for token lists, plus the IDF vector and vocabulary.
+
+    seed_terms take the first columns, whether or not any document uses them.
+    """
+    tokens = list(chain.from_iterable(documents))
+    vocabulary = {term: column for column, term in enumerate(dict.fromkeys(chain(seed_terms, tokens)))}
+    indices = np.fromiter(map(vocabulary.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+    indptr = np.cumsum([0] + [len(document) for document in documents])
+    counts = sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(documents), len(vocabulary)))
+    counts.sum_duplicates()  # Repeated terms become counts
+    document_frequency = np.bincount(counts.indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+    counts.data = (1 + np.log(counts.data)) * idf[counts.indices]
+    norms = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+    return sparse.diags(1 / np.where(norms == 0, 1.0, norms)) @ counts, idf, vocabulary
+
+
+def relevance(matrix, idf, vocabulary, profile=AI_PROFILE):
+    """Cosine similarity of each row to the profile, weighted by the same IDF."""
+    vector = np.zeros(len(vocabulary))
+    for term, weight in profile.items():
+        vector[vocabulary[term]] = weight * idf[vocabulary[term]]
+    vector /= np.linalg.norm(vector) or 1.0
+    return matrix @ vector
+
+
+def mmr(matrix, relevance_scores, ranked, limit, weight=MMR_LAMBDA):
+    """Row indices of a greedy maximal-marginal-relevance pick; `ranked` (row indices, best first) breaks ties."""
+    # Profile similarities are small next to article-to-article ones; put the best at 1.0 so the two trade off
+    relevance_scores = relevance_scores / (relevance_scores.max() or 1.0)
+    picked = [ranked[0]]
+    closest = (matrix @ matrix[ranked[0]].T).toarray().ravel()  # Similarity to the nearest picked article
+    available = np.ones(len(ranked), dtype=bool)
+    available[0] = False
+    while len(picked) < min(limit, len(ranked)):
+        # Near-copies of a picked story are only taken when nothing else is left
+        allowed = available & (closest[ranked] < DUPLICATE_SIMILARITY)
+        gain = np.where(allowed if allowed.any() else available,
+                        weight * relevance_scores[ranked] - (1 - weight) * closest[ranked], -np.inf)
+        best = int(np.argmax(gain))  # First maximum, so ties keep the incoming order
+        picked.append(ranked[best])
+        available[best] = False
+        np.maximum(closest, (matrix @ matrix[ranked[best]].T).toarray().ravel(), out=closest)
+    return picked
+
+
+def rank(articles, limit=5, profile=AI_PROFILE):
+    """The `limit` best Articles: relevant to the AI profile and not repeating each other."""
+    if len(articles) <= 1:
+        return list(articles)
+    documents = [terms(' '.join([title] * TITLE_WEIGHT + [summary, content]))
+                 for title, summary, content in (article.lowered for article in articles)]
+    matrix, idf, vocabulary = tfidf(documents, profile)
+    scores = relevance(matrix, idf, vocabulary, profile)
+    # Best first: profile relevance, then keyword score, then recency (lexsort's last key is the primary one)
+    published = np.unique([article.published for article in articles], return_inverse=True)[1]
+    keyword_scores = np.array([article.relevance_score for article in articles])
+    order = np.lexsort((-published, -keyword_scores, -scores.round(9)))
+    return [articles[i] for i in mmr(matrix, scores, order, limit)]
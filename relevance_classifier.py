@@ -0,0 +1,111 @@
+"""Second-pass relevance check for borderline NewsAPI articles.
+
+The keyword heuristics in sources.NewsApiSource decide most articles on
+their own. Articles close to the threshold (some AI signal but not enough, or
+passing only on weak terms like "automation"/"algorithm") are sent to a small,
+cheap model in a single batched request that answers with a compact JSON
+verdict per article. Verdicts are cached per canonical URL, so an article is
+classified at most once. sources.ingest() collects the borderline articles of
+every regional segment first, so each run makes at most one classifier call.
+"""
+import json
+import os
+import re
+from pathlib import Path
+
+import tracing
+
+MAX_BATCH = 40  # Borderline articles per request; any beyond this keep the heuristic decision
+SNIPPET_CHARS = 300
+
+PROMPT_HEADER = """You are screening news articles for a weekly regional digest about artificial intelligence.
+For each numbered article below, decide whether it is substantially about AI (machine learning, LLMs,
+AI products, AI policy or research). Generic automation, robotics without AI, or articles that only
+mention "algorithm" in passing are not relevant.
+
+Return only a JSON array with one object per article:
+[{"id": <number>, "relevant": <true|false>, "score": <confidence 0.0-1.0>}]
+
+Articles:
+"""
+
+
+def load_cache(path):
+    """Load cached verdicts ({canonical url: {'relevant': bool, 'score': float}})."""
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(path, cache):
+    # Written whole then renamed, so a reader in another process (backfill workers) never sees half a file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        Path(tmp).write_text(json.dumps(cache))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Error saving relevance cache: {e}")
+
+
+def build_prompt(articles):
+    lines = []
+    for i, article in enumerate(articles):
+        snippet = ' '.join((article.summary or article.content).split())[:SNIPPET_CHARS]
+        lines.append(f"[{i}] {article.title} | {snippet}")
+    return PROMPT_HEADER + "\n".join(lines)
+
+
+def parse_verdicts(text):
+    """Parse the model's JSON answer into {id: verdict}; malformed entries are ignored."""
+    match = re.search(r'\[.*\]', text or '', re.DOTALL)
+    if not match:
+        return {}
+    try:
+        items = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    verdicts = {}
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get('id'), int) and isinstance(item.get('relevant'), bool):
+            score = item.get('score', 1.0 if item['relevant'] else 0.0)
+            verdicts[item['id']] = {'relevant': item['relevant'],
+                                    'score': float(score) if isinstance(score, (int, float)) else 0.0}
+    return verdicts
+
+
+def classify(model, articles, cache):
+    """Return {canonical url: verdict} for the given NewsAPI articles (sources.Article objects).
+
+    Cached verdicts are reused; the rest are classified in one batched model
+    call and added to `cache`. Articles without a verdict (call failed,
+    malformed answer, beyond MAX_BATCH) are simply missing from the result.
+    """
+    verdicts = {}
+    uncached = {}
+    for article in articles:
+        key = article.canonical_url
+        if key in cache:
+            verdicts[key] = cache[key]
+        else:
+            uncached.setdefault(key, article)
+    tracing.count('relevance.cache_hits', len(verdicts))
+    uncached = list(uncached.items())[:MAX_BATCH]
+    if not uncached:
+        return verdicts
+
+    print(f"Classifying {len(uncached)} borderline articles in one batch...")
+    try:
+        with tracing.external_call('gemini.classify_relevance'):
+            response = model.generate_content(build_prompt([a for _, a in uncached]),
+                                              generation_config={'response_mime_type': 'application/json',
+                                                                 'temperature': 0})
+        answered = parse_verdicts(response.text)
+    except Exception as e:
+        print(f"Relevance classifier failed, keeping heuristic decisions: {e}")
+        answered = {}
+    for i, (key, _) in enumerate(uncached):
+        if i in answered:
+            verdicts[key] = cache[key] = answered[i]
+    tracing.count('relevance.classified', len(answered))
+    return verdicts
@@ -0,0 +1,237 @@
+"""Monthly and quarterly rollup digests built from the stored weekly summaries.
+
+Nothing is re-scraped or re-summarized article by article. The rollup reads
+the bullets already kept in the archive (archive.py), groups each week's
+articles into topic clusters and ranks them by relevance score and recency.
+It then makes one compressed "summary of summaries" Gemini call per cluster
+over that cluster's top stories.
+
+Both levels are cached in ROLLUP_CACHE_PATH:
+  - weekly aggregates (clustered, ranked, trimmed items), keyed on a hash of
+    that week's archived rows, so only new or changed weeks are re-aggregated
+  - cluster summaries, keyed on a hash of the exact items sent, so re-running
+    a period is free and extending it by a week costs one call per cluster
+    whose top stories changed
+
+    python rollup.py --month 2025-03
+    python rollup.py --quarter 2025-Q1 --feed newsapi
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import archive
+import extractive
+import segments
+import tracing
+
+ROLLUP_CACHE_PATH = os.getenv('ROLLUP_CACHE_PATH', 'rollup_cache.json')
+ITEMS_PER_WEEK_CLUSTER = 5  # Weekly aggregate keeps the best few items per cluster
+ITEMS_PER_CLUSTER = 12  # Items sent to the model per cluster
+BULLETS_PER_ITEM = 2  # Compress each article to its first bullets
+RECENCY_HALF_LIFE_WEEKS = 4
+DEFAULT_TLDR_SCORE = 3  # TLDR items have no keyword score; treat them as solidly relevant
+
+# Topic clusters, matched in order on title and bullets; first match wins
+CLUSTERS = [
+    ('Policy & regulation', ('regulat', 'policy', 'government', 'law', 'legislation', 'minister', 'safety',
+                             'ethic', 'privacy', 'copyright', 'court', 'ban')),
+    ('Research & models', ('research', 'model', 'benchmark', 'paper', 'university', 'scientist', 'dataset',
+                           'reasoning', 'open-source', 'open source')),
+    ('Business & investment', ('funding', 'invest', 'startup', 'raise', 'acquisition', 'revenue', 'market',
+                               'valuation', 'jobs', 'workforce')),
+    ('Health & education', ('health', 'hospital', 'medical', 'patient', 'education', 'school', 'student',
+                            'teacher')),
+    ('Products & launches', ('launch', 'release', 'app', 'feature', 'product', 'chatbot', 'assistant', 'agent')),
+]
+OTHER_CLUSTER = 'Other developments'
+
+PROMPT = """Below are short summaries of the most important {cluster} stories about AI{region} from {period}.
+Write 4-6 bullet points that capture the main developments and trends across these stories for a
+general professional audience. Merge related stories, prefer concrete facts (who, what, numbers),
+and do not repeat near-identical points. Start each bullet with '-'.
+
+Stories:
+{stories}
+"""
+
+
+def _hash(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def period_bounds(month=None, quarter=None):
+    """(first day, last day, label) for a YYYY-MM month or YYYY-Qn quarter."""
+    if month:
+        first = date.fromisoformat(f"{month}-01")
+        months, label = 1, first.strftime('%B %Y')
+    else:
+        year, q = quarter.upper().split('-Q')
+        first = date(int(year), 3 * (int(q) - 1) + 1, 1)
+        months, label = 3, f"Q{q} {year}"
+    next_month = first.month - 1 + months
+    after = date(first.year + next_month // 12, next_month % 12 + 1, 1)
+    return first, after - timedelta(days=1), label
+
+
+def cluster_of(row):
+    text = f"{row['title']} {row['bullets'] or ''}".lower()
+    for name, keywords in CLUSTERS:
+        if any(keyword in text for keyword in keywords):
+            return name
+    return OTHER_CLUSTER
+
+
+def compress(bullets):
+    lines = [line.strip().lstrip('-*• ').strip() for line in (bullets or '').splitlines()]
+    return [line for line in lines if line][:BULLETS_PER_ITEM]
+
+
+def weekly_aggregate(rows):
+    """Cluster one week's archived rows and keep each cluster's best items (score first, then date)."""
+    clusters = {}
+    for row in rows:
+        score = row['relevance_score'] if row['relevance_score'] is not None else DEFAULT_TLDR_SCORE
+        clusters.setdefault(cluster_of(row), []).append({
+            'title': row['title'], 'url': row['url'], 'date': row['published_date'], 'feed': row['feed'],
+            'score': score, 'points': compress(row['bullets'])})
+    for items in clusters.values():
+        items.sort(key=lambda item: (item['score'], item['date'] or ''), reverse=True)
+        del items[ITEMS_PER_WEEK_CLUSTER:]
+    return clusters
+
+
+def rank(items, end):
+    """Order items by relevance score decayed by age (half-life RECENCY_HALF_LIFE_WEEKS)."""
+    def weight(item):
+        age_weeks = max(0, (end - date.fromisoformat(item['date'])).days / 7) if item['date'] else 0
+        return item['score'] * 0.5 ** (age_weeks / RECENCY_HALF_LIFE_WEEKS)
+    return sorted(items, key=weight, reverse=True)
+
+
+class Rollup:
+    def __init__(self, model, cache_path=ROLLUP_CACHE_PATH, archive_path=None):
+        self.model = model
+        self.cache_path = Path(cache_path)
+        self.archive_path = archive_path or archive.ARCHIVE_PATH
+        try:
+            self.cache = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            self.cache = {}
+        self.cache.setdefault('weeks', {})
+        self.cache.setdefault('summaries', {})
+
+    def save(self):
+        self.cache_path.write_text(json.dumps(self.cache))
+
+    def weeks(self, start, end, feed):
+        """Weekly aggregates for every digest week in the period, recomputing only new or changed weeks."""
+        with archive.Archive(self.archive_path) as db:
+            rows = [row for row in db.search(feed=feed, since=start.isoformat(), until=end.isoformat(), limit=100000)
+                    if row['bullets']]
+        by_week = {}
+        for row in rows:
+            by_week.setdefault(row['digest_date'] or row['published_date'], []).append(row)
+        aggregates = []
+        for week, week_rows in sorted(by_week.items()):
+            cache_key = f"{feed or 'all'}:{week}"
+            fingerprint = _hash(sorted((row['canonical_url'], row['bullets'], row['relevance_score'])
+                                       for row in week_rows))
+            cached = self.cache['weeks'].get(cache_key)
+            if cached and cached['fingerprint'] == fingerprint:
+                tracing.count('rollup.weeks_cached')
+            else:
+                cached = {'fingerprint': fingerprint, 'clusters': weekly_aggregate(week_rows)}
+                self.cache['weeks'][cache_key] = cached
+                tracing.count('rollup.weeks_aggregated')
+            aggregates.append(cached['clusters'])
+        return aggregates
+
+    def summarize_cluster(self, cluster, items, label, region):
+        stories = "\n".join(f"- {item['title']} ({item['date']}): {' '.join(item['points'])}" for item in items)
+        prompt = PROMPT.format(cluster=cluster.lower(), region=region, period=label, stories=stories)
+        key = _hash(prompt)
+        if key in self.cache['summaries']:
+            tracing.count('rollup.summaries_cached')
+            return self.cache['summaries'][key]
+        try:
+            with tracing.external_call('gemini.generate_content'):
+                text = self.model.generate_content(prompt).text
+            tracing.count('rollup.summaries_generated')
+        except Exception as e:
+            print(f"Error summarizing {cluster}: {e} - using extractive summary instead")
+            return extractive.summarize(stories, title=cluster)
+        self.cache['summaries'][key] = text
+        return text
+
+    def build(self, start, end, label, feed=None):
+        """Return [(cluster, bullets, top items)] for the period, largest clusters first."""
+        merged = {}
+        for clusters in self.weeks(start, end, feed):
+            for cluster, items in clusters.items():
+                merged.setdefault(cluster, []).extend(items)
+        segment = segments.for_feed(feed)
+        region = f" in {segment['name']}" if segment else ''
+        sections = []
+        for cluster, items in sorted(merged.items(), key=lambda kv: len(kv[1]), reverse=True):
+            top = rank(items, end)[:ITEMS_PER_CLUSTER]
+            sections.append((cluster, self.summarize_cluster(cluster, top, label, region), top))
+        self.save()
+        return sections
+
+
+def render_html(title, sections):
+    parts = [f"<html><head><meta charset='utf-8'><title>{html.escape(title)}</title></head>"
+             f"<body style='font-family: Arial, sans-serif; max-width: 760px; margin: auto; color: #333;'>"
+             f"<h1>{html.escape(title)}</h1>"]
+    for cluster, bullets, items in sections:
+        points = "".join(f"<li>{html.escape(line.strip().lstrip('-*• ').strip())}</li>"
+                         for line in bullets.splitlines() if line.strip())
+        links = "".join(f"<li><a href='{html.escape(item['url'])}'>{html.escape(item['title'])}</a> "
+                        f"<span style='color:#888'>({item['date']})</span></li>" for item in items[:5])
+        parts.append(f"<h2>{html.escape(cluster)}</h2><ul>{points}</ul>"
+                     f"<p style='margin-bottom:0'><strong>Top stories</strong></p><ul>{links}</ul>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a monthly or quarterly rollup from archived weekly summaries.")
+    period = parser.add_mutually_exclusive_group(required=True)
+    period.add_argument('--month', help='YYYY-MM')
+    period.add_argument('--quarter', help='YYYY-Qn, e.g. 2025-Q1')
+    parser.add_argument('--feed', choices=['tldr', 'rss'] + [segment['feed'] for segment in segments.REGIONS.values()],
+                        help='Only global (tldr, rss) or one region\'s stories (newsapi = Australia, newsapi-nz, ...)')
+    parser.add_argument('--output-dir', default='rollup_output')
+    parser.add_argument('--stand-ins', action='store_true', help='Use the stub Gemini model')
+    args = parser.parse_args()
+
+    import daily_emailer  # Reuses the configured Gemini router
+    import stand_ins
+    start, end, label = period_bounds(args.month, args.quarter)
+    segment = segments.for_feed(args.feed)
+    title = f"AI {'in ' + segment['name'] + ' ' if segment else ''}rollup: {label}"
+    archive_path = archive.ARCHIVE_PATH  # Read before the stand-ins point it at a scratch archive
+    with stand_ins.from_args(args, daily_emailer):
+        sections = Rollup(daily_emailer.model, archive_path=archive_path).build(start, end, label, feed=args.feed)
+    if not sections:
+        print(f"No archived summaries between {start} and {end}.")
+        sys.exit(1)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"rollup-{args.month or args.quarter.upper()}{'-' + args.feed if args.feed else ''}.html"
+    path.write_text(render_html(title, sections), encoding='utf-8')
+    counters = tracing.tracer.counters
+    print(f"{title}: {len(sections)} clusters written to {path} "
+          f"({counters.get('rollup.summaries_generated', 0)} Gemini calls, "
+          f"{counters.get('rollup.weeks_aggregated', 0)} weeks aggregated, "
+          f"{counters.get('rollup.weeks_cached', 0)} weeks from cache)")
+
+
+if __name__ == "__main__":
+    main()
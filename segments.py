@@ -0,0 +1,134 @@
+"""Regional editions (segments) of the weekly digest.
+
+Every segment gets the same global (TLDR) section, which is scraped and
+summarized once per run. Each segment adds its own regional section, built
+from its own NewsAPI query, location filter and top-5 summaries, and is
+sent to its own recipient list under its own sender name.
+
+SEGMENTS picks the editions to build (comma-separated ids, default `au`).
+Recipients come from RECIPIENT_EMAIL_BULLETS_<ID> (e.g.
+RECIPIENT_EMAIL_BULLETS_NZ); the Australian edition keeps
+RECIPIENT_EMAIL_BULLETS. SEGMENTS_CONFIG may name a JSON file of
+{id: {field: value}} that overrides fields of the segments below or adds
+new ones with the same fields.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urlparse
+
+DEFAULT_SEGMENT = 'au'
+
+REGIONS = {
+    'au': {
+        'name': 'Australia',
+        'adjective': 'Australian',
+        'query_places': ['Australia', 'Australian', 'Sydney', 'Melbourne', 'Brisbane', 'Perth', 'Adelaide'],
+        'terms': ['australia', 'australian', 'sydney', 'melbourne', 'brisbane', 'perth', 'adelaide', 'new south wales'],
+        'domain_suffix': '.au',
+        # Whitelist of trusted news domains (not all end in the country suffix)
+        'sources': ['abc.net.au', 'smh.com.au', 'theage.com.au', 'itnews.com.au', 'afr.com', 'news.com.au',
+                    'drive.com.au', 'sbs.com.au', 'theguardian.com.au'],
+        'sender_name': 'Responsible AI Australia',
+        'recipients_env': 'RECIPIENT_EMAIL_BULLETS',
+        'feed': 'newsapi',
+    },
+    'nz': {
+        'name': 'New Zealand',
+        'adjective': 'New Zealand',
+        'query_places': ['"New Zealand"', 'Auckland', 'Wellington', 'Christchurch'],
+        'terms': ['new zealand', 'auckland', 'wellington', 'christchurch', 'aotearoa'],
+        'domain_suffix': '.nz',
+        'sources': ['nzherald.co.nz', 'stuff.co.nz', 'rnz.co.nz', 'newsroom.co.nz', 'thespinoff.co.nz'],
+        'sender_name': 'Responsible AI New Zealand',
+        'recipients_env': 'RECIPIENT_EMAIL_BULLETS_NZ',
+        'feed': 'newsapi-nz',
+    },
+    'uk': {
+        'name': 'United Kingdom',
+        'adjective': 'UK',
+        'query_places': ['UK', 'Britain', 'British', 'London', 'England', 'Scotland', 'Wales'],
+        # No bare "uk" (Ukraine), "wales" (New South Wales) or "england" (New England)
+        'terms': ['united kingdom', 'u.k.', 'britain', 'british', 'scotland', 'scottish', 'welsh', 'wales, uk',
+                  'cardiff', 'bank of england', 'nhs england', 'london', 'manchester', 'edinburgh', 'glasgow'],
+        'domain_suffix': '.uk',
+        'sources': ['bbc.com', 'ft.com', 'thetimes.com', 'computerweekly.com'],
+        'sender_name': 'Responsible AI UK',
+        'recipients_env': 'RECIPIENT_EMAIL_BULLETS_UK',
+        'feed': 'newsapi-uk',
+    },
+    'sg': {
+        'name': 'Singapore',
+        'adjective': 'Singapore',
+        'query_places': ['Singapore', 'Singaporean'],
+        'terms': ['singapore'],
+        'domain_suffix': '.sg',
+        'sources': ['straitstimes.com', 'channelnewsasia.com', 'businesstimes.com.sg', 'todayonline.com',
+                    'techinasia.com'],
+        'sender_name': 'Responsible AI Singapore',
+        'recipients_env': 'RECIPIENT_EMAIL_BULLETS_SG',
+        'feed': 'newsapi-sg',
+    },
+}
+
+# The AI half of every segment's NewsAPI query
+AI_QUERY = ('("artificial intelligence" OR "AI" OR "machine learning" OR "deep learning" OR '
+            '"neural network" OR "chatbot" OR "language model" OR "LLM" OR '
+            '"AI startup" OR "AI policy" OR "AI regulation")')
+
+
+def _recipients(env_name):
+    return [email.strip() for email in os.getenv(env_name, '').split(',') if email.strip()]
+
+
+def load(ids=None, config_path=None):
+    """Return the configured segments (dicts with an 'id' and 'recipients'), in the order given."""
+    regions = {key: dict(value) for key, value in REGIONS.items()}
+    if config_path:
+        for key, overrides in json.loads(Path(config_path).read_text()).items():
+            regions.setdefault(key, {}).update(overrides)
+    ids = [key.strip().lower() for key in (ids or DEFAULT_SEGMENT).split(',') if key.strip()]
+    selected = []
+    for key in dict.fromkeys(ids):
+        if key not in regions:
+            raise ValueError(f"Unknown segment '{key}' (known: {', '.join(sorted(regions))})")
+        segment = dict(regions[key], id=key)
+        segment.setdefault('recipients_env', f"RECIPIENT_EMAIL_BULLETS_{key.upper()}")
+        segment.setdefault('feed', f"newsapi-{key}")
+        segment['recipients'] = _recipients(segment['recipients_env'])
+        selected.append(segment)
+    return selected
+
+
+def newsapi_query(segment):
+    """One NewsAPI query per segment: any AI term AND any of the segment's places."""
+    return f"{AI_QUERY} AND ({' OR '.join(segment['query_places'])})"
+
+
+# Plurals and demonyms a term may carry: Australians, Singaporean(s), New Zealanders, Londoners
+TERM_SUFFIXES = r'(?:s|n|ns|an|ans|ers|ean|eans)?'
+
+
+@lru_cache(maxsize=None)
+def _terms_pattern(terms):
+    """A regex matching any of the (lowercase) terms as whole words, so 'perth' isn't found in 'perthshire'."""
+    alternatives = '|'.join(map(re.escape, sorted(terms, key=len, reverse=True)))
+    return re.compile(r'(?<!\w)(?:%s)%s(?!\w)' % (alternatives, TERM_SUFFIXES))
+
+
+def matches_region(article, segment):
+    """True if an Article comes from a local or whitelisted domain, or mentions one of the region's places."""
+    domain = urlparse(article.url.lower()).hostname or ''
+    # Whole labels only: 'ft.com' is blogs.ft.com but not blogs.microsoft.com
+    if domain.endswith(segment['domain_suffix']) or any(domain == src or domain.endswith('.' + src)
+                                                        for src in segment['sources']):
+        return True
+    pattern = _terms_pattern(tuple(segment['terms']))
+    return any(pattern.search(text) for text in article.lowered + (article.publisher.lower(),))
+
+
+def for_feed(feed):
+    """The built-in region whose archive feed is `feed` (e.g. 'newsapi-nz'), or None (e.g. for 'tldr')."""
+    return next((dict(region, id=key) for key, region in REGIONS.items() if region['feed'] == feed), None)
@@ -0,0 +1,595 @@
+"""News source adapters and the Article model they all produce.
+
+Each source (the TLDR AI newsletter, NewsAPI for one segment's region, any
+RSS or Atom feed) is an adapter: a `Source` with a unique `name`, the digest
+`section` its stories belong to ('global' or a segment id) and a
+`fetch(now)` method returning Articles. `ingest()` runs a set of adapters
+concurrently and groups what they found, so both emailers share one
+fetch/parse/filter layer and adding a source means adding an adapter (or an
+RSS_FEEDS entry), not another copy of the pipeline.
+
+Adapters take the current time as an argument instead of reading the clock,
+so frozen clocks (cassette replay, backfill) apply to them unchanged.
+"""
+import dataclasses
+import email.utils
+import html
+import io
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse, urlunparse
+
+import requests
+from bs4 import BeautifulSoup
+from newsapi import NewsApiClient
+from newsapi.newsapi_exception import NewsAPIException
+
+import segments
+import tracing
+from urls import canonical_url
+
+BROWSER_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+MAX_WORKERS = 8
+
+
+@dataclass(frozen=True, slots=True)
+class Article:
+    """One story, whatever source it came from.
+
+    Articles are immutable and slotted so large backfills and archives stay
+    small: source kinds and publishers are interned, and the lowercased text
+    and canonical URL are only computed the first time they are needed.
+    Use dataclasses.replace() to derive a changed copy (e.g. enriched text).
+    """
+    title: str
+    url: str
+    source: str  # Adapter kind that found it: 'tldr', 'newsapi' or 'rss'
+    summary: str = ''  # Newsletter blurb, NewsAPI description or feed summary
+    content: str = ''  # Longer body text when there is one (NewsAPI content, enriched page text)
+    published: str = ''  # ISO date or UTC datetime, e.g. '2025-03-03' or '2025-03-03T08:15:00Z'
+    publisher: str = ''
+    relevance_score: float = 0
+    content_source: str = None  # 'page' once enriched with the full page text
+    _lowered: tuple = field(default=None, init=False, repr=False, compare=False)
+    _canonical_url: str = field(default=None, init=False, repr=False, compare=False)
+
+    # Keys older stores and archives used for the same fields
+    LEGACY_KEYS = {'publishedAt': 'published', 'source_name': 'publisher', 'date': 'published'}
+
+    def __post_init__(self):
+        # A handful of distinct values repeated across every article
+        object.__setattr__(self, 'source', sys.intern(self.source))
+        object.__setattr__(self, 'publisher', sys.intern(self.publisher or ''))
+
+    @property
+    def lowered(self):
+        """(title, summary, content) lowercased, for keyword matching."""
+        if self._lowered is None:
+            object.__setattr__(self, '_lowered', (self.title.lower(), self.summary.lower(), self.content.lower()))
+        return self._lowered
+
+    @property
+    def canonical_url(self):
+        if self._canonical_url is None:
+            object.__setattr__(self, '_canonical_url', canonical_url(self.url))
+        return self._canonical_url
+
+    @property
+    def date(self):
+        return self.published[:10]
+
+    @property
+    def day(self):
+        """Weekday name of the publication date ('' if unknown)."""
+        return datetime.strptime(self.date, '%Y-%m-%d').strftime('%A') if self.date else ''
+
+    def to_dict(self):
+        return {f.name: getattr(self, f.name) for f in dataclasses.fields(self) if f.init}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build an Article from to_dict() output (or an older dict using the legacy keys)."""
+        fields = {f.name for f in dataclasses.fields(cls) if f.init}
+        values = {}
+        for key, value in data.items():
+            key = cls.LEGACY_KEYS.get(key, key)
+            if key in fields and key not in values:
+                values[key] = value
+        values.setdefault('source', 'newsapi' if 'publishedAt' in data else 'tldr')
+        return cls(**values)
+
+
+def clean_url(raw_url):
+    """Drop the query string and fragment (tracking parameters) from a URL."""
+    parsed = urlparse(raw_url)
+    return urlunparse((parsed.scheme, parsed.netloc, parsed.path, parsed.params, '', ''))
+
+
+class Source:
+    """Base adapter; subclasses set `name` and `section` and implement fetch(now) -> [Article]."""
+    kind = 'source'
+    name = 'source'
+    section = 'global'
+
+    def fetch(self, now):
+        raise NotImplementedError
+
+
+class TldrSource(Source):
+    """Headlines & Launches stories from the TLDR AI newsletter's weekday issues.
+
+    When feed_url is set the whole window comes from one request to the
+    newsletter's RSS/Atom feed, parsed as a stream. Issues the feed doesn't
+    cover (it only holds recent ones, or it failed) are scraped from their
+    issue pages as before.
+    """
+    kind = name = 'tldr'
+    HEADLINES = 'Headlines & Launches'
+
+    def __init__(self, base_url, fetcher, days_back=(7, 0), skip_dates=(), per_issue=3, feed_url=None):
+        # days_back: (first, last) issue to fetch, in days before `now` (US/Eastern)
+        self.base_url = base_url
+        self.fetcher = fetcher
+        self.days_back = days_back
+        self.skip_dates = set(skip_dates)
+        self.per_issue = per_issue
+        self.feed_url = feed_url
+
+    def fetch(self, now):
+        first, last = self.days_back
+        print(f"Fetching TLDR articles from {(now - timedelta(days=first)).strftime('%Y-%m-%d')} "
+              f"to {(now - timedelta(days=last)).strftime('%Y-%m-%d')}")
+        dates = []
+        for days in range(first, last - 1, -1):
+            issue_date = now - timedelta(days=days)
+            date_str = issue_date.strftime('%Y-%m-%d')
+            # Skip weekends (5 = Saturday, 6 = Sunday)
+            if issue_date.weekday() >= 5:
+                print(f"Skipping weekend day: {date_str}")
+                continue
+            if date_str in self.skip_dates:
+                print(f"Already ingested TLDR issue for {date_str}")
+                continue
+            dates.append(date_str)
+
+        from_feed = self.fetch_feed(now, set(dates)) if self.feed_url and dates else {}
+        articles = []
+        for date_str in dates:
+            if from_feed.get(date_str):
+                issue_articles = from_feed[date_str]
+                tracing.count('tldr.issues_from_feed')
+                print(f"Total articles found for {date_str}: {len(issue_articles)} (feed)")
+            else:
+                issue_articles = self.fetch_page(date_str)
+                if issue_articles:
+                    tracing.count('tldr.issues_from_html')
+            tracing.count('tldr.articles_parsed', len(issue_articles))
+            articles.extend(issue_articles)
+
+        print(f"\nTotal articles found across all weekdays: {len(articles)}")
+        print("Articles by day:")
+        for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']:
+            print(f"{day}: {len([a for a in articles if a.day == day])} articles")
+        return articles
+
+    def fetch_page(self, date_str):
+        """Scrape one issue page (the fallback path)."""
+        url = f"{self.base_url}/{date_str}"
+        print(f"\nFetching articles from: {url}")
+        try:
+            with tracing.external_call('tldr.fetch'):
+                response = self.fetcher.get(url, headers=BROWSER_HEADERS)
+        except requests.RequestException as e:
+            # Retries exhausted or the host's circuit is open: lose this issue, not the week
+            tracing.count('tldr.errors')
+            print(f"Warning: Could not fetch TLDR for {date_str} ({type(e).__name__}: {e})")
+            return []
+        print(f"Response status code: {response.status_code}")
+        if response.status_code != 200:
+            print(f"Warning: Could not fetch TLDR for {date_str} (Status code: {response.status_code})")
+            return []
+        tracing.count('tldr.html.bytes', len(response.content))
+        start = time.perf_counter()
+        with tracing.span('parse', source='tldr', date=date_str):
+            issue_articles = self.parse_issue(response.text, date_str)
+        tracing.observe('tldr.html.parse', time.perf_counter() - start)
+        print(f"Total articles found for {date_str}: {len(issue_articles)}")
+        return issue_articles
+
+    def fetch_feed(self, now, dates):
+        """{issue date: [Article]} for the wanted dates the feed covers; {} if the feed can't be used."""
+        print(f"\nFetching TLDR feed: {self.feed_url}")
+        try:
+            with tracing.external_call('tldr.feed'):
+                response = self.fetcher.get(self.feed_url, headers=BROWSER_HEADERS)
+            response.raise_for_status()
+            tracing.count('tldr.feed.bytes', len(response.content))
+            start = time.perf_counter()
+            with tracing.span('parse', source='tldr', feed=self.feed_url):
+                issues = self.parse_feed(response.content, now, dates)
+            tracing.observe('tldr.feed.parse', time.perf_counter() - start)
+        except Exception as e:
+            tracing.count('tldr.feed.errors')
+            print(f"Warning: Could not use the TLDR feed ({e}); scraping issue pages instead")
+            return {}
+        print(f"TLDR feed covers {len(issues)} of {len(dates)} issues")
+        return issues
+
+    def parse_feed(self, payload, now, dates):
+        """Stream an RSS or Atom payload into {issue date: [Article]}, keeping only `dates`.
+
+        Feeds with one item per story keep the items in the Headlines & Launches
+        category (the first per_issue of each issue when items have no
+        categories). An item linking to an issue page holds the whole issue;
+        its content is parsed like the page.
+        """
+        issue_url = re.compile(re.escape(self.base_url.rstrip('/')) + r'/(\d{4}-\d{2}-\d{2})/?$')
+        issues = {}
+        for _, element in ET.iterparse(io.BytesIO(payload), events=('end',)):
+            if _local_name(element.tag) not in ('item', 'entry'):
+                continue
+            link = _child_text(element, 'link') or next(
+                (child.get('href') for child in element if _local_name(child.tag) == 'link' and child.get('href')), '')
+            published = _feed_timestamp(_child_text(element, 'pubDate', 'published', 'updated', 'date'))
+            match = issue_url.match(link)
+            date_str = match.group(1) if match else (
+                published.astimezone(now.tzinfo).strftime('%Y-%m-%d') if published else '')
+            issue_html = _child_text(element, 'encoded', 'content', 'description', 'summary')
+            blurb = _child_text(element, 'description', 'summary', 'encoded', 'content')
+            categories = [(child.text or child.get('term') or '').strip() for child in element
+                          if _local_name(child.tag) == 'category']
+            title = re.sub(r'\s*\(\d+ minute read\)$', '', _child_text(element, 'title'))
+            element.clear()  # Keep memory flat however long the feed is
+            if date_str not in dates or not link:
+                continue
+            if match:
+                issues[date_str] = self.parse_issue(issue_html, date_str)
+            elif (not categories or self.HEADLINES in categories) and title and blurb:
+                stories = issues.setdefault(date_str, [])
+                if not self.per_issue or len(stories) < self.per_issue:
+                    stories.append(Article(title=title, url=clean_url(link), source='tldr',
+                                           summary=_strip_tags(blurb), published=date_str, publisher='TLDR AI'))
+        return issues
+
+    def parse_issue(self, page_html, date_str):
+        """The Headlines & Launches stories of one issue page (at most per_issue of them)."""
+        soup = BeautifulSoup(page_html, 'html.parser')
+        sections = soup.find_all('h3')
+        print(f"Found {len(sections)} sections for {date_str}")
+
+        # Find the Headlines & Launches section
+        headlines_section = None
+        for section in sections:
+            if section.text.strip() == self.HEADLINES:
+                headlines_section = section
+                break
+        if not headlines_section:
+            print(f"Warning: Could not find Headlines & Launches section for {date_str}")
+            return []
+
+        print(f"Found Headlines & Launches section for {date_str}")
+        articles = []
+        # Get all h3 elements after Headlines & Launches until the next section
+        current = headlines_section.find_next('h3')
+        while current and current.text.strip() != "Research & Innovation":
+            title_text = current.text.strip()
+            if '(' in title_text and ')' in title_text:
+                # Split into title and reading time
+                title = title_text.rsplit('(', 1)[0].strip()
+
+                # The headline sits inside the anchor; the summary is the div.newsletter-html right after it
+                anchor_tag = current.find_parent('a')
+                summary_div = anchor_tag.find_next_sibling('div', class_='newsletter-html') if anchor_tag else None
+                summary_text = summary_div.text.strip() if summary_div else ''
+                raw_url = anchor_tag.get('href') if anchor_tag else ''
+                if not anchor_tag or not summary_text or not raw_url:
+                    print(f"Warning: Missing link or summary for article: {title}")
+                else:
+                    articles.append(Article(title=title, url=clean_url(raw_url), source='tldr', summary=summary_text,
+                                            published=date_str, publisher='TLDR AI'))
+                    tracing.debug(f"Added article {len(articles)} for {date_str}: {title}")
+                    # Safety check - TLDR typically has 3 articles per day
+                    if self.per_issue and len(articles) >= self.per_issue:
+                        print(f"Reached {self.per_issue} articles for {date_str}, moving to next day")
+                        break
+            current = current.find_next('h3')
+        return articles
+
+
+# AI-related keywords for relevance checking (broadened)
+AI_KEYWORDS = [
+    'artificial intelligence', 'ai ', 'machine learning', 'deep learning',
+    'neural network', 'chatbot', 'language model', 'llm', 'ml ',
+    'computer vision', 'nlp ', 'natural language processing',
+    'ai-powered', 'ai powered', 'ai-based', 'ai based',
+    'automation', 'robotics', 'algorithm'
+]
+# Terms that often match non-AI stories; articles passing only on these count as borderline
+WEAK_AI_KEYWORDS = {'automation', 'robotics', 'algorithm'}
+AI_FOCUS_PHRASES = ['artificial intelligence', 'machine learning', 'deep learning',
+                    'ai technology', 'ai development', 'ai research']
+
+
+def has_strong_ai_context(text):
+    ai_term_count = sum(text.count(keyword) for keyword in AI_KEYWORDS)
+    ai_in_beginning = any(keyword in text[:100] for keyword in AI_KEYWORDS)
+    has_focus_phrase = any(phrase in text for phrase in AI_FOCUS_PHRASES)
+    return ai_term_count >= 2 and (ai_in_beginning or has_focus_phrase)
+
+
+class NewsApiSource(Source):
+    """The past week's AI stories about one segment's region, from NewsAPI's `everything` endpoint.
+
+    Keyword heuristics decide most articles. When a `classifier` is given,
+    articles near the threshold are set aside in `borderline` and ingest()
+    hands those of every segment to it in one batch:
+    classifier([Article]) -> {canonical url: {'relevant': bool, ...}}.
+    """
+    kind = 'newsapi'
+
+    def __init__(self, segment, api_key, fetcher, classifier=None, days_back=7, page_size=100):
+        self.segment = segment
+        self.name = f"newsapi:{segment['id']}"
+        self.section = segment['id']
+        self.api_key = api_key
+        self.fetcher = fetcher
+        self.classifier = classifier
+        self.days_back = days_back
+        self.page_size = page_size
+        self.borderline = []  # (article, keyword decision) pairs awaiting the classifier
+
+    def fetch(self, now):
+        segment = self.segment
+        print(f"Fetching {segment['adjective']} AI news using News API...")
+        if not self.api_key:
+            print("Error: NEWS_API_KEY not found in environment variables.")
+            return []
+        newsapi = NewsApiClient(api_key=self.api_key, session=self.fetcher)
+        from_date = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=self.days_back)
+        from_param, to_param = from_date.strftime('%Y-%m-%d'), now.strftime('%Y-%m-%d')
+        print(f"Querying News API with combined query for date range {from_param} to {to_param}")
+
+        try:
+            with tracing.external_call('newsapi.everything'):
+                response = newsapi.get_everything(q=segments.newsapi_query(segment), from_param=from_param,
+                                                  to=to_param, language='en', sort_by='publishedAt',
+                                                  page_size=self.page_size)
+        except NewsAPIException as e:
+            # Any non-200 reply, e.g. 426 for weeks beyond the plan's history; nothing to return for this week
+            print(f"Error in query: {e}")
+            tracing.count('newsapi.errors')
+            return []
+        if response['status'] != 'ok':
+            print(f"Error in query: {response.get('message', 'Unknown error')}")
+            return []
+        tracing.count('newsapi.articles_returned', len(response['articles']))
+        # Keep articles published within our date range, once per URL; the raw response dicts are dropped here
+        unique_articles = {}
+        for raw in response['articles']:
+            url = raw.get('url') or ''
+            published = raw.get('publishedAt') or ''
+            if url and published and from_param <= published[:10] <= to_param and url not in unique_articles:
+                unique_articles[url] = Article(title=raw.get('title') or '', url=url, source='newsapi',
+                                               summary=raw.get('description') or '', content=raw.get('content') or '',
+                                               published=published, publisher=(raw.get('source') or {}).get('name') or '')
+        del response
+        print(f"Total unique articles found for the period: {len(unique_articles)}")
+        articles = self.filter(list(unique_articles.values()))
+        print(f"Total relevant {segment['adjective']} articles found for the period: {len(articles)}"
+              + (f" (+{len(self.borderline)} borderline for the classifier)" if self.borderline else ""))
+        # Most recent first, then by relevance score
+        articles.sort(key=lambda a: (a.published, a.relevance_score), reverse=True)
+        return articles
+
+    def filter(self, candidates):
+        """Keep the articles that are about the region and substantially about AI, with their relevance scores."""
+        kept, borderline = [], []
+        with tracing.span('filter', source='newsapi', segment=self.segment['id'],
+                          candidates=len(candidates)) as span_attrs:
+            for article in candidates:
+                lowered = article.lowered
+                # Local domain, whitelisted source or a mention of the region's places
+                is_local = segments.matches_region(article, self.segment)
+                # Title matches weigh double
+                score = sum(2 if keyword in lowered[0] else 1 if keyword in lowered[1] or keyword in lowered[2] else 0
+                            for keyword in AI_KEYWORDS)
+                has_context = has_strong_ai_context(' '.join(lowered))
+                passes = is_local and score >= 2 and has_context
+
+                article = dataclasses.replace(article, relevance_score=score,
+                                              summary=article.summary or 'No description available.')
+                # Near the threshold: some AI signal but not enough, or passing only on weak terms
+                weak_only = all(keyword in WEAK_AI_KEYWORDS for keyword in AI_KEYWORDS
+                                if any(keyword in text for text in lowered))
+                if self.classifier and is_local and score >= 1 and (not passes or weak_only):
+                    borderline.append((article, passes))
+                    continue
+                if passes:
+                    kept.append(article)
+                    tracing.debug(f"Added (Relevant): {article.title} | Source: {article.publisher} | "
+                                  f"AI relevance score: {score} | Published at: {article.published}")
+                else:
+                    tracing.debug(f"Skipped: {article.title} | Reason: "
+                                  f"{'Not ' + self.segment['adjective'] if not is_local else ''} "
+                                  f"{'Low AI relevance' if score < 2 else ''} "
+                                  f"{'Weak AI context' if not has_context else ''}")
+
+            self.borderline = borderline
+            span_attrs['borderline'] = len(borderline)
+            span_attrs['kept'] = len(kept)
+        tracing.count('newsapi.articles_kept', len(kept))
+        tracing.count('newsapi.articles_skipped', len(candidates) - len(kept) - len(borderline))
+        return kept
+
+    def resolve(self, articles, verdicts):
+        """`articles` plus the borderline ones the classifier's verdicts keep, in fetch() order."""
+        kept = []
+        for article, passes in self.borderline:
+            verdict = verdicts.get(article.canonical_url)
+            if verdict is None:
+                keep = passes  # No verdict: fall back to the keyword heuristics
+            else:
+                keep = verdict['relevant']
+                tracing.count('relevance.overturned' if keep != passes else 'relevance.confirmed')
+            if keep:
+                kept.append(article)
+            tracing.debug(f"{'Added' if keep else 'Skipped'} (Borderline, "
+                          f"classifier {'n/a' if verdict is None else verdict['score']}): {article.title}")
+        tracing.count('newsapi.articles_kept', len(kept))
+        tracing.count('newsapi.articles_skipped', len(self.borderline) - len(kept))
+        self.borderline = []
+        return sorted(articles + kept, key=lambda a: (a.published, a.relevance_score), reverse=True)
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(element, *names):
+    for child in element:
+        if _local_name(child.tag) in names and (child.text or '').strip():
+            return child.text.strip()
+    return ''
+
+
+def _strip_tags(markup):
+    """Plain text of a short HTML fragment (feed summaries), without building a parse tree."""
+    return re.sub(r'\s+', ' ', html.unescape(re.sub(r'<[^>]+>', ' ', markup))).strip()
+
+
+def _feed_timestamp(value):
+    """Parse an RSS (RFC 822) or Atom (ISO 8601) timestamp to an aware UTC datetime, or None."""
+    if not value:
+        return None
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+class FeedSource(Source):
+    """Recent items from an RSS 2.0 or Atom feed."""
+    kind = 'rss'
+
+    def __init__(self, url, fetcher, name=None, section='global', days_back=7, max_items=5):
+        self.url = url
+        self.fetcher = fetcher
+        self.name = f"rss:{name or urlparse(url).netloc}"
+        self.section = section
+        self.days_back = days_back
+        self.max_items = max_items
+
+    def fetch(self, now):
+        print(f"Fetching feed {self.name} from {self.url}")
+        with tracing.external_call('rss.fetch'):
+            response = self.fetcher.get(self.url, headers=BROWSER_HEADERS)
+        response.raise_for_status()
+        with tracing.span('parse', source='rss', feed=self.name):
+            articles = self.parse(response.content, now)
+        print(f"Total articles found in {self.name}: {len(articles)}")
+        return articles
+
+    def parse(self, payload, now):
+        """The feed's items published in the past days_back days, newest first, at most max_items."""
+        root = ET.fromstring(payload)
+        channel = next((child for child in root if _local_name(child.tag) == 'channel'), root)  # RSS, else Atom
+        publisher = _child_text(channel, 'title')
+        since = now.astimezone(timezone.utc) - timedelta(days=self.days_back)
+        dated = []
+        for item in channel:
+            if _local_name(item.tag) not in ('item', 'entry'):
+                continue
+            link = _child_text(item, 'link')
+            if not link:
+                # Atom links are attributes; prefer rel="alternate"
+                links = [child for child in item if _local_name(child.tag) == 'link' and child.get('href')]
+                alternate = [child for child in links if child.get('rel', 'alternate') == 'alternate']
+                link = (alternate or links)[0].get('href') if links else ''
+            published = _feed_timestamp(_child_text(item, 'pubDate', 'published', 'updated', 'date'))
+            if not link or published is None or not since <= published <= now.astimezone(timezone.utc):
+                continue
+            summary_html = _child_text(item, 'description', 'summary', 'content', 'encoded')
+            summary = re.sub(r'\s+', ' ', BeautifulSoup(summary_html, 'html.parser').get_text(' ')).strip()
+            dated.append(Article(title=_child_text(item, 'title'), url=clean_url(link), source='rss', summary=summary,
+                                 published=published.strftime('%Y-%m-%dT%H:%M:%SZ'), publisher=publisher))
+        dated.sort(key=lambda article: article.published, reverse=True)
+        return dated[:self.max_items]
+
+
+def parse_feed_list(value):
+    """Parse RSS_FEEDS: comma-separated `url` or `name=url` entries -> [(name or None, url)]."""
+    feeds = []
+    for entry in (value or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, url = entry.partition('=') if '=' in entry.split('://', 1)[0] else ('', '', entry)
+        feeds.append((name.strip() or None, url.strip()))
+    return feeds
+
+
+def _run(source, now):
+    try:
+        with tracing.span('scrape', source=source.kind, adapter=source.name):
+            articles = source.fetch(now)
+    except Exception as e:
+        tracing.count('sources.failed')
+        print(f"Error fetching {source.name}: {e}")
+        return []
+    tracing.count(f"sources.{source.kind}.articles", len(articles))
+    return articles
+
+
+def classify_borderline(sources, results):
+    """Decide every NewsAPI segment's borderline articles with one classifier call, adding the kept ones to results."""
+    pending = [source for source in sources if getattr(source, 'borderline', None)]
+    if not pending:
+        return results
+    articles = list({article.canonical_url: article for source in pending
+                     for article, _ in source.borderline}.values())
+    try:
+        verdicts = pending[0].classifier(articles)
+    except Exception as e:
+        print(f"Relevance classifier failed, keeping heuristic decisions: {e}")
+        verdicts = {}
+    for source in pending:
+        results[source.name] = source.resolve(results.get(source.name, []), verdicts)
+    return results
+
+
+def ingest(sources, now, max_workers=MAX_WORKERS):
+    """Fetch every source concurrently; returns {source name: [Article]} (empty for sources that failed).
+
+    Borderline NewsAPI articles from all segments then go to the classifier together.
+    """
+    if not sources:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(sources)), thread_name_prefix='source') as pool:
+        futures = {source.name: pool.submit(_run, source, now) for source in sources}
+        results = {name: future.result() for name, future in futures.items()}
+    return classify_borderline(sources, results)
+
+
+def by_section(sources, results):
+    """Group ingest() results by digest section: {'global' or segment id: [Article]}.
+
+    A story that an earlier source in the same section already found is
+    dropped; each source's own results are kept as they are.
+    """
+    sections = {}
+    for source in sources:
+        section = sections.setdefault(source.section, [])
+        seen = {a.canonical_url for a in section}
+        section.extend(a for a in results.get(source.name, []) if a.canonical_url not in seen)
+    return sections
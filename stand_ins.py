@@ -0,0 +1,490 @@
+"""Local stand-ins for every external service the digest pipeline talks to.
+
+Used by the benchmarks (and anything else that needs an offline run) in place
+of tldr.tech, NewsAPI, Gemini and the real SMTP server.
+"""
+import json
+import math
+import random
+import re
+import socketserver
+import tempfile
+import smtplib
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+import archive
+import model_router
+import tracing
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+
+class _CallCounter:
+    """Thread-safe per-name call counter shared by the stand-ins."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+def generate_newsapi_articles(count=100, seed=0, now=None):
+    """Build a deterministic NewsAPI-shaped article list dated within the past week."""
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    cities = ['Sydney', 'Melbourne', 'Brisbane', 'Perth', 'Adelaide']
+    abroad = ['Silicon Valley', 'Auckland, New Zealand', 'London, UK', 'Singapore']  # For the other segments
+    topics = [
+        ('artificial intelligence', 'regulation'), ('machine learning', 'healthcare'),
+        ('AI startup', 'funding'), ('language model', 'education'), ('chatbot', 'banking'),
+        ('automation', 'mining'), ('deep learning', 'agriculture'), ('algorithm', 'retail'),
+    ]
+    sources = [
+        ('ABC News', 'https://www.abc.net.au/news'), ('The Sydney Morning Herald', 'https://www.smh.com.au/technology'),
+        ('iTnews', 'https://www.itnews.com.au/news'), ('Reuters', 'https://www.reuters.com/technology'),
+        ('TechCrunch', 'https://techcrunch.com'), ('The Guardian', 'https://www.theguardian.com/australia-news'),
+    ]
+    articles = []
+    for i in range(count):
+        keyword, sector = topics[i % len(topics)]
+        city = cities[rng.randrange(len(cities))]
+        source_name, base = sources[rng.randrange(len(sources))]
+        local = rng.random() < 0.7
+        place = f"{city}, Australia" if local else abroad[i % len(abroad)]
+        title = f"{keyword.capitalize()} reshapes {sector} in {place.split(',')[0]}"
+        description = (f"Companies in {place} are using {keyword} to change {sector}. "
+                       f"Experts say artificial intelligence adoption is accelerating.")
+        content = (f"{keyword.capitalize()} projects in {sector} are expanding across {place}. "
+                   f"Machine learning teams report faster deployment and new AI policy questions. "
+                   f"Regulators are watching closely as adoption grows… [+{rng.randint(800, 4000)} chars]")
+        if keyword in ('automation', 'algorithm') and rng.random() < 0.5:
+            # Borderline story: a weak keyword but no real AI angle
+            description = f"Companies in {place} are investing in {keyword} to cut {sector} costs."
+            content = (f"New {keyword} rollouts in {sector} are expanding across {place}. "
+                       f"Unions say the {keyword} push will change rosters… [+{rng.randint(800, 4000)} chars]")
+        published = now - timedelta(days=rng.randint(0, 6), hours=rng.randint(0, 23), minutes=rng.randint(0, 59))
+        articles.append({
+            'source': {'id': None, 'name': source_name},
+            'author': 'Staff Reporter',
+            'title': title,
+            'description': description,
+            'url': f"{base}/{sector}-{keyword.replace(' ', '-').lower()}-{i}",
+            'urlToImage': None,
+            'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'content': content,
+        })
+    return articles
+
+
+def _shift_to_window(articles, to_date):
+    """Re-date the generated articles so the newest falls on `to_date` (YYYY-MM-DD), as for a past week's query."""
+    newest = max(datetime.strptime(a['publishedAt'], '%Y-%m-%dT%H:%M:%SZ') for a in articles)
+    shift = datetime.strptime(to_date, '%Y-%m-%d').date() - newest.date()
+    if not shift:
+        return articles
+    return [dict(a, publishedAt=(datetime.strptime(a['publishedAt'], '%Y-%m-%dT%H:%M:%SZ') + shift)
+                 .strftime('%Y-%m-%dT%H:%M:%SZ')) for a in articles]
+
+
+def article_page(url):
+    """A news article page for `url`, wrapped in the usual navigation, share and footer boilerplate."""
+    slug = url.rstrip('/').rsplit('/', 1)[-1].replace('-', ' ')
+    paragraphs = "".join(
+        f"<p>Paragraph {n} of the full story on {slug}: local teams describe how the rollout is going, "
+        f"what it costs, and what regulators and customers have said about it so far.</p>"
+        for n in range(1, 13))
+    return (f"<html><head><title>{slug}</title><script>var tracking = 1;</script></head><body>"
+            f"<header><nav><a href='/'>Home</a> <a href='/tech'>Technology</a> <a href='/business'>Business</a></nav></header>"
+            f"<div class='share-tools'><a href='#'>Share on Facebook</a> <a href='#'>Share on X</a></div>"
+            f"<article><h1>{slug}</h1><p class='byline'>By Staff Reporter</p>{paragraphs}</article>"
+            f"<aside><h2>Related</h2><ul><li><a href='/a'>Another story entirely about something else</a></li></ul></aside>"
+            f"<footer><p>Copyright Stand-in News. All rights reserved. Terms of use and privacy policy apply.</p></footer>"
+            f"</body></html>")
+
+
+def tldr_feed(page, now=None, days=14):
+    """An RSS feed with one item per story of the saved TLDR issue, repeated for each weekday of the past `days`."""
+    from bs4 import BeautifulSoup
+    now = now or datetime.now(timezone.utc)
+    stories = []
+    for section in BeautifulSoup(page, 'html.parser').find_all('section'):
+        category = section.find('h3').get_text(strip=True)
+        for story in section.find_all('article'):
+            anchor = story.find('a')
+            stories.append((category, anchor.get_text(strip=True), anchor['href'],
+                            story.find('div', class_='newsletter-html').get_text(strip=True)))
+    items = []
+    for n in range(days):
+        # Issues go out early morning US/Eastern (about 10:00 UTC)
+        moment = (now - timedelta(days=n)).replace(hour=10, minute=0, second=0, microsecond=0)
+        if moment.weekday() >= 5 or moment > now:
+            continue
+        items += [f"<item><title>{escape(title)}</title><link>{escape(url)}</link>"
+                  f"<category>{escape(category)}</category><description>{escape(summary)}</description>"
+                  f"<pubDate>{format_datetime(moment)}</pubDate></item>"
+                  for category, title, url, summary in stories]
+    return (f"<?xml version='1.0' encoding='UTF-8'?><rss version='2.0'><channel><title>TLDR AI</title>"
+            f"<link>https://tldr.tech/ai</link>{''.join(items)}</channel></rss>").encode('utf-8')
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    """Serves saved TLDR issues under /ai/<date> and their feed at /api/rss/ai, article pages under /article and a fake NewsAPI /v2/everything."""
+
+    def do_GET(self):
+        server = self.server
+        path = urlparse(self.path).path
+        if server.latency:
+            time.sleep(server.latency)
+        if path == '/api/rss/ai':
+            server.calls.incr('tldr_feed')
+            self._send(200, tldr_feed(server.tldr_page), 'application/rss+xml; charset=utf-8')
+        elif path.startswith('/ai/'):
+            server.calls.incr('tldr')
+            self._send(200, server.tldr_page, 'text/html; charset=utf-8')
+        elif path == '/article':
+            server.calls.incr('article_pages')
+            original = parse_qs(urlparse(self.path).query).get('url', [''])[0]
+            self._send(200, article_page(original).encode('utf-8'), 'text/html; charset=utf-8')
+        elif path == '/v2/everything':
+            server.calls.incr('newsapi')
+            params = parse_qs(urlparse(self.path).query)
+            page_size = int(params.get('pageSize', ['100'])[0])
+            articles = server.newsapi_articles[:page_size]
+            if 'to' in params:
+                articles = _shift_to_window(articles, params['to'][0])
+            payload = {'status': 'ok', 'totalResults': len(server.newsapi_articles), 'articles': articles}
+            self._send(200, json.dumps(payload).encode('utf-8'), 'application/json')
+        else:
+            server.calls.incr('not_found')
+            self._send(404, b'not found', 'text/plain')
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output quiet
+
+
+class FixtureHttpServer:
+    """Local HTTP server standing in for tldr.tech (issue pages and feed) and the NewsAPI `everything` endpoint."""
+
+    def __init__(self, tldr_page_path=None, newsapi_articles=None, latency=0.0, calls=None):
+        page_path = Path(tldr_page_path) if tldr_page_path else FIXTURES_DIR / 'tldr_ai_issue.html'
+        self.calls = calls or _CallCounter()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), _FixtureHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.tldr_page = page_path.read_bytes()
+        self._httpd.newsapi_articles = newsapi_articles if newsapi_articles is not None else generate_newsapi_articles()
+        self._httpd.latency = latency
+        self._httpd.calls = self.calls
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class StubResponse:
+    """Mimics the `.text` attribute of a Gemini response."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+def lognormal_latency(median, sigma):
+    """Latency distribution for StubGeminiModel: log-normal around `median` seconds (long right tail)."""
+    return lambda rng: rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+
+def spiky_latency(base, spike, probability):
+    """Latency distribution for StubGeminiModel: `base` seconds, `spike` seconds with the given probability."""
+    return lambda rng: spike if rng.random() < probability else base
+
+
+class StubGeminiModel:
+    """Drop-in for `genai.GenerativeModel` with configurable latency and no network.
+
+    `latency` is either a fixed number of seconds (plus uniform `jitter`) or a
+    callable taking a random.Random and returning seconds, such as
+    lognormal_latency() or spiky_latency(). `failure_rate` makes that share of
+    calls raise, to exercise fallback paths.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, seed=0, calls=None, name='stub-gemini', failure_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.model_name = name
+        self.calls = calls or _CallCounter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _delay(self):
+        with self._lock:
+            if callable(self.latency):
+                return self.latency(self._rng)
+            extra = self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+        return self.latency + extra
+
+    def _fails(self):
+        if not self.failure_rate:
+            return False
+        with self._lock:
+            return self._rng.random() < self.failure_rate
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls.incr('gemini')
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        if self._fails():
+            raise RuntimeError(f"{self.model_name}: simulated model failure")
+        config = kwargs.get('generation_config') or {}
+        if config.get('response_mime_type') == 'application/json':
+            drafts = re.search(r'Return only a JSON array of (\d+) strings', prompt)
+            if drafts:
+                return StubResponse(self._drafts(prompt, int(drafts.group(1))))
+            return StubResponse(self._classify(prompt))
+        # Echo the article title back so summaries stay distinguishable
+        title = next((line for line in prompt.splitlines() if ': ' in line and not line[0].isdigit()), 'the article')
+        bullets = [f"- Key point {n} about {title.split(': ', 1)[-1][:80]}" for n in range(1, 6)]
+        return StubResponse("\n".join(bullets))
+
+    @staticmethod
+    def _drafts(prompt, count):
+        # LinkedIn variant prompts ask for N posts; vary their length and hashtags so ranking has work to do
+        title = re.search(r'^Article:\n(?:.*: )?(.*)$', prompt, re.MULTILINE)
+        topic = title.group(1)[:80] if title else 'the article'
+        drafts = []
+        for n in range(1, count + 1):
+            body = ' '.join([f"Take {n} on {topic}."] + ["Here is why it matters for responsble.ai and trustworthy AI."] * (6 * n))
+            hashtags = ' '.join(['#AI', '#ResponsibleAI', '#AIGovernance'][:n % 3 + 1])
+            drafts.append(f"{body}\n\nWhat would you do differently? \U0001F914\n\n{hashtags}")
+        return json.dumps(drafts)
+
+    @staticmethod
+    def _classify(prompt):
+        # Batched relevance prompts list articles as "[id] title | snippet"; call the AI ones relevant
+        verdicts = []
+        for match in re.finditer(r'^\[(\d+)\] (.*)$', prompt, re.MULTILINE):
+            relevant = bool(re.search(r'\b(ai|artificial intelligence|machine learning)\b', match.group(2), re.I))
+            verdicts.append({'id': int(match.group(1)), 'relevant': relevant, 'score': 0.9 if relevant else 0.2})
+        return json.dumps(verdicts)
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue: accepts any login, swallows every message (up to max_recipients RCPTs each)."""
+
+    def _reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        sink = self.server.sink
+        sink.calls.incr('smtp_connections')
+        self._reply('220 localhost stand-in SMTP sink ready')
+        mail_from, rcpts = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            sink.add_bytes(len(line))
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            sink.calls.incr('smtp_commands')
+            latency = sink.latency_for(verb)
+            if latency:
+                time.sleep(latency)
+            if verb == 'EHLO':
+                self._reply('250-localhost')
+                self._reply('250-AUTH PLAIN')
+                self._reply('250 SIZE 104857600')
+            elif verb == 'HELO':
+                self._reply('250 localhost')
+            elif verb == 'AUTH':
+                self._reply('235 2.7.0 Authentication successful')
+            elif verb == 'MAIL':
+                mail_from, rcpts = command[10:].split(' ', 1)[0].strip('<> '), []  # Drop SIZE= etc.
+                self._reply('250 OK')
+            elif verb == 'RCPT':
+                if sink.max_recipients and len(rcpts) >= sink.max_recipients:
+                    sink.calls.incr('smtp_rcpt_refused')
+                    self._reply('452 4.5.3 Too many recipients')
+                else:
+                    rcpts.append(command[8:].strip('<> '))
+                    self._reply('250 OK')
+            elif verb == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                size = 0
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b'.\r\n', b'.\n'):
+                        break
+                    size += len(data_line)
+                sink.add_bytes(size)
+                sink.record(mail_from, rcpts, size)
+                self._reply('250 OK: queued')
+            elif verb in ('RSET', 'NOOP'):
+                mail_from, rcpts = None, []
+                self._reply('250 OK')
+            elif verb == 'QUIT':
+                self._reply('221 Bye')
+                break
+            else:
+                self._reply('502 Command not implemented')
+
+
+class SmtpSink:
+    """Local SMTP server that accepts and records messages without delivering them.
+
+    command_latency delays every command; verb_latency overrides it per
+    command (e.g. {'RCPT': 0.001, 'DATA': 0.05}). max_recipients refuses
+    RCPTs beyond that many per message with a 452, as real servers do
+    (0 = no limit).
+    """
+
+    def __init__(self, command_latency=0.0, calls=None, verb_latency=None, max_recipients=0):
+        self.command_latency = command_latency
+        self.verb_latency = {verb.upper(): seconds for verb, seconds in (verb_latency or {}).items()}
+        self.max_recipients = max_recipients
+        self.calls = calls or _CallCounter()
+        self.messages = []
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SmtpHandler)
+        self._server.daemon_threads = True
+        self._server.sink = self
+        self._thread = None
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def latency_for(self, verb):
+        return self.verb_latency.get(verb, self.command_latency)
+
+    def add_bytes(self, n):
+        with self._lock:
+            self.bytes_received += n
+
+    def record(self, mail_from, rcpts, size):
+        with self._lock:
+            self.messages.append({'from': mail_from, 'recipients': len(rcpts), 'bytes': size})
+
+    def connect(self):
+        """Open a plain (non-TLS) client connection to the sink."""
+        host, port = self.address
+        return smtplib.SMTP(host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class LocalStandIns:
+    """Starts every stand-in and points an emailer module at them for the duration of a `with` block."""
+
+    def __init__(self, module, gemini_latency=0.0, gemini_jitter=0.0, http_latency=0.0,
+                 smtp_latency=0.0, newsapi_count=100, seed=0):
+        self.module = module
+        self.calls = _CallCounter()
+        self.http = FixtureHttpServer(newsapi_articles=generate_newsapi_articles(newsapi_count, seed),
+                                      latency=http_latency, calls=self.calls)
+        self.gemini = StubGeminiModel(latency=gemini_latency, jitter=gemini_jitter, seed=seed, calls=self.calls)
+        self.smtp = SmtpSink(command_latency=smtp_latency, calls=self.calls)
+        self._tmp = tempfile.TemporaryDirectory(prefix='stand-ins-')
+        self._saved = {}
+
+    def _patch(self, target, name, value):
+        if hasattr(target, name):
+            self._saved[(target, name)] = getattr(target, name)
+            setattr(target, name, value)
+
+    def _stub_model(self, real):
+        """Stub out each tier of a ModelRouter (keeping its deadline), or the bare model."""
+        if not isinstance(real, model_router.ModelRouter):
+            return self.gemini
+        tiers = [(name, StubGeminiModel(latency=self.gemini.latency, jitter=self.gemini.jitter, seed=i,
+                                        calls=self.calls, name=name))
+                 for i, (name, _) in enumerate(real.tiers)]
+        return model_router.ModelRouter(tiers, deadline=real.deadline, timeout=real.timeout)
+
+    def __enter__(self):
+        from newsapi import const as newsapi_const
+        self.http.start()
+        self.smtp.start()
+        self._patch(self.module, 'TLDR_BASE_URL', f"{self.http.base_url}/ai")
+        self._patch(self.module, 'TLDR_FEED_URL', f"{self.http.base_url}/api/rss/ai")
+        self._patch(self.module, 'NEWS_API_KEY', self.module.NEWS_API_KEY or 'stand-in-key')
+        self._patch(self.module, 'model', self._stub_model(self.module.model))
+        self._patch(self.module, 'relevance_model', self.gemini)
+        # Keep the stand-in runs' caches, stores, saved digests and run reports out of the real ones
+        self._patch(self.module, 'RELEVANCE_CACHE_PATH', str(Path(self._tmp.name) / 'relevance_cache.json'))
+        self._patch(self.module, 'ENRICH_CACHE_PATH', str(Path(self._tmp.name) / 'enrichment_cache.json'))
+        self._patch(self.module, 'NOVELTY_INDEX_PATH', str(Path(self._tmp.name) / 'novelty_index'))
+        self._patch(self.module, 'INGEST_STORE_PATH', str(Path(self._tmp.name) / 'weekly_ingest.json'))
+        self._patch(self.module, 'LAST_DIGEST_PATH', str(Path(self._tmp.name) / 'last_digest.json'))
+        self._patch(self.module, 'DIGEST_HISTORY_DIR', str(Path(self._tmp.name) / 'digests'))
+        self._patch(archive, 'ARCHIVE_PATH', str(Path(self._tmp.name) / 'news_archive.db'))
+        self._patch(tracing, 'TRACE_REPORT_PATH', str(Path(self._tmp.name) / 'run_report.jsonl'))
+        if hasattr(self.module, 'fetch_article_page'):
+            # Article pages live on the news sites' own hosts; serve them from the fixture server instead
+            self._patch(self.module, 'fetch_article_page',
+                        lambda url: self.module.fetcher.get(f"{self.http.base_url}/article", params={'url': url}))
+        self._patch(self.module, 'open_smtp_connection', self.smtp.connect)
+        self._patch(self.module, 'GEMINI_CALL_DELAY', 0)
+        self._patch(newsapi_const, 'EVERYTHING_URL', f"{self.http.base_url}/v2/everything")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for (target, name), value in self._saved.items():
+            setattr(target, name, value)
+        self._saved.clear()
+        self.http.stop()
+        self.smtp.stop()
+        self._tmp.cleanup()
+        return False
+
+
+def add_arguments(parser):
+    """Add the --stand-ins option to an entry point's parser."""
+    parser.add_argument('--stand-ins', action='store_true',
+                        help='Replace TLDR, NewsAPI, Gemini and SMTP with the local stand-ins')
+
+
+def from_args(args, module):
+    """Return a context that installs the stand-ins into module when --stand-ins is set."""
+    return LocalStandIns(module) if args.stand_ins else nullcontext()
@@ -0,0 +1,183 @@
+"""Lightweight per-stage tracing and metrics for the digest scripts.
+
+Spans time pipeline stages (scrape, parse, filter, generate, render, send),
+counters track how many items flowed through them and histograms record the
+latency of every external call. At the end of a run `write_report()` appends
+one JSON object per line to TRACE_REPORT_PATH, all tagged with the run id.
+
+Overhead is a couple of perf_counter() calls and a dict update per span, so
+tracing stays on in production. Per-article chatter goes through `debug()`,
+which only prints when LOG_LEVEL=debug.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'info').lower()
+TRACE_REPORT_PATH = os.getenv('TRACE_REPORT_PATH', 'run_report.jsonl')  # Empty string disables the report
+
+# Upper bounds (seconds) of the external-call latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # Last bucket is +Inf
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def to_dict(self):
+        bounds = [str(b) for b in LATENCY_BUCKETS] + ['+Inf']
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'min': round(self.min, 6) if self.min is not None else None,
+            'max': round(self.max, 6) if self.max is not None else None,
+            'buckets': dict(zip(bounds, self.buckets)),
+        }
+
+
+class Tracer:
+    """Collects spans, counters and histograms for one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.listeners = []  # Objects with span_started(name, attrs) / span_ended(name) hooks, e.g. the profiler
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.run_id = uuid.uuid4().hex[:12]
+            self.started_at = datetime.now(timezone.utc)
+            self._t0 = time.perf_counter()
+            self.spans = []
+            self.counters = {}
+            self.histograms = {}
+            self.attachments = {}
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name, **attrs):
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        record = {'name': name, 'parent': parent['name'] if parent else None, 'attrs': attrs}
+        stack.append(record)
+        for listener in self.listeners:
+            listener.span_started(name, attrs)
+        start = time.perf_counter()
+        try:
+            yield record['attrs']
+        except BaseException as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            for listener in self.listeners:
+                listener.span_ended(name)
+            record['start'] = round(start - self._t0, 6)
+            record['duration'] = round(end - start, 6)
+            with self._lock:
+                self.spans.append(record)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def external_call(self, name):
+        """Time an outbound call into the `name` latency histogram, counting failures."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.count(f"{name}.errors")
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def attach(self, name, payload):
+        """Add a named block of externally collected stats (e.g. HTTP tail latency) to the report."""
+        with self._lock:
+            self.attachments[name] = payload
+
+    def stage_totals(self):
+        """Total duration and span count per span name."""
+        totals = {}
+        for record in self.spans:
+            entry = totals.setdefault(record['name'], {'count': 0, 'duration': 0.0})
+            entry['count'] += 1
+            entry['duration'] = round(entry['duration'] + record['duration'], 6)
+        return totals
+
+    def report_lines(self):
+        base = {'run_id': self.run_id}
+        lines = [dict(base, type='run', started_at=self.started_at.isoformat(),
+                      duration=round(time.perf_counter() - self._t0, 6), stages=self.stage_totals())]
+        lines += [dict(base, type='span', **record) for record in self.spans]
+        lines += [dict(base, type='counter', name=name, value=value) for name, value in sorted(self.counters.items())]
+        lines += [dict(base, type='histogram', name=name, **histogram.to_dict())
+                  for name, histogram in sorted(self.histograms.items())]
+        lines += [dict(base, type='stats', name=name, data=payload) for name, payload in sorted(self.attachments.items())]
+        return lines
+
+    def write_report(self, path=None):
+        path = TRACE_REPORT_PATH if path is None else path
+        if not path:
+            return
+        try:
+            with open(path, 'a') as f:
+                for line in self.report_lines():
+                    f.write(json.dumps(line, default=str) + '\n')
+            print(f"Run report written to {path} (run {self.run_id})")
+        except Exception as e:
+            print(f"Error writing run report: {e}")
+
+
+tracer = Tracer()
+
+# Module-level shortcuts so callers can write `tracing.span(...)`
+span = tracer.span
+count = tracer.count
+observe = tracer.observe
+external_call = tracer.external_call
+write_report = tracer.write_report
+reset = tracer.reset
+attach = tracer.attach
+
+
+def debug(message):
+    """Print verbose (per-article) output only when LOG_LEVEL=debug."""
+    if LOG_LEVEL == 'debug':
+        print(message)
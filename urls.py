@@ -0,0 +1,27 @@
+"""URL helpers shared by the caches that key on articles."""
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+# Query parameters that only track where a click came from
+TRACKING_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'cmpid', 'ocid', 'sr_share'}
+
+
+def canonical_url(url):
+    """Normalise an article URL so the same story maps to one cache key.
+
+    Lowercases scheme and host, drops 'www.', default ports, fragments,
+    tracking query parameters and a trailing slash; keeps other query
+    parameters (some sites identify articles by them) in sorted order.
+    """
+    if not url:
+        return ''
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parsed.query)
+                             if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)))
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse(((parsed.scheme or 'https').lower(), host, path, '', query, ''))